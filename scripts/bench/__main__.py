@@ -0,0 +1,124 @@
+"""
+⏱ Офлайн-бенчмарк пайплайнов на записанной кассете (`scripts.utils.http_cassette`).
+
+Каждый пайплайн запускается целиком — `main()` / `main_run_ozon()`, запросы, постобработка —
+но HTTP-ответы берутся из кассеты с моделью задержек и лимитов API. Выгрузка в Google Sheets
+и Telegram не выполняются. Лимиты (и клиента, и модели API) ускоряются `--rate-scale`:
+при 60 минутные лимиты WB становятся секундными, и прогон занимает секунды.
+
+Запись кассеты (один раз, с настоящими токенами):
+    HTTP_CASSETTE=record HTTP_CASSETTE_DIR=cassettes py -m scripts.pipelines.get_supplier_stocks
+    (так же — get_sales_funnel, get_advertising_report, pipelines_oz.get_stocks_oz, my_werehouse.get_warehouse_api)
+
+Запуск:
+    py -m scripts.bench --cassette cassettes --rate-scale 60
+    py -m scripts.bench --only wb_stocks ozon --latency 0.05
+    py -m scripts.bench --only wb_all_jobs --postprocess inline   (постобработка в event loop — для сравнения)
+"""
+from functools import partial
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+def pipelines(wb: dict[str, str], oz: dict[str, dict[str, str]], moysklad: dict[str, str]) -> dict:
+    """{имя: фабрика корутины} — импорт после настройки окружения."""
+
+    from scripts.engine.universal_main import main
+    from scripts.engine.main_ozon import main_run_ozon
+    from scripts.engine.run_cabinet import execute_run_cabinet
+    from scripts.engine.run_cabinet_oz import execute_run_ozon
+    from scripts.postprocessors.group_stocks import merge_and_transform_stocks_with_idkt
+    from scripts.postprocessors.group_sales import get_current_week_sales_df
+    from scripts.postprocessors.group_advert import group_advert_and_id
+    from scripts.my_werehouse.get_warehouse_api import stream_mywerehouse_stocks
+
+    jobs = {
+        'stocks': (partial(execute_run_cabinet, func_name='get_stocks'), merge_and_transform_stocks_with_idkt),
+        'sales': (partial(execute_run_cabinet, func_name='report_detail'), get_current_week_sales_df),
+        'advert': (partial(execute_run_cabinet, func_name='campaign_query'), group_advert_and_id),
+    }
+
+    runs = {
+        f'wb_{job}': partial(main, run_funck=run, postprocess_func=post, cabinet=wb)
+        for job, (run, post) in jobs.items()
+    }
+    runs['wb_all_jobs'] = partial(main, jobs=jobs, cabinet=wb)
+    runs['ozon'] = partial(main_run_ozon, execute_run_ozon, cabinet_oz=oz)
+
+    for token in moysklad.values():
+        runs['moysklad'] = partial(stream_mywerehouse_stocks, token)
+
+    return {
+        name: run for name, run in runs.items()
+        if (wb if name.startswith('wb_') else oz if name == 'ozon' else moysklad)
+    }
+
+
+def shape(result) -> str:
+    if hasattr(result, 'shape'):
+        return str(result.shape)
+    if isinstance(result, dict):
+        return f"{len(result)} шт. ({', '.join(map(str, result))})"
+    return type(result).__name__
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cassette', default=os.getenv('HTTP_CASSETTE_DIR', 'cassettes'))
+    parser.add_argument('--latency', type=float, default=None,
+                        help='фиксированная задержка ответа, сек (по умолчанию — записанная)')
+    parser.add_argument('--latency-scale', type=float, default=1.0)
+    parser.add_argument('--rate-scale', type=float, default=60.0,
+                        help='множитель скорости лимитов API')
+    parser.add_argument('--postprocess', choices=('process', 'thread', 'inline'), default='process',
+                        help='где main() выполняет постобработку кабинетов')
+    parser.add_argument('--only', nargs='*', default=None)
+    args = parser.parse_args()
+
+    os.environ.update({
+        'HTTP_CASSETTE': 'replay',
+        'HTTP_CASSETTE_DIR': args.cassette,
+        'HTTP_CASSETTE_LATENCY': '' if args.latency is None else str(args.latency),
+        'HTTP_CASSETTE_LATENCY_SCALE': str(args.latency_scale),
+        'RATE_LIMIT_SCALE': str(args.rate_scale),
+        'POSTPROCESS_EXECUTOR': args.postprocess,
+        # кеш карточек — пустой, иначе get_cards не дойдёт до кассеты
+        'CARDS_CACHE_DIR': tempfile.mkdtemp(prefix='bench_cards_'),
+        'TG_TOKEN': '',
+    })
+
+    from scripts.utils.http_cassette import CassetteSession
+
+    cassette = CassetteSession('replay', args.cassette)
+
+    runs = pipelines(cassette.tokens('wb'),
+                     {name: {'Api-Key': 'cassette', 'Client-Id': client_id}
+                      for name, client_id in cassette.tokens('oz').items()},
+                     cassette.tokens('moysklad'))
+
+    if args.only:
+        runs = {name: run for name, run in runs.items() if name in args.only}
+
+    if not runs:
+        raise SystemExit(f"📼 В кассете {args.cassette} нет кабинетов для выбранных пайплайнов")
+
+    timings = {}
+
+    for name, run in runs.items():
+        begin = time.perf_counter()
+
+        try:
+            result = shape(asyncio.run(run()))
+        except Exception as e:
+            result = f"❌ {type(e).__name__}: {e}"
+
+        timings[name] = (time.perf_counter() - begin, result)
+
+    print(f"\n{'пайплайн':<16}{'время':>10}   результат")
+    for name, (elapsed, result) in timings.items():
+        print(f"{name:<16}{elapsed:>9.2f}с   {result}")
+
+# py -m scripts.bench --cassette cassettes
@@ -0,0 +1,106 @@
+"""
+⏱ Регрессия и бенчмарк рекламной статистики: вложенные циклы по `fullstats` + merge и два
+`pd.to_datetime` в `group_advert_and_id` (как было) против `flatten_fullstats` и одного groupby.
+
+Перед замером проверяется, что итоговые таблицы по значениям совпадают (типы колонок новые:
+`Неделя` — int8 вместо UInt32).
+
+Запуск:
+    py -m scripts.bench.advert_flatten --campaigns 2000
+"""
+from scripts.postprocessors.group_advert import flatten_fullstats, group_advert_and_id
+from scripts.bench.fixtures import make_wb_fullstats
+import argparse
+import copy
+import time
+import pandas as pd
+import numpy as np
+
+
+def legacy_flatten(fullstats: list[dict]) -> pd.DataFrame:
+    camp_data = []
+
+    for c in fullstats:
+        for d in c['days']:
+            for a in d['apps']:
+                for nm in a['nm']:
+                    nm['appType'] = a['appType']
+                    nm['date'] = d['date']
+                    nm['advertId'] = c['advertId']
+                    camp_data.append(nm)
+
+    return pd.DataFrame(camp_data)
+
+
+def legacy_group_advert_and_id(camp_df: pd.DataFrame, ID: pd.DataFrame) -> pd.DataFrame:
+    ID['updatedAt'] = pd.to_datetime(ID['updatedAt'])
+
+    latest_idkt = (
+        ID.sort_values('updatedAt').drop_duplicates(
+            subset='Артикул WB', keep='last').reset_index(drop=True)
+    )
+    camp_df['date'] = pd.to_datetime(camp_df['date']).dt.date
+    camp_df['Неделя'] = pd.to_datetime(camp_df['date']).dt.isocalendar().week
+    camp_df = camp_df.rename(columns={'sum': 'expenses'})
+    camp_df.drop(columns=['date'], inplace=True)
+
+    camp_df = pd.merge(
+        camp_df.rename(columns={'nmId': 'Артикул WB'}),
+        latest_idkt.rename(columns={'ID KT': 'ID'}),
+        left_on='Артикул WB',
+        right_on='Артикул WB',
+        how='left'
+    )
+    camp_df['ID'] = pd.to_numeric(camp_df['ID'], errors='coerce').fillna(0).astype(int)
+
+    result = camp_df.groupby(['ID', 'Неделя', 'Артикул WB']).agg({
+        'views': 'sum', 'clicks': 'sum', 'atbs': 'sum', 'orders': 'sum',
+        'shks': 'sum', 'sum_price': 'sum', 'expenses': 'sum'
+    }).reset_index()
+
+    result = result.drop_duplicates()
+    result = result.rename(columns={'views': 'Просмотры', 'clicks': 'Переходы', 'expenses': 'Расход,Р'})
+    result['CTR'] = np.where(result['Просмотры'] == 0, 0, (result['Переходы'] / result['Просмотры']).round(3))
+
+    return result.filter(['ID', 'Неделя', 'Расход,Р', 'Артикул WB', 'CTR'])
+
+
+def make_idkt(cards: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # у части артикулов по две склейки с разной датой обновления, части артикулов нет совсем
+    nm_id = 100_000_000 + np.concatenate([np.arange(cards - cards // 10), rng.integers(0, cards, cards // 5)])
+
+    return pd.DataFrame({
+        'Артикул WB': nm_id,
+        'ID KT': nm_id // 3 + rng.integers(0, 2, len(nm_id)),
+        'updatedAt': (pd.Timestamp('2025-06-01') + pd.to_timedelta(rng.integers(0, 10**6, len(nm_id)), unit='s'))
+        .strftime('%Y-%m-%dT%H:%M:%SZ'),
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--campaigns', type=int, default=2_000)
+    parser.add_argument('--cards', type=int, default=5_000)
+    args = parser.parse_args()
+
+    fullstats = make_wb_fullstats(args.campaigns, args.cards)
+    idkt = make_idkt(args.cards)
+
+    legacy = legacy_group_advert_and_id(legacy_flatten(copy.deepcopy(fullstats)), idkt.copy())
+    current = group_advert_and_id(flatten_fullstats(fullstats), idkt.copy(), 'bench')
+
+    pd.testing.assert_frame_equal(legacy, current, check_dtype=False)
+    print(f"✅ Результаты совпадают: {current.shape}")
+
+    for variant, run in (
+        ('циклы + merge', lambda data: legacy_group_advert_and_id(legacy_flatten(data), idkt.copy())),
+        ('flatten_fullstats', lambda data: group_advert_and_id(flatten_fullstats(data), idkt.copy(), 'bench')),
+    ):
+        data = copy.deepcopy(fullstats)
+
+        begin = time.perf_counter()
+        run(data)
+        print(f"{variant:<20}{time.perf_counter() - begin:>10.2f} с")
+
+# py -m scripts.bench.advert_flatten
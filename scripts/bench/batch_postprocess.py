@@ -0,0 +1,108 @@
+"""
+⏱ Регрессия и бенчмарк пакетной постобработки: `postprocess_func(*res, name=name)` по кабинетам
+(как было в `main()`) против одного вызова `BATCH_POSTPROCESS` на все кабинеты.
+
+Кабинеты разного размера, включая `Мишнева` (урезанный результат остатков) и `Мелихов`
+(продажи по артикулу). Перед замером проверяется, что результат каждого кабинета совпадает
+по значениям и порядку строк (типы колонок общие для всех кабинетов — как после `pd.concat`
+при выгрузке).
+
+Запуск:
+    py -m scripts.bench.batch_postprocess --cards 3000
+"""
+from scripts.postprocessors.batch import postprocess_cabinets
+from scripts.postprocessors.group_stocks import merge_and_transform_stocks_with_idkt
+from scripts.postprocessors.group_sales import get_current_week_sales_df, flatten_sales_cards
+from scripts.postprocessors.group_advert import group_advert_and_id, flatten_fullstats
+from scripts.bench.group_stocks import make_cabinet
+from scripts.bench.advert_flatten import make_idkt
+from scripts.bench.fixtures import make_wb_fullstats, make_wb_sales_cards
+import argparse
+import time
+import pandas as pd
+
+# кабинет: доля `--cards`
+CABINETS = {
+    'Галилова': 1.0,
+    'Мишнева': 0.5,
+    'Шелудько': 0.3,
+    'Мелихов': 0.05,
+    'Мартыненко': 0.1,
+    'Havva': 0.2,
+    'Gabriel': 0.02,
+    'UCARE': 0.01,
+}
+
+
+def make_data(cards: int) -> dict[str, dict[str, tuple]]:
+    """{постобработка: {кабинет: аргументы}}."""
+
+    stocks, sales, advert = {}, {}, {}
+
+    for seed, (name, share) in enumerate(CABINETS.items()):
+        count = max(int(cards * share), 20)
+
+        stocks[name] = make_cabinet(count, seed=seed, complete=name == 'Gabriel')
+        sales[name] = (flatten_sales_cards(make_wb_sales_cards(count, seed=seed)), make_idkt(count, seed=seed))
+        advert[name] = (flatten_fullstats(make_wb_fullstats(max(count // 10, 2), count, seed=seed)),
+                        make_idkt(count, seed=seed))
+
+    return {
+        'stocks': (merge_and_transform_stocks_with_idkt, stocks),
+        'sales': (get_current_week_sales_df, sales),
+        'advert': (group_advert_and_id, advert),
+    }
+
+
+def copied(data: dict[str, tuple]) -> dict[str, tuple]:
+    # постобработка по кабинетам меняет входные таблицы
+    return {name: tuple(df.copy() for df in res) for name, res in data.items()}
+
+
+def assert_same(old, new, label: str) -> None:
+    if isinstance(old, tuple):
+        for old_part, new_part in zip(old, new):
+            assert_same(old_part, new_part, label)
+        return
+
+    old, new = (df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+                for df in (old, new))
+    pd.testing.assert_frame_equal(old, new, check_dtype=False, obj=label)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cards', type=int, default=3_000, help='карточек в самом большом кабинете')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    jobs = make_data(args.cards)
+
+    for job, (func, data) in jobs.items():
+        single = postprocess_cabinets(func, copied(data))
+        batch = postprocess_cabinets(func, copied(data), batch=True)
+
+        for name in data:
+            assert not isinstance(single[name], Exception), f"{job} {name}: {single[name]!r}"
+            assert_same(single[name], batch[name], f"{job} {name}")
+
+    print(f"✅ Результаты совпадают: {len(CABINETS)} кабинетов, {', '.join(jobs)}")
+
+    print(f"\n{'постобработка':<16}{'по кабинетам':>14}{'пакетом':>10}")
+    for job, (func, data) in jobs.items():
+        timings = []
+
+        for batch in (False, True):
+            best = float('inf')
+
+            for _ in range(args.repeat):
+                inputs = copied(data)
+                begin = time.perf_counter()
+                postprocess_cabinets(func, inputs, batch=batch)
+                best = min(best, time.perf_counter() - begin)
+
+            timings.append(best)
+
+        print(f"{job:<16}{timings[0]:>13.3f}с{timings[1]:>9.3f}с")
+
+# py -m scripts.bench.batch_postprocess
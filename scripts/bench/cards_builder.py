@@ -0,0 +1,139 @@
+"""
+⏱ Бенчмарк сборки карточек WB: list-of-dicts (как было в `get_cards`) против `CardsColumnarBuilder`.
+
+Страницы синтетического каталога хранятся как JSON-строки и разбираются по одной — как при
+постраничной загрузке. Каждый вариант запускается в отдельном процессе, чтобы пиковая память
+одного не влияла на другой. Перед замером проверяется, что оба варианта дают одинаковые таблицы.
+
+Запуск:
+    py -m scripts.bench.cards_builder --cards 50000
+"""
+from scripts.pipelines.get_cards_list import CardsColumnarBuilder
+from scripts.bench.fixtures import iter_wb_cards, paginate
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import tracemalloc
+import argparse
+import json
+import time
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def legacy_cards_frames(pages: list[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    all_cards, rows = [], []
+
+    for page in pages:
+        all_cards.extend([
+            {k: v for k, v in card.items() if k != 'description'}
+            for card in json.loads(page) if isinstance(card, dict)
+        ])
+
+    for card in all_cards:
+        info = {
+            'Артикул WB': card['nmID'],
+            'ID KT': card['imtID'],
+            'Наименование': card['title'],
+            'Артикул поставщика': card['vendorCode'],
+            'Бренд': card['brand'],
+            'Категория': card['subjectName'],
+            'Фото': card['photos'][0]['big'] if card.get('photos') else None,
+            'Ширина': card['dimensions']['width'],
+            'Высота': card['dimensions']['height'],
+            'Длина': card['dimensions']['length'],
+            'updatedAt': card['updatedAt']
+        }
+        for size in card.get('sizes', []):
+            for barcode in size.get('skus', []) or [None]:
+                row = info.copy()
+                row.update({
+                    'Размер': size.get('techSize'),
+                    'chrtID': size.get('chrtID'),
+                    'Баркод': barcode if barcode else None
+                })
+            rows.append(row)
+
+    result = pd.DataFrame(rows)
+    res_idkt_save = result.filter(
+        ['Артикул WB', 'ID KT', 'Наименование', 'Бренд', 'Размер', 'Баркод', 'Артикул поставщика', 'Категория', 'Фото', 'Ширина', 'Высота', 'Длина'])
+    idkt_nmid = result[['Артикул WB', 'ID KT', 'updatedAt']]
+
+    return res_idkt_save, idkt_nmid
+
+
+def columnar_cards_frames(pages: list[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    builder = CardsColumnarBuilder()
+
+    for page in pages:
+        builder.add_page(json.loads(page))
+
+    _, res_idkt_save, idkt_nmid = builder.build()
+    return res_idkt_save, idkt_nmid
+
+
+VARIANTS = {
+    'list-of-dicts': legacy_cards_frames,
+    'columnar': columnar_cards_frames,
+}
+
+
+def make_pages(cards: int) -> list[str]:
+    return [json.dumps(page, ensure_ascii=False) for page in paginate(iter_wb_cards(cards), 100)]
+
+
+def measure(variant: str, cards: int) -> dict[str, float]:
+    pages = make_pages(cards)
+    func = VARIANTS[variant]
+
+    base_rss = resource.getrusage(
+        resource.RUSAGE_SELF).ru_maxrss if resource else 0
+
+    begin = time.perf_counter()
+    func(pages)
+    wall = time.perf_counter() - begin
+
+    peak_rss = resource.getrusage(
+        resource.RUSAGE_SELF).ru_maxrss if resource else 0
+
+    tracemalloc.start()
+    func(pages)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'wall_s': wall,
+        # ru_maxrss в КБ на Linux
+        'rss_delta_mb': (peak_rss - base_rss) / 1024,
+        'traced_peak_mb': traced_peak / 1024 ** 2,
+    }
+
+
+def check_identical(cards: int) -> None:
+    pages = make_pages(cards)
+
+    for legacy, columnar in zip(legacy_cards_frames(pages), columnar_cards_frames(pages)):
+        pd.testing.assert_frame_equal(legacy, columnar)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cards', type=int, default=50_000)
+    args = parser.parse_args()
+
+    check_identical(min(args.cards, 5_000))
+    print('✅ Таблицы совпадают')
+
+    ctx = multiprocessing.get_context('spawn')
+
+    print(f"{'вариант':<15}{'время, с':>10}{'ΔRSS, МБ':>12}{'tracemalloc, МБ':>18}")
+    for variant in VARIANTS:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            stats = pool.submit(measure, variant, args.cards).result()
+
+        print(f"{variant:<15}{stats['wall_s']:>10.2f}{stats['rss_delta_mb']:>12.1f}{stats['traced_peak_mb']:>18.1f}")
+
+# py -m scripts.bench.cards_builder
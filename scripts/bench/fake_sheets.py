@@ -0,0 +1,531 @@
+"""
+🧪 Фейковый Google Sheets API в памяти процесса.
+
+Отвечает на те же HTTP-запросы, что и Google (Drive `files.list`, `spreadsheets.get`,
+`values.get / batchGet / update / batchUpdate / clear / batchClear / append`,
+`spreadsheets.batchUpdate` с addSheet / deleteSheet / updateSheetProperties / appendDimension),
+поэтому под ним работает настоящий `gspread.Client` со всем кодом выгрузок: `SheetsSession`,
+`QuotaHTTPClient`, `sync_values`, `set_with_dataframe`.
+
+Сервис считает вызовы API (по операциям и по таблицам), держит свои поминутные квоты
+чтения / записи (сверх квоты — 429 RESOURCE_EXHAUSTED, как у Google) и добавляет задержку
+к каждому ответу.
+
+📌 Использование:
+----------------
+service = FakeSheetsService(read_per_minute=60, write_per_minute=60, latency=0.2)
+service.create('Ассортиментная матрица. Полная', {'API': 1000})
+set_gspread_client(service.client(), ids_path=...)
+... выгрузка ...
+service.calls  # Counter({'values.update': 3, 'spreadsheets.get': 1, ...})
+"""
+from scripts.utils.sheets_scheduler import QuotaHTTPClient
+from gspread.utils import a1_range_to_grid_range, rowcol_to_a1
+from collections import Counter, deque
+from typing import Any, Optional
+from urllib.parse import unquote, urlsplit
+import itertools
+import threading
+import requests
+import gspread
+import json
+import time
+import re
+
+SHEETS_PREFIX = '/v4/spreadsheets/'
+DRIVE_FILES = '/drive/v3/files'
+
+_NAME_QUERY = re.compile(r'name = "(.*?)"(?: and |$)')
+_NUMBER = re.compile(r'^-?\d+(\.\d+)?$')
+
+
+class FakeSheetsError(Exception):
+    def __init__(self, code: int, message: str, status: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+class FakeSheet:
+    """Лист: размер сетки и значения (строки → ячейки, как их хранит Google)."""
+
+    def __init__(self, sheet_id: int, title: str, index: int, rows: int = 1000, cols: int = 26) -> None:
+        self.sheet_id = sheet_id
+        self.title = title
+        self.index = index
+        self.rows = rows
+        self.cols = cols
+        self.cells: list[list] = []
+
+    def properties(self) -> dict:
+        return {
+            'sheetId': self.sheet_id,
+            'title': self.title,
+            'index': self.index,
+            'sheetType': 'GRID',
+            'gridProperties': {'rowCount': self.rows, 'columnCount': self.cols},
+        }
+
+    def bounds(self, grid: dict) -> tuple[int, int, int, int]:
+        return (grid.get('startRowIndex', 0), grid.get('endRowIndex', self.rows),
+                grid.get('startColumnIndex', 0), grid.get('endColumnIndex', self.cols))
+
+    def read(self, grid: dict) -> list[list]:
+        r0, r1, c0, c1 = self.bounds(grid)
+        values = [row[c0:c1] for row in self.cells[r0:r1]]
+
+        # Google обрезает пустые ячейки в конце строк и пустые строки в конце диапазона
+        values = [_trim(row) for row in values]
+        while values and not values[-1]:
+            values.pop()
+
+        return values
+
+    def write(self, row: int, col: int, values: list[list]) -> None:
+        height = row + len(values)
+        width = col + max((len(line) for line in values), default=0)
+
+        if height > self.rows or width > self.cols:
+            raise FakeSheetsError(
+                400, f"Range ('{self.title}'!{rowcol_to_a1(row + 1, col + 1)}:{rowcol_to_a1(height, width)}) "
+                     f"exceeds grid limits. Max rows: {self.rows}, max columns: {self.cols}",
+                'INVALID_ARGUMENT')
+
+        while len(self.cells) < height:
+            self.cells.append([])
+
+        for offset, line in enumerate(values):
+            cells = self.cells[row + offset]
+            if len(cells) < width:
+                cells.extend([''] * (width - len(cells)))
+            cells[col:col + len(line)] = line
+
+    def clear(self, grid: dict) -> None:
+        r0, r1, c0, c1 = self.bounds(grid)
+
+        for cells in self.cells[r0:r1]:
+            for c in range(c0, min(c1, len(cells))):
+                cells[c] = ''
+
+    def resize(self, rows: Optional[int] = None, cols: Optional[int] = None) -> None:
+        self.rows = rows or self.rows
+        self.cols = cols or self.cols
+        self.cells = [row[:self.cols] for row in self.cells[:self.rows]]
+
+
+class FakeSpreadsheet:
+    def __init__(self, key: str, title: str) -> None:
+        self.id = key
+        self.title = title
+        self.sheets: list[FakeSheet] = []
+
+    def metadata(self) -> dict:
+        return {
+            'spreadsheetId': self.id,
+            'properties': {'title': self.title, 'locale': 'ru_RU', 'timeZone': 'Europe/Moscow'},
+            'sheets': [{'properties': sheet.properties()} for sheet in self.sheets],
+            'spreadsheetUrl': f'https://docs.google.com/spreadsheets/d/{self.id}/edit',
+        }
+
+    def sheet(self, title: str) -> FakeSheet:
+        for sheet in self.sheets:
+            if sheet.title == title:
+                return sheet
+        raise FakeSheetsError(400, f"Unable to parse range: '{title}'", 'INVALID_ARGUMENT')
+
+    def parse_range(self, name: str) -> tuple[FakeSheet, dict]:
+        """`'Лист'!A1:B2` / `Лист!A:C` / `'Лист'` / `A1:B2` (первый лист) → (лист, GridRange)."""
+
+        if '!' in name:
+            title, a1 = name.rsplit('!', 1)
+        elif any(sheet.title == name.strip("'").replace("''", "'") for sheet in self.sheets):
+            title, a1 = name, ''
+        else:
+            title, a1 = "'" + self.sheets[0].title.replace("'", "''") + "'", name
+
+        if title.startswith("'") and title.endswith("'"):
+            title = title[1:-1].replace("''", "'")
+
+        sheet = self.sheet(title)
+
+        try:
+            grid = a1_range_to_grid_range(a1) if a1 else {}
+        except Exception:
+            raise FakeSheetsError(400, f"Unable to parse range: {name}", 'INVALID_ARGUMENT')
+
+        return sheet, grid
+
+
+def _trim(row: list) -> list:
+    end = len(row)
+    while end and row[end - 1] in ('', None):
+        end -= 1
+    return row[:end]
+
+
+def _user_entered(value: Any) -> Any:
+    """USER_ENTERED: строки-числа становятся числами (как в таблице с точкой-разделителем)."""
+
+    if isinstance(value, str) and _NUMBER.match(value):
+        return float(value) if '.' in value else int(value)
+    return value
+
+
+def _formatted(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class FakeSheetsService:
+    """
+    🧪 Таблицы Google в памяти + модель квот и задержек API.
+
+    ─────────────────────────────────────────────────────────────
+
+    🔧 Параметры:
+    -------------
+    read_per_minute, write_per_minute : int
+        Квоты API: чтений (GET) и записей (всё остальное) за `window` секунд.
+        Запрос сверх квоты получает 429 RESOURCE_EXHAUSTED.
+    window : float
+        Окно квоты, сек (60 — как у Google; меньше — ускоренный прогон).
+    latency : float
+        Задержка каждого ответа, сек.
+    """
+
+    def __init__(self, read_per_minute: int = 60, write_per_minute: int = 60,
+                 window: float = 60.0, latency: float = 0.0) -> None:
+        self.limits = {'read': read_per_minute, 'write': write_per_minute}
+        self.window = window
+        self.latency = latency
+        self.spreadsheets: dict[str, FakeSpreadsheet] = {}
+        self.sent: dict[str, deque[float]] = {'read': deque(), 'write': deque()}
+        self.calls: Counter[str] = Counter()
+        self.calls_by_table: Counter[str] = Counter()
+        self.throttled = 0
+        self.ids = itertools.count(1)
+        self.lock = threading.RLock()
+
+    # ─── наполнение ───
+
+    def create(self, title: str, sheets: Optional[dict[str, Any]] = None) -> FakeSpreadsheet:
+        """
+        Новая таблица. `sheets` — `{лист: число строк | (строки, колонки) | list[list] значений}`.
+        """
+
+        with self.lock:
+            spreadsheet = FakeSpreadsheet(f'fake-{next(self.ids):04d}', title)
+            self.spreadsheets[spreadsheet.id] = spreadsheet
+
+            for name, spec in (sheets or {'Лист1': 1000}).items():
+                sheet = self._add_sheet(spreadsheet, name)
+
+                if isinstance(spec, int):
+                    sheet.resize(rows=spec)
+                elif isinstance(spec, tuple):
+                    sheet.resize(*spec)
+                else:
+                    sheet.resize(rows=max(len(spec), 1), cols=max((len(row) for row in spec), default=1))
+                    sheet.write(0, 0, spec)
+
+            return spreadsheet
+
+    def values(self, title: str, sheet: str, render: str = 'FORMATTED_VALUE') -> list[list]:
+        """Содержимое листа (как его вернул бы `get_all_values`, без дополнения пустыми ячейками)."""
+
+        with self.lock:
+            spreadsheet = next(s for s in self.spreadsheets.values() if s.title == title)
+            return self._render(spreadsheet.sheet(sheet).read({}), render)
+
+    def client(self, http_client: type = QuotaHTTPClient) -> gspread.Client:
+        """Настоящий `gspread.Client`, запросы которого уходят в этот сервис."""
+
+        return gspread.Client(auth=None, session=FakeSheetsSession(self), http_client=http_client)
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.calls.clear()
+            self.calls_by_table.clear()
+            self.throttled = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            reads = sum(n for op, n in self.calls.items() if op in READ_OPERATIONS)
+            return {
+                'calls': sum(self.calls.values()),
+                'read': reads,
+                'write': sum(self.calls.values()) - reads,
+                'throttled': self.throttled,
+                'operations': dict(self.calls),
+                'tables': dict(self.calls_by_table),
+            }
+
+    # ─── HTTP ───
+
+    def handle(self, method: str, url: str, params: Optional[dict], body: Any) -> tuple[int, dict]:
+        method = method.upper()
+        kind = 'read' if method == 'GET' else 'write'
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self.lock:
+            if not self._take_quota(kind):
+                self.throttled += 1
+                return 429, _error(429, f"Quota exceeded for quota metric '{kind.capitalize()} requests' "
+                                        f"and limit '{kind.capitalize()} requests per minute per user'",
+                                   'RESOURCE_EXHAUSTED')
+
+            try:
+                op, table, result = self._dispatch(method, urlsplit(url).path, params or {}, body or {})
+            except FakeSheetsError as e:
+                return e.code, _error(e.code, str(e), e.status)
+
+            self.calls[op] += 1
+            if table:
+                self.calls_by_table[table] += 1
+
+            return 200, result
+
+    def _take_quota(self, kind: str) -> bool:
+        now = time.monotonic()
+        sent = self.sent[kind]
+
+        while sent and now - sent[0] >= self.window:
+            sent.popleft()
+
+        if len(sent) >= self.limits[kind]:
+            return False
+
+        sent.append(now)
+        return True
+
+    def _dispatch(self, method: str, path: str, params: dict, body: dict) -> tuple[str, str, dict]:
+        if path == DRIVE_FILES:
+            return 'drive.files.list', '', self._list_files(params)
+
+        if not path.startswith(SHEETS_PREFIX):
+            raise FakeSheetsError(404, f"Не поддерживается: {method} {path}", 'NOT_FOUND')
+
+        key, _, rest = path[len(SHEETS_PREFIX):].partition('/')
+        key, _, action = key.partition(':')
+
+        spreadsheet = self.spreadsheets.get(key)
+        if spreadsheet is None:
+            raise FakeSheetsError(404, 'Requested entity was not found.', 'NOT_FOUND')
+
+        if not rest:
+            if action == 'batchUpdate':
+                return 'spreadsheets.batchUpdate', spreadsheet.title, self._batch_update(spreadsheet, body)
+            return 'spreadsheets.get', spreadsheet.title, spreadsheet.metadata()
+
+        if not rest.startswith('values'):
+            raise FakeSheetsError(404, f"Не поддерживается: {method} {path}", 'NOT_FOUND')
+
+        rest = unquote(rest[len('values'):])
+
+        if rest == ':batchGet':
+            ranges = params.get('ranges') or []
+            ranges = [ranges] if isinstance(ranges, str) else ranges
+            return 'values.batchGet', spreadsheet.title, {
+                'spreadsheetId': key,
+                'valueRanges': [self._get(spreadsheet, name, params) for name in ranges],
+            }
+
+        if rest == ':batchUpdate':
+            input_option = body.get('valueInputOption', 'RAW')
+            responses = [self._update(spreadsheet, item['range'], item.get('values') or [], input_option)
+                         for item in body.get('data', [])]
+            return 'values.batchUpdate', spreadsheet.title, {
+                'spreadsheetId': key,
+                'totalUpdatedCells': sum(r['updatedCells'] for r in responses),
+                'responses': responses,
+            }
+
+        if rest == ':batchClear':
+            for name in body.get('ranges', []):
+                sheet, grid = spreadsheet.parse_range(name)
+                sheet.clear(grid)
+            return 'values.batchClear', spreadsheet.title, {
+                'spreadsheetId': key, 'clearedRanges': body.get('ranges', [])}
+
+        name, action = rest.lstrip('/'), ''
+        for suffix in (':clear', ':append'):
+            if name.endswith(suffix):
+                name, action = name[:-len(suffix)], suffix[1:]
+
+        if action == 'clear':
+            sheet, grid = spreadsheet.parse_range(name)
+            sheet.clear(grid)
+            return 'values.clear', spreadsheet.title, {'spreadsheetId': key, 'clearedRange': name}
+
+        if action == 'append':
+            sheet, _ = spreadsheet.parse_range(name)
+            values = body.get('values') or []
+            start = len(sheet.read({}))
+            sheet.resize(rows=max(sheet.rows, start + len(values)))
+            update = self._update(spreadsheet, f"'{sheet.title}'!{rowcol_to_a1(start + 1, 1)}",
+                                  values, params.get('valueInputOption', 'RAW'))
+            return 'values.append', spreadsheet.title, {'spreadsheetId': key, 'updates': update}
+
+        if method == 'GET':
+            return 'values.get', spreadsheet.title, self._get(spreadsheet, name, params)
+
+        return 'values.update', spreadsheet.title, self._update(
+            spreadsheet, name, body.get('values') or [], params.get('valueInputOption', 'RAW'))
+
+    def _list_files(self, params: dict) -> dict:
+        match = _NAME_QUERY.search(params.get('q', ''))
+
+        return {
+            'kind': 'drive#fileList',
+            'files': [
+                {'id': s.id, 'name': s.title, 'createdTime': '2025-01-01T00:00:00.000Z',
+                 'modifiedTime': '2025-01-01T00:00:00.000Z'}
+                for s in self.spreadsheets.values() if match is None or s.title == match.group(1)
+            ],
+        }
+
+    def _get(self, spreadsheet: FakeSpreadsheet, name: str, params: dict) -> dict:
+        sheet, grid = spreadsheet.parse_range(name)
+        values = self._render(sheet.read(grid), params.get('valueRenderOption', 'FORMATTED_VALUE'))
+
+        if params.get('majorDimension') == 'COLUMNS':
+            width = max((len(row) for row in values), default=0)
+            values = [_trim([row[c] if c < len(row) else '' for row in values]) for c in range(width)]
+
+        response = {'range': name, 'majorDimension': params.get('majorDimension', 'ROWS')}
+        if values:
+            response['values'] = values
+        return response
+
+    def _update(self, spreadsheet: FakeSpreadsheet, name: str, values: list[list], input_option: str) -> dict:
+        sheet, grid = spreadsheet.parse_range(name)
+
+        if input_option == 'USER_ENTERED':
+            values = [[_user_entered(value) for value in row] for row in values]
+
+        row, col = grid.get('startRowIndex', 0), grid.get('startColumnIndex', 0)
+        sheet.write(row, col, values)
+
+        width = max((len(line) for line in values), default=0)
+        return {
+            'spreadsheetId': spreadsheet.id,
+            'updatedRange': name,
+            'updatedRows': len(values),
+            'updatedColumns': width,
+            'updatedCells': sum(len(line) for line in values),
+        }
+
+    def _render(self, values: list[list], render: str) -> list[list]:
+        if render == 'FORMATTED_VALUE':
+            return [[_formatted(value) for value in row] for row in values]
+        return [['' if value is None else value for value in row] for row in values]
+
+    def _add_sheet(self, spreadsheet: FakeSpreadsheet, title: str, rows: int = 1000, cols: int = 26,
+                   index: Optional[int] = None) -> FakeSheet:
+
+        if any(sheet.title == title for sheet in spreadsheet.sheets):
+            raise FakeSheetsError(
+                400, f'Invalid requests[0].addSheet: A sheet with the name "{title}" already exists. '
+                     f'Please enter another name.', 'INVALID_ARGUMENT')
+
+        sheet = FakeSheet(next(self.ids), title, len(spreadsheet.sheets), rows, cols)
+        spreadsheet.sheets.insert(len(spreadsheet.sheets) if index is None else index, sheet)
+
+        for i, item in enumerate(spreadsheet.sheets):
+            item.index = i
+
+        return sheet
+
+    def _sheet_by_id(self, spreadsheet: FakeSpreadsheet, sheet_id: int) -> FakeSheet:
+        for sheet in spreadsheet.sheets:
+            if sheet.sheet_id == sheet_id:
+                return sheet
+        raise FakeSheetsError(400, f"No grid with id: {sheet_id}", 'INVALID_ARGUMENT')
+
+    def _batch_update(self, spreadsheet: FakeSpreadsheet, body: dict) -> dict:
+        replies = []
+
+        for request in body.get('requests', []):
+            reply = {}
+
+            if 'addSheet' in request:
+                props = request['addSheet'].get('properties', {})
+                grid = props.get('gridProperties', {})
+                sheet = self._add_sheet(spreadsheet, props['title'], grid.get('rowCount', 1000),
+                                        grid.get('columnCount', 26), props.get('index'))
+                reply = {'addSheet': {'properties': sheet.properties()}}
+
+            elif 'deleteSheet' in request:
+                sheet = self._sheet_by_id(spreadsheet, request['deleteSheet']['sheetId'])
+                spreadsheet.sheets.remove(sheet)
+
+            elif 'updateSheetProperties' in request:
+                props = request['updateSheetProperties']['properties']
+                sheet = self._sheet_by_id(spreadsheet, props.get('sheetId', 0))
+                grid = props.get('gridProperties', {})
+                sheet.resize(grid.get('rowCount'), grid.get('columnCount'))
+                sheet.title = props.get('title', sheet.title)
+
+            elif 'appendDimension' in request:
+                dimension = request['appendDimension']
+                sheet = self._sheet_by_id(spreadsheet, dimension['sheetId'])
+                if dimension['dimension'] == 'ROWS':
+                    sheet.resize(rows=sheet.rows + dimension['length'])
+                else:
+                    sheet.resize(cols=sheet.cols + dimension['length'])
+
+            # остальные запросы (форматирование, фильтры…) на значения не влияют
+            replies.append(reply)
+
+        return {'spreadsheetId': spreadsheet.id, 'replies': replies}
+
+
+READ_OPERATIONS = {'drive.files.list', 'spreadsheets.get', 'values.get', 'values.batchGet'}
+
+
+def _error(code: int, message: str, status: str) -> dict:
+    return {'error': {'code': code, 'message': message, 'status': status}}
+
+
+class FakeSheetsSession:
+    """Вместо `requests.Session` для `gspread.HTTPClient`: запросы уходят в `FakeSheetsService`."""
+
+    def __init__(self, service: FakeSheetsService) -> None:
+        self.service = service
+        self.headers: dict[str, str] = {}
+
+    def request(self, method: str, url: str, json: Any = None, params: Optional[dict] = None,
+                **kwargs: Any) -> requests.Response:
+
+        # как при настоящей отправке: тело должно сериализоваться в JSON (numpy-типы, NaN — ошибка)
+        body = _roundtrip(json) if json is not None else None
+        # requests не отправляет параметры со значением None
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+
+        status, payload = self.service.handle(method, url, params, body)
+
+        response = requests.Response()
+        response.status_code = status
+        response.url = url
+        response.headers['Content-Type'] = 'application/json; charset=UTF-8'
+        response._content = _dumps(payload).encode('utf-8')
+        response.encoding = 'utf-8'
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, allow_nan=False)
+
+
+def _roundtrip(value: Any) -> Any:
+    return json.loads(_dumps(value))
@@ -0,0 +1,165 @@
+from typing import Iterable, Iterator
+import itertools
+import random
+
+
+def make_wb_cards(count: int, seed: int = 42) -> list[dict]:
+    """Синтетические карточки в формате ответа WB `content/v2/get/cards/list`."""
+    return list(iter_wb_cards(count, seed))
+
+
+def iter_wb_cards(count: int, seed: int = 42) -> Iterator[dict]:
+
+    rnd = random.Random(seed)
+    brands = [f'Бренд {i}' for i in range(40)]
+    subjects = ['Платья', 'Футболки', 'Брюки', 'Куртки', 'Обувь', 'Сумки']
+    sizes = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+
+    for i in range(count):
+        nm_id = 100_000_000 + i
+        size_count = rnd.randint(1, 5)
+
+        yield {
+            'nmID': nm_id,
+            'imtID': 50_000_000 + i // 3,
+            'nmUUID': f'0000-{i:08d}',
+            'subjectID': 100 + i % len(subjects),
+            'subjectName': subjects[i % len(subjects)],
+            'vendorCode': f'ART-{i:06d}',
+            'brand': rnd.choice(brands),
+            'title': f'Товар {i} ' + 'x' * rnd.randint(10, 60),
+            'description': 'Описание товара ' * rnd.randint(20, 80),
+            'photos': [
+                {'big': f'https://basket-01.wbbasket.ru/vol{i}/images/big/{p}.webp',
+                 'c246x328': f'https://basket-01.wbbasket.ru/vol{i}/images/c246x328/{p}.webp'}
+                for p in range(rnd.randint(0, 4))
+            ],
+            'dimensions': {'width': rnd.randint(5, 60), 'height': rnd.randint(5, 60),
+                           'length': rnd.randint(5, 60), 'isValid': True},
+            'characteristics': [{'id': c, 'name': f'Характеристика {c}', 'value': [f'значение {c}']}
+                                for c in range(rnd.randint(3, 10))],
+            'sizes': [
+                {'chrtID': nm_id * 10 + s, 'techSize': sizes[s], 'wbSize': sizes[s],
+                 'skus': [f'20{nm_id}{s}{k}' for k in range(rnd.randint(0, 2))]}
+                for s in range(size_count)
+            ],
+            'createdAt': '2024-03-01T10:00:00Z',
+            'updatedAt': f'2025-07-{1 + i % 28:02d}T10:{i % 60:02d}:00.000Z',
+        }
+
+
+def make_wb_sales_cards(count: int, seed: int = 42) -> list[dict]:
+    """Синтетические карточки в формате ответа WB `nm-report/detail` (`data.cards`)."""
+
+    rnd = random.Random(seed)
+
+    def period(begin: str, end: str) -> dict:
+        orders = rnd.randint(0, 200)
+        return {
+            'begin': begin, 'end': end,
+            'openCardCount': rnd.randint(0, 5000), 'addToCartCount': rnd.randint(0, 500),
+            'ordersCount': orders, 'ordersSumRub': orders * rnd.randint(300, 5000),
+            'buyoutsCount': rnd.randint(0, orders), 'buyoutsSumRub': rnd.randint(0, 100_000),
+            'cancelCount': rnd.randint(0, 20), 'cancelSumRub': rnd.randint(0, 20_000),
+            'avgOrdersCountPerDay': round(orders / 7, 1), 'avgPriceRub': rnd.randint(300, 5000),
+            'conversions': {'addToCartPercent': rnd.randint(0, 40), 'cartToOrderPercent': rnd.randint(0, 60),
+                            'buyoutsPercent': rnd.randint(0, 100)},
+        }
+
+    return [{
+        'nmID': 100_000_000 + i,
+        'vendorCode': f'ART-{i:06d}',
+        'brandName': f'Бренд {i % 40}',
+        'tags': [],
+        'object': {'id': 100 + i % 6, 'name': f'Категория {i % 6}'},
+        'statistics': {
+            'selectedPeriod': period('2025-07-07 00:00:00', '2025-07-13 23:59:59'),
+            'previousPeriod': period('2025-06-30 00:00:00', '2025-07-06 23:59:59'),
+            'periodComparison': {
+                **{key: rnd.randint(-100, 300) for key in (
+                    'openCardDynamics', 'addToCartDynamics', 'ordersCountDynamics', 'ordersSumRubDynamics',
+                    'buyoutsCountDynamics', 'buyoutsSumRubDynamics', 'cancelCountDynamics',
+                    'cancelSumRubDynamics', 'avgOrdersCountPerDayDynamics', 'avgPriceRubDynamics')},
+                'conversions': {'addToCartPercent': rnd.randint(-20, 20), 'cartToOrderPercent': rnd.randint(-20, 20),
+                                'buyoutsPercent': rnd.randint(-20, 20)},
+            },
+        },
+        'stocks': {'stocksMp': rnd.randint(0, 100), 'stocksWb': rnd.randint(0, 1000)},
+    } for i in range(count)]
+
+
+def make_oz_products(count: int, seed: int = 42, attributes: int = 30) -> list[dict]:
+    """Синтетические товары в формате ответа Ozon `v4/product/info/attributes` (`result`)."""
+
+    rnd = random.Random(seed)
+    wanted = [31, 8292, 10096, 10097, 4501, 4503]
+    other = list(range(9000, 9000 + 300))
+
+    products = []
+
+    for i in range(count):
+        ids = rnd.sample(other, attributes - 4) + rnd.sample(wanted, 4)
+        rnd.shuffle(ids)
+
+        products.append({
+            'id': 700_000_000 + i,
+            'sku': 1_500_000_000 + i,
+            'offer_id': f'OZ-{i:06d}',
+            'name': f'Товар {i} ' + 'x' * rnd.randint(10, 60),
+            'barcode': f'46{i:011d}',
+            'width': rnd.randint(50, 600),
+            'height': rnd.randint(50, 600),
+            'depth': rnd.randint(10, 200),
+            'primary_image': f'https://cdn1.ozone.ru/s3/multimedia-{i}.jpg',
+            'attributes': [
+                {'id': attr_id, 'complex_id': 0,
+                 'values': [] if rnd.random() < 0.05 else
+                 [{'dictionary_value_id': attr_id * 10 + v, 'value': f'значение {attr_id}.{v}'}
+                  for v in range(rnd.randint(1, 3))]}
+                for attr_id in ids
+            ],
+        })
+
+    return products
+
+
+def make_wb_fullstats(campaigns: int, cards: int = 2_000, days: int = 7, seed: int = 42) -> list[dict]:
+    """Синтетическая статистика в формате ответа WB `adv/v2/fullstats` (кампании → дни → приложения → nm)."""
+
+    rnd = random.Random(seed)
+    apps = [1, 32, 64]
+
+    def nm_row() -> dict:
+        views = rnd.randint(0, 5000)
+        clicks = rnd.randint(0, views // 10 + 1) if views else 0
+        spent = round(rnd.uniform(0, 500), 2)
+        return {
+            'nmId': 100_000_000 + rnd.randrange(cards),
+            'name': f'Товар {rnd.randrange(cards)}',
+            'views': views, 'clicks': clicks,
+            'ctr': round(clicks / views * 100, 2) if views else 0,
+            'cpc': round(spent / clicks, 2) if clicks else 0,
+            'sum': spent,
+            'atbs': rnd.randint(0, 20), 'orders': rnd.randint(0, 10), 'cr': 0, 'shks': rnd.randint(0, 12),
+            'sum_price': rnd.randint(0, 50_000),
+        }
+
+    return [{
+        'advertId': 20_000_000 + c,
+        'views': 0, 'clicks': 0, 'sum': 0,
+        'days': [{
+            # WB отдаёт дату дня с временем и поясом
+            'date': f'2025-07-{1 + d:02d}T00:00:00+03:00',
+            'views': 0, 'clicks': 0, 'sum': 0,
+            'apps': [{'appType': app, 'views': 0, 'sum': 0,
+                      'nm': [nm_row() for _ in range(rnd.randint(0, 6))]}
+                     for app in rnd.sample(apps, rnd.randint(1, len(apps)))],
+        } for d in range(days)],
+    } for c in range(campaigns)]
+
+
+def paginate(items: Iterable, page_size: int) -> Iterator[list]:
+    items = iter(items)
+
+    while page := list(itertools.islice(items, page_size)):
+        yield page
@@ -0,0 +1,241 @@
+"""
+⏱ Регрессия и бенчмарк `merge_and_transform_stocks_with_idkt`: две широкие группировки по всем
+колонкам (как было) против группировки по коду описания карточки.
+
+Синтетический кабинет похож на ответ `supplier/stocks` + `get_cards`: несколько складов на баркод
+с разными датами и ценами, карточки без остатков (left_only), остатки без карточки (right_only),
+размеры без баркода (`'None'`), пропуски в фото / артикуле поставщика / бренде.
+Перед замером проверяется, что оба варианта дают побайтно одинаковые таблицы (значения, dtypes,
+индекс и порядок строк) — для обычного кабинета и для Мишневой / Шелудько, а также для кабинета,
+где у всех баркодов есть остатки (после merge другие dtypes).
+С компактными типами (`compact_frame`, как после `get_stocks` / `get_cards`) проверяются значения
+и порядок строк (dtypes колонок там свои), и печатается объём таблиц до и после.
+
+Запуск:
+    py -m scripts.bench.group_stocks --cards 20000
+"""
+from scripts.postprocessors.group_stocks import merge_and_transform_stocks_with_idkt
+from scripts.utils.dtypes import compact_frame, frame_memory_mb
+import argparse
+import time
+import pandas as pd
+import numpy as np
+
+
+def legacy_merge_and_transform_stocks_with_idkt(stocks: pd.DataFrame, IDKT: pd.DataFrame, name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    stocks['Дата Обновления'] = pd.to_datetime(
+        stocks['Дата Обновления'], errors='coerce').dt.date
+
+    # (расчёт «последней цены» в df_sort в результат не попадал — здесь опущен)
+
+    type_map = {
+        'Артикул WB': int,
+        'Баркод': str,
+        'Размер': str
+    }
+    for df in [stocks, IDKT]:
+        for col, dtype in type_map.items():
+            df[col] = df[col].astype(dtype)
+
+    IDKT['ID KT'] = IDKT['ID KT'].astype(int)
+
+    result = pd.merge(
+        IDKT,
+        stocks,
+        on=['Артикул WB', 'Баркод'],
+        how='outer',
+        indicator=True,
+        suffixes=('_IDKT', '_stocks')
+    )
+
+    result = result.drop(columns=[col for col in result.columns if col.endswith('_stocks')] + ['warehouseName',
+                                                                                             'inWayToClient', 'inWayFromClient',
+                                                                                             'category', 'subject', 'isRealization', 'SCCode', 'isSupply'], errors='ignore')
+    result.columns = [
+        col.replace('_IDKT', '') for col in result.columns
+    ]
+
+    num_col = ['Цена', 'Скидка',
+               'Итого остатки', 'Ширина', 'Высота', 'Длина', 'quantity']
+    string_cols = ['Бренд', 'Размер', 'Категория', 'Наименование']
+
+    result['Дата Обновления'] = result['Дата Обновления'].astype(str)
+
+    result[['Цена', 'Скидка']] = result.groupby(
+        'Артикул WB')[['Цена', 'Скидка']].ffill()
+    result[num_col] = result[num_col].fillna(0)
+    result[string_cols] = result[string_cols].fillna('-')
+
+    result = result[result['_merge'] != 'right_only']
+    result = result.drop(columns='_merge')
+
+    result = result.groupby([
+        col for col in result.columns if col != 'Итого остатки' and col != 'quantity'
+    ]).agg({
+        'quantity': 'sum',
+        'Итого остатки': 'sum'
+    }).reset_index()
+
+    result['Цена до СПП'] = result['Цена'] * \
+        (1 - result['Скидка']/100)
+
+    seller_article = result.filter([
+        'Артикул WB', 'Баркод', 'Артикул поставщика', 'Размер'
+    ])
+
+    result[['Цена', 'Скидка', 'Цена до СПП']] = result.groupby(
+        'Артикул WB')[['Цена', 'Скидка', 'Цена до СПП']].transform('first')
+
+    result = result.groupby([
+        col for col in result.columns if col != 'Итого остатки'
+    ])['Итого остатки'].sum().reset_index()
+
+    result['Кабинет'] = name
+
+    new_order = [
+        'Артикул WB', 'ID KT', 'Артикул поставщика', 'Бренд', 'Наименование', 'Категория',
+        'Итого остатки', 'Цена', 'Скидка', 'Цена до СПП', 'Фото', 'Ширина', 'Высота', 'Длина', 'Кабинет', 'Баркод', 'Размер', 'Дата Обновления', 'quantity'
+    ]
+
+    result = result[new_order].rename(columns={'quantity': 'Остатки'})
+    result = result.sort_values('Итого остатки', ascending=False)
+
+    if name in ('Мишнева', 'Шелудько'):
+        result = result.drop(columns=['Дата Обновления', 'Остатки', 'Баркод', 'Размер'])
+
+    return result, seller_article
+
+
+def make_cabinet(cards: int, seed: int = 42, complete: bool = False) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (stocks после `get_stocks`, IDKT после `get_cards`).
+    `complete` — у каждого баркода есть остатки и нет остатков без карточки (другие dtypes после merge).
+    """
+
+    rng = np.random.default_rng(seed)
+    sizes = np.array(['XS', 'S', 'M', 'L', 'XL', '0'])
+    brands = np.array(['Havva', 'Gabriel', 'UCARE', None], dtype=object)
+
+    # IDKT: 1–5 размеров на карточку, у части размеров нет баркода
+    per_card = rng.integers(1, 6, cards)
+    nm_id = np.repeat(100_000_000 + rng.permutation(cards * 3)[:cards], per_card)
+    rows = len(nm_id)
+    card = np.repeat(np.arange(cards), per_card)
+
+    barcode = (2_040_000_000_000 + rng.permutation(rows * 2)[:rows]).astype(str).astype(object)
+    barcode[rng.random(rows) < 0.03] = None
+
+    photo = np.char.add('https://basket.wbbasket.ru/', nm_id.astype(str)).astype(object)
+    photo[np.isin(card, np.flatnonzero(rng.random(cards) < 0.05))] = None
+
+    vendor = np.char.add('ART-', card.astype(str)).astype(object)
+    vendor[np.isin(card, np.flatnonzero(rng.random(cards) < 0.01))] = None
+
+    idkt = pd.DataFrame({
+        'Артикул WB': nm_id,
+        'ID KT': (nm_id // 3).astype(np.int64),
+        'Наименование': np.char.add('Товар ', card.astype(str)),
+        'Бренд': brands[rng.integers(0, len(brands), cards)][card],
+        'Размер': sizes[rng.integers(0, len(sizes), rows)],
+        'Баркод': barcode,
+        'Артикул поставщика': vendor,
+        'Категория': np.array(['Платья', 'Блузки', 'Юбки'])[card % 3],
+        'Фото': photo,
+        'Ширина': rng.integers(1, 60, cards)[card].astype(float),
+        'Высота': rng.integers(1, 60, cards)[card].astype(float),
+        'Длина': rng.integers(1, 60, cards)[card].astype(float),
+    })
+
+    # stocks: 70% баркодов на 1–6 складах, плюс остатки без карточки
+    have_stock = np.arange(rows) if complete else np.flatnonzero(rng.random(rows) < 0.7)
+    warehouses = rng.integers(1, 7, len(have_stock))
+    source = np.repeat(have_stock, warehouses)
+    extra = rng.integers(0, 200_000_000, 0 if complete else max(rows // 50, 1))
+
+    count = len(source) + len(extra)
+    stock_nm = np.concatenate([nm_id[source], extra])
+    stock_barcode = np.concatenate([idkt['Баркод'].to_numpy()[source].astype(str),
+                                    (3_000_000_000_000 + np.arange(len(extra))).astype(str)])
+
+    price = np.concatenate([(nm_id[source] % 5000 + 500).astype(float), np.full(len(extra), 999.0)])
+    changed = rng.random(count) < 0.2
+    price[changed] += rng.integers(-200, 200, changed.sum())
+
+    stocks = pd.DataFrame({
+        'Дата Обновления': (pd.Timestamp('2025-07-01')
+                            + pd.to_timedelta(rng.integers(0, 10, count), unit='D')
+                            + pd.to_timedelta(rng.integers(0, 86_400, count), unit='s')).strftime('%Y-%m-%dT%H:%M:%S'),
+        'warehouseName': np.array(['Коледино', 'Электросталь', 'Казань', 'Тула'])[rng.integers(0, 4, count)],
+        'Артикул поставщика': np.char.add('ART-', stock_nm.astype(str)),
+        'Артикул WB': stock_nm,
+        'Баркод': stock_barcode,
+        'quantity': rng.integers(0, 50, count),
+        'inWayToClient': rng.integers(0, 5, count),
+        'inWayFromClient': rng.integers(0, 5, count),
+        'Итого остатки': rng.integers(0, 60, count),
+        'category': 'Одежда',
+        'subject': 'Платья',
+        'Бренд': 'Havva',
+        'Размер': sizes[rng.integers(0, len(sizes), count)],
+        'Цена': price,
+        'Скидка': rng.integers(0, 70, count),
+        'isSupply': True,
+        'isRealization': False,
+        'SCCode': 'Tech',
+    }).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+    return stocks, idkt
+
+
+def check_identical(stocks: pd.DataFrame, idkt: pd.DataFrame) -> None:
+    for name in ('Галилова', 'Мишнева'):
+        legacy = legacy_merge_and_transform_stocks_with_idkt(stocks.copy(), idkt.copy(), name)
+        current = merge_and_transform_stocks_with_idkt(stocks.copy(), idkt.copy(), name)
+
+        for old, new in zip(legacy, current):
+            pd.testing.assert_frame_equal(old, new, check_exact=True)
+            assert old.index.equals(new.index), f"{name}: индекс отличается"
+            assert old.to_csv() == new.to_csv(), f"{name}: таблицы отличаются"
+
+
+def check_same_values(stocks: pd.DataFrame, idkt: pd.DataFrame) -> None:
+    compact_stocks, compact_idkt = compact_frame(stocks), compact_frame(idkt)
+
+    for name in ('Галилова', 'Мишнева'):
+        legacy = legacy_merge_and_transform_stocks_with_idkt(stocks.copy(), idkt.copy(), name)
+        current = merge_and_transform_stocks_with_idkt(compact_stocks.copy(), compact_idkt.copy(), name)
+
+        for old, new in zip(legacy, current):
+            new = new.astype({col: object for col in new.columns if isinstance(new[col].dtype, pd.CategoricalDtype)})
+            pd.testing.assert_frame_equal(old, new, check_dtype=False)
+            assert old.index.equals(new.index), f"{name}: индекс отличается"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cards', type=int, default=20_000)
+    args = parser.parse_args()
+
+    stocks, idkt = make_cabinet(args.cards)
+
+    check_identical(stocks, idkt)
+    check_identical(*make_cabinet(args.cards // 10, complete=True))
+    check_same_values(stocks, idkt)
+    check_same_values(*make_cabinet(args.cards // 10, complete=True))
+    print(f"✅ Результаты совпадают: stocks {stocks.shape}, IDKT {idkt.shape}")
+
+    compact_stocks, compact_idkt = compact_frame(stocks), compact_frame(idkt)
+    for label, before, after in (('stocks', stocks, compact_stocks), ('IDKT', idkt, compact_idkt)):
+        print(f"{label:<20}{frame_memory_mb(before):>8.1f} → {frame_memory_mb(after):.1f} МБ")
+
+    for variant, func in (('по всем колонкам', legacy_merge_and_transform_stocks_with_idkt),
+                          ('по коду карточки', merge_and_transform_stocks_with_idkt)):
+        begin = time.perf_counter()
+        func(stocks.copy(), idkt.copy(), 'Галилова')
+        print(f"{variant:<20}{time.perf_counter() - begin:>10.2f} с")
+
+    begin = time.perf_counter()
+    merge_and_transform_stocks_with_idkt(compact_stocks.copy(), compact_idkt.copy(), 'Галилова')
+    print(f"{'компактные типы':<20}{time.perf_counter() - begin:>10.2f} с")
+
+# py -m scripts.bench.group_stocks
@@ -0,0 +1,107 @@
+"""
+⏱ Бенчмарк разбора карточек Ozon: словарь на товар + if/elif по id атрибутов (как было в
+`read_product_info_json`) против `ProductInfoBuilder` с таблицей «id атрибута → колонка».
+
+Страницы берутся из записанных ответов `v4/product/info/attributes` (`--json`: файл с одним
+ответом или списком ответов) или генерируются (`--items`). JSON разбирается заранее: замеряется
+только разбор товаров (страницы подаются по одной — как при постраничной загрузке). Перед
+замером проверяется, что оба варианта дают одинаковые таблицы.
+
+Запуск:
+    py -m scripts.bench.oz_attributes --items 100000
+    py -m scripts.bench.oz_attributes --json cache/oz_attributes.json
+"""
+from scripts.pipelines_oz.get_cards_list_oz import ProductInfoBuilder
+from scripts.bench.fixtures import make_oz_products, paginate
+import argparse
+import json
+import time
+import pandas as pd
+
+
+def legacy_read_product_info(pages: list[list[dict]]) -> pd.DataFrame:
+    all_data = []
+
+    for page in pages:
+        for item in page:
+            info = {
+                'Бренд в одежде и обуви': None,
+                'Объединить на одной карточке': None,
+                'Цвет товара': None,
+                'Тип': None,
+                'Артикул': item.get('offer_id'),
+                'Название товара': item.get('name'),
+                'Штрихкод': item.get('barcode'),
+                'Ширина упаковки, мм': item.get('width'),
+                'Высота упаковки, мм': item.get('height'),
+                'Длина упаковки, мм': item.get('depth'),
+                'Ссылка на главное фото': item.get('primary_image'),
+                'sku': item.get('sku')
+            }
+
+            for attr in item.get('attributes', []):
+                attr_id = attr.get('id')
+                values = attr.get('values', [])
+
+                if not values:
+                    continue
+
+                value = values[0].get('value')
+
+                if attr_id == 31:
+                    info['Бренд в одежде и обуви'] = value
+                elif attr_id == 8292:
+                    info['Объединить на одной карточке'] = value
+                elif attr_id in (10096, 10097):
+                    info['Цвет товара'] = value
+                elif attr_id in (4501, 4503):
+                    info['Тип'] = value
+
+            all_data.append(info)
+
+    return pd.DataFrame(all_data)
+
+
+def builder_read_product_info(pages: list[list[dict]]) -> pd.DataFrame:
+    builder = ProductInfoBuilder()
+
+    for page in pages:
+        builder.add_page(page)
+
+    return builder.frame()
+
+
+def load_pages(path: str) -> list[list[dict]]:
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+
+    responses = data if isinstance(data, list) else [data]
+    return [response['result'] for response in responses]
+
+
+def timed(func, pages: list[list[dict]]) -> float:
+    begin = time.perf_counter()
+    func(pages)
+    return time.perf_counter() - begin
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, default=100_000)
+    parser.add_argument('--json', help='записанные ответы product_info_attributes')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.json:
+        pages = load_pages(args.json)
+    else:
+        pages = list(paginate(make_oz_products(args.items), 1000))
+
+    legacy, builder = legacy_read_product_info(pages), builder_read_product_info(pages)
+    pd.testing.assert_frame_equal(legacy, builder)
+    print(f"✅ Таблицы совпадают: {builder.shape}, страниц: {len(pages)}")
+
+    for variant, func in (('if/elif', legacy_read_product_info), ('по таблице', builder_read_product_info)):
+        best = min(timed(func, pages) for _ in range(args.repeat))
+        print(f"{variant:<15}{best:>10.2f} с")
+# py -m scripts.bench.oz_attributes
@@ -0,0 +1,118 @@
+"""
+⏱ Бенчмарк `prepare_values_for_sheets`: поячеечный цикл (как было) против поколоночной конвертации.
+
+Таблица похожа на сводную матрицу остатков: id (int64), строки с пропусками, float с целыми и
+дробными значениями и NaN, даты, смешанная колонка баркодов (int / str / None) и bool.
+Перед замером проверяется, что оба варианта дают одинаковые строки (значения и тип: int / float / str).
+
+Запуск:
+    py -m scripts.bench.prepare_values --rows 200000
+"""
+from scripts.utils.prepare_values_df import prepare_values_for_sheets
+import argparse
+import time
+import pandas as pd
+import numpy as np
+
+
+def legacy_prepare_values(df: pd.DataFrame) -> list[list]:
+    values = []
+
+    for row in df.to_numpy():
+        new_row = []
+        for v in row:
+            if pd.isna(v):
+                new_row.append('')
+            elif isinstance(v, (int, float, np.integer, np.floating)):
+                if isinstance(v, (float, np.floating)) and v.is_integer():
+                    new_row.append(int(v))
+                else:
+                    new_row.append(v)
+            elif isinstance(v, pd.Timestamp):
+                new_row.append(v.strftime("%Y-%m-%d"))
+            else:
+                new_row.append(str(v))
+
+        values.append(new_row)
+    return values
+
+
+def make_stock_matrix(rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    def with_gaps(values: np.ndarray, share: float = 0.05) -> np.ndarray:
+        values = values.astype(object)
+        values[rng.random(rows) < share] = None
+        return values
+
+    brands = np.array(['Havva', 'Gabriel', 'UCARE', 'Aurum', 'Mirshik'])
+    categories = np.array(['Платья', 'Блузки', 'Юбки', 'Брюки', 'Костюмы', 'Футболки'])
+    sizes = np.array(['XS', 'S', 'M', 'L', 'XL', '42', '44', '46', '48', '50'])
+
+    nm_id = 100_000_000 + rng.permutation(rows)
+    barcode = (2_040_000_000_000 + rng.integers(0, 10 ** 9, rows)).astype(object)
+    as_text = rng.random(rows) < 0.3
+    barcode[as_text] = [str(v) for v in barcode[as_text]]
+
+    price = rng.integers(300, 9000, rows).astype(float)
+    price[rng.random(rows) < 0.4] += 0.5
+    price[rng.random(rows) < 0.03] = np.nan
+
+    return pd.DataFrame({
+        'Артикул WB': nm_id,
+        'ID KT': nm_id // 3,
+        'Наименование': with_gaps(np.char.add('Товар ', nm_id.astype(str))),
+        'Бренд': brands[rng.integers(0, len(brands), rows)],
+        'Размер': sizes[rng.integers(0, len(sizes), rows)],
+        'Баркод': barcode,
+        'Артикул поставщика': np.char.add('ART-', rng.integers(0, 50_000, rows).astype(str)),
+        'Категория': categories[rng.integers(0, len(categories), rows)],
+        'Фото': with_gaps(np.char.add('https://basket.wbbasket.ru/', nm_id.astype(str)), 0.2),
+        'Ширина': rng.integers(1, 60, rows).astype(float),
+        'Высота': rng.integers(1, 60, rows).astype(float),
+        'Длина': rng.integers(1, 60, rows).astype(float),
+        'Дата Обновления': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 200, rows), unit='D'),
+        'quantity': rng.integers(0, 500, rows),
+        'Итого остатки': rng.integers(0, 2_000, rows).astype(float),
+        'Цена': price,
+        'Скидка': rng.integers(0, 70, rows).astype(float),
+        'Маржа': rng.normal(0.2, 0.1, rows),
+        'В наличии': rng.random(rows) < 0.7,
+    })
+
+
+def check_identical(df: pd.DataFrame) -> None:
+    def kind(v):
+        if isinstance(v, bool):
+            return 'bool'
+        if isinstance(v, (int, np.integer)):
+            return 'int'
+        if isinstance(v, (float, np.floating)):
+            return 'float'
+        return type(v).__name__
+
+    legacy, vectorised = legacy_prepare_values(df), prepare_values_for_sheets(df)
+
+    assert len(legacy) == len(vectorised)
+
+    for i, (old, new) in enumerate(zip(legacy, vectorised)):
+        assert old == new, f"строка {i}: {old} != {new}"
+        assert list(map(kind, old)) == list(map(kind, new)), f"типы в строке {i}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    df = make_stock_matrix(args.rows)
+
+    check_identical(df)
+    print(f"✅ Значения совпадают: {df.shape}")
+
+    for variant, func in (('поячеечно', legacy_prepare_values), ('по колонкам', prepare_values_for_sheets)):
+        begin = time.perf_counter()
+        func(df)
+        print(f"{variant:<15}{time.perf_counter() - begin:>10.2f} с")
+
+# py -m scripts.bench.prepare_values
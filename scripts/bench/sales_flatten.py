@@ -0,0 +1,76 @@
+"""
+⏱ Бенчмарк разворачивания карточек `report_detail`: рекурсивный `read_to_json` (как было в
+`flatten_sales_cards`), `pd.json_normalize` и `JsonFlattener` по схеме `SALES_CARD_SCHEMA`.
+
+Перед замером проверяется, что значения всех трёх вариантов совпадают (имена колонок у
+`read_to_json` и `json_normalize` переводятся по схеме).
+
+Запуск:
+    py -m scripts.bench.sales_flatten --cards 100000
+"""
+from scripts.postprocessors.group_sales import SALES_CARD_SCHEMA, flatten_sales_cards
+from scripts.bench.fixtures import make_wb_sales_cards, paginate
+from typing import Any
+import argparse
+import time
+import pandas as pd
+
+
+def read_to_json(data: dict[str, Any], parent_key='', sep='_') -> dict[str, Any]:
+
+    items = []
+
+    for k, v in data.items():
+        new_key = f"{parent_key}{sep}{k}" if parent_key else k
+        if isinstance(v, dict):
+            items.extend(read_to_json(v, new_key, sep=sep).items())
+        else:
+            items.append((new_key, v))
+
+    return dict(items)
+
+
+def legacy_flatten(pages: list[list[dict]]) -> pd.DataFrame:
+    frames = [pd.DataFrame([read_to_json(card) for card in cards]) for cards in pages]
+    df = pd.concat(frames, ignore_index=True)
+    return df.rename(columns={path.replace('.', '_'): column for path, column in SALES_CARD_SCHEMA.items()})
+
+
+def normalize_flatten(pages: list[list[dict]]) -> pd.DataFrame:
+    frames = [pd.json_normalize(cards) for cards in pages]
+    df = pd.concat(frames, ignore_index=True)
+    return df.rename(columns=SALES_CARD_SCHEMA)
+
+
+def schema_flatten(pages: list[list[dict]]) -> pd.DataFrame:
+    return pd.concat([flatten_sales_cards(cards) for cards in pages], ignore_index=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cards', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = list(paginate(make_wb_sales_cards(args.cards), 1000))
+    columns = list(SALES_CARD_SCHEMA.values())
+
+    reference = schema_flatten(pages)
+
+    for func in (legacy_flatten, normalize_flatten):
+        pd.testing.assert_frame_equal(func(pages)[columns], reference, check_dtype=False)
+
+    print(f"✅ Значения совпадают: {reference.shape}, страниц: {len(pages)}")
+
+    for variant, func in (('read_to_json', legacy_flatten), ('json_normalize', normalize_flatten),
+                          ('по схеме', schema_flatten)):
+        best = float('inf')
+
+        for _ in range(args.repeat):
+            begin = time.perf_counter()
+            func(pages)
+            best = min(best, time.perf_counter() - begin)
+
+        print(f"{variant:<16}{best:>10.2f} с")
+
+# py -m scripts.bench.sales_flatten
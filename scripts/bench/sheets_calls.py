@@ -0,0 +1,196 @@
+"""
+⏱ Выгрузки в Google Sheets на фейковом API (`scripts.bench.fake_sheets`): сколько вызовов API
+делает каждая задача и сколько она длится при квотах и задержке Google.
+
+Задачи запускаются так же, как в пайплайнах (`get_supplier_stocks`, `get_warehouse_api`,
+`get_stocks_oz`, `get_advertising_report`), на синтетических таблицах; клиент — настоящий
+`gspread.Client` с `QuotaHTTPClient` и `SheetsSession`. Кеш id таблиц и снимки `sync_values`
+лежат во временной папке: первая задача открывает таблицы поиском по Drive, следующие — по id,
+повторная выгрузка остатков отправляет только изменения.
+
+`--check` сверяет число вызовов с `CALL_BUDGET` (регрессия: код выгрузки стал делать больше
+запросов — скрипт завершается с ошибкой).
+
+Запуск:
+    py -m scripts.bench.sheets_calls --window 1 --latency 0.05
+    py -m scripts.bench.sheets_calls --check
+"""
+from functools import partial
+import argparse
+import tempfile
+import time
+import os
+
+import numpy as np
+import pandas as pd
+
+# максимум вызовов API на задачу (после правок выгрузок — обновить)
+CALL_BUDGET = {
+    'all_cabinet_api': 5,
+    'all_cabinet_api_repeat': 3,
+    'all_cabinet_barcodes': 4,
+    'mishneva_sheludko': 13,
+    'update_barcode': 24,
+    'mywarehouse': 4,
+    'oz_matrix': 9,
+    'advert_sales': 20,
+}
+
+
+def make_stocks(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    nm_id = 100_000_000 + rng.permutation(rows * 3)[:rows]
+
+    return pd.DataFrame({
+        'Артикул WB': nm_id,
+        'ID KT': nm_id // 3,
+        'Артикул поставщика': [f'ART-{n}' for n in nm_id],
+        'Бренд': rng.choice(['Havva', 'Gabriel', 'UCARE'], rows),
+        'Итого остатки': rng.integers(0, 100, rows),
+        'Цена': rng.integers(500, 5000, rows).astype(float),
+        'Баркод': (2_040_000_000_000 + nm_id).astype(str),
+    })
+
+
+def make_service(rows: int, args: argparse.Namespace):
+    from scripts.bench.fake_sheets import FakeSheetsService
+    from scripts.utils.config.factory import get_client_info, sheets_names, table_name_mirshik, tables_names
+
+    names, tables = sheets_names(), tables_names()
+    grid = (rows + 100, 30)
+
+    service = FakeSheetsService(read_per_minute=args.server_read, write_per_minute=args.server_write,
+                                window=args.window, latency=args.latency)
+
+    service.create(tables['wb_matrix_complete'], {
+        names['group_stocks_and_idkt']: grid,
+        names['group_all_barcodes']: grid,
+        names['api_mywarehouse']: grid,
+    })
+    # у одного листа Ozon листа ещё нет — задача его создаёт
+    service.create(tables['oz_matrix_complete'], {f"{names['ozon_stocks']}_Havva": 1000})
+
+    for table in get_client_info()['group_map']:
+        service.create(table, {names['api_wb_barcode']: grid, names['api_wb_advert']: 100})
+
+    # в одной таблице лист 'Остатки API' есть, в другой — создаётся
+    first, second = table_name_mirshik().values()
+    service.create(first, {'Остатки API': 1000})
+    service.create(second, {'Лист1': 1000})
+
+    return service
+
+
+def make_jobs(rows: int) -> dict:
+    from scripts.spreadsheet_tools.push_all_cabinet import push_concat_all_cabinet_stocks_to_sheets
+    from scripts.spreadsheet_tools.push_mishneva_sheludko import push_stocks_mishneva_sheludko
+    from scripts.spreadsheet_tools.push_mywarehouse import upload_my_werehouse_df_in_assortment_matrix_full
+    from scripts.spreadsheet_tools.update_barcode_by_tables import update_barcode
+    from scripts.spreadsheet_tools.upload_oz_matrix_gsheet import upload_oz_stocks_oz_matrix
+    from scripts.spreadsheet_tools.upload_to_gsheet_advert_sales import save_in_gsh
+    from scripts.utils.config.factory import get_client_info, sheets_names
+
+    names = sheets_names()
+    cabinets = [name for people in get_client_info()['group_map'].values() for name in people]
+    stocks = {name: make_stocks(rows // len(cabinets), seed) for seed, name in enumerate(cabinets)}
+    barcodes = {name: df[['Артикул WB', 'Артикул поставщика', 'Баркод']] for name, df in stocks.items()}
+
+    # повторная выгрузка: у 2% строк поменялись остатки
+    changed = {}
+    for name, df in stocks.items():
+        df = df.copy()
+        rng = np.random.default_rng(len(df))
+        df.loc[rng.random(len(df)) < 0.02, 'Итого остатки'] += 1
+        changed[name] = df
+
+    mywarehouse = pd.DataFrame({
+        'АртикулМойСклад': [f'ART-{i}' for i in range(rows)],
+        'ОстаткиВсего': np.arange(rows) % 50,
+    })
+
+    push_stocks = partial(push_concat_all_cabinet_stocks_to_sheets,
+                          sheet_name=names['group_stocks_and_idkt'], start_range='A4')
+
+    return {
+        'all_cabinet_api': partial(push_stocks, data=list(stocks.values())),
+        'all_cabinet_api_repeat': partial(push_stocks, data=list(changed.values())),
+        'all_cabinet_barcodes': partial(push_concat_all_cabinet_stocks_to_sheets, data=list(barcodes.values()),
+                                        sheet_name=names['group_all_barcodes'], start_range='A2'),
+        'mishneva_sheludko': partial(push_stocks_mishneva_sheludko,
+                                     data={'Мишнева': stocks[cabinets[0]], 'Шелудько': stocks[cabinets[1]]}),
+        'update_barcode': partial(update_barcode, data={name: (None, df) for name, df in barcodes.items()}),
+        'mywarehouse': partial(upload_my_werehouse_df_in_assortment_matrix_full,
+                               mywerehouse=mywarehouse, start_range='C4', num_cols=4),
+        'oz_matrix': partial(upload_oz_stocks_oz_matrix, DELAY=0,
+                             data={'Havva': stocks[cabinets[0]], 'Gabriel': stocks[cabinets[1]]}),
+        'advert_sales': partial(save_in_gsh, dict_data=stocks, worksheet_name=names['api_wb_advert']),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=5_000, help='строк остатков на все кабинеты')
+    parser.add_argument('--latency', type=float, default=0.0, help='задержка ответа API, сек')
+    parser.add_argument('--window', type=float, default=60.0, help='окно квот, сек (60 — как у Google)')
+    parser.add_argument('--read', type=int, default=60, help='квота клиента на чтение')
+    parser.add_argument('--write', type=int, default=60, help='квота клиента на запись')
+    parser.add_argument('--server-read', type=int, default=60, help='квота API на чтение')
+    parser.add_argument('--server-write', type=int, default=60, help='квота API на запись')
+    parser.add_argument('--only', nargs='*', default=None)
+    parser.add_argument('--check', action='store_true', help='сверить число вызовов с CALL_BUDGET')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_sheets_')
+    os.environ.update({
+        'SHEETS_SNAPSHOT_DIR': os.path.join(workdir, 'snapshots'),
+        'TG_TOKEN': '',
+    })
+
+    from scripts.utils.gspread_client import set_gspread_client
+    from scripts.utils.sheets_scheduler import QuotaHTTPClient, SheetsQuota
+
+    QuotaHTTPClient.quota = SheetsQuota({'read': args.read, 'write': args.write, 'window': args.window})
+    # паузы повторов на 429 сжимаются вместе с окном квоты
+    QuotaHTTPClient.backoff *= args.window / 60
+    QuotaHTTPClient.max_backoff *= args.window / 60
+
+    service = make_service(args.rows, args)
+    jobs = make_jobs(args.rows)
+
+    if args.only:
+        jobs = {name: job for name, job in jobs.items() if name in args.only}
+
+    results = {}
+
+    for name, job in jobs.items():
+        # своя сессия на задачу (как отдельный запуск пайплайна), кеш id таблиц — общий
+        set_gspread_client(service.client(), ids_path=os.path.join(workdir, 'spreadsheet_ids.json'))
+        service.reset_stats()
+
+        begin = time.perf_counter()
+
+        try:
+            job()
+            error = ''
+        except Exception as e:
+            error = f"❌ {type(e).__name__}: {e}"
+
+        results[name] = (time.perf_counter() - begin, service.stats(), error)
+
+    print(f"\n{'задача':<24}{'время':>9}{'вызовов':>9}{'чтение':>8}{'запись':>8}{'429':>6}   операции")
+    for name, (elapsed, stats, error) in results.items():
+        operations = error or ', '.join(f"{op} {n}" for op, n in sorted(stats['operations'].items()))
+        print(f"{name:<24}{elapsed:>8.2f}с{stats['calls']:>9}{stats['read']:>8}{stats['write']:>8}"
+              f"{stats['throttled']:>6}   {operations}")
+
+    if args.check:
+        over = {name: stats['calls'] for name, (_, stats, error) in results.items()
+                if stats['calls'] > CALL_BUDGET.get(name, stats['calls']) or error}
+
+        if over:
+            raise SystemExit('❌ Больше вызовов, чем в CALL_BUDGET (или ошибка): '
+                             + ', '.join(f"{name} {calls} / {CALL_BUDGET.get(name)}" for name, calls in over.items()))
+
+        print('✅ Число вызовов в пределах CALL_BUDGET')
+
+# py -m scripts.bench.sheets_calls --window 1
@@ -1,9 +1,11 @@
 import asyncio
-import aiohttp
 from scripts.utils.setup_logger import make_logger
 import pandas as pd
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.utils.config.factory import get_client_info
+from scripts.utils.rate_limiter import RateLimiter
+from scripts.utils.http_cassette import open_session
+from scripts.utils.tracing import trace_span
 logger = make_logger(__name__, use_telegram=False)
 
 
@@ -25,6 +27,7 @@ async def main_run_ozon(run_func, cabinet_oz: dict[str, dict[str, str]] = None)
         - `client_id: str`
         - `name: str`
         - `sessions: aiohttp.ClientSession`
+        - `limiter: RateLimiter` — общий на все кабинеты, квота считается по `Client-Id`
 
     cabinet_oz : dict[str, dict[str, str]]
         Словарь кабинетов OZON в формате:
@@ -62,26 +65,29 @@ async def main_run_ozon(run_func, cabinet_oz: dict[str, dict[str, str]] = None)
     if cabinet_oz is None:
         cabinet_oz = get_client_info()['api_keys_oz']
 
-    async with aiohttp.ClientSession() as sessions:
-        tasks = [
-            run_func(
-                api_key=api_data['Api-Key'], client_id=api_data['Client-Id'], name=name, sessions=sessions)
+    limiter = RateLimiter()
 
-            for name, api_data in cabinet_oz.items()
-        ]
+    with trace_span('run', engine='ozon', cabinets=len(cabinet_oz)):
+        async with open_session('oz', {name: api_data['Client-Id'] for name, api_data in cabinet_oz.items()}) as sessions:
+            tasks = [
+                run_func(
+                    api_key=api_data['Api-Key'], client_id=api_data['Client-Id'], name=name, sessions=sessions, limiter=limiter)
 
-        response = await asyncio.gather(*tasks, return_exceptions=True)
+                for name, api_data in cabinet_oz.items()
+            ]
 
-        for (name, _), res in zip(cabinet_oz.items(), response):
-            if isinstance(res, Exception):
-                final_report[name] = '❌ Ошибка'
-                msg = f"❌ Ошибка в {name}: {res}"
+            response = await asyncio.gather(*tasks, return_exceptions=True)
 
-                logger.error(msg)
+            for (name, _), res in zip(cabinet_oz.items(), response):
+                if isinstance(res, Exception):
+                    final_report[name] = '❌ Ошибка'
+                    msg = f"❌ Ошибка в {name}: {res}"
 
-            else:
-                result[name] = res
-                final_report[name] = f'✅ {name} выполнен успешно'
+                    logger.error(msg)
+
+                else:
+                    result[name] = res
+                    final_report[name] = f'✅ {name} выполнен успешно'
 
     for name, report in final_report.items():
         send_tg_message(f"{name}: {report}")
@@ -2,6 +2,9 @@
 from scripts.pipelines.get_cards_list import get_cards
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.telegram_logger import send_tg_message
+from scripts.utils.rate_limiter import RateLimiter
+from scripts.utils.single_flight import SingleFlight
+from scripts.utils.tracing import trace_cabinet, trace_span
 from dotenv import load_dotenv
 from typing import Optional
 import pandas as pd
@@ -15,7 +18,9 @@ logger = make_logger(__name__, use_telegram=False)
 
 async def execute_run_cabinet(name: str, api: str,
                               session: aiohttp.ClientSession,
-                              func_name: Optional[str] = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+                              func_name: Optional[str] = None,
+                              limiter: Optional[RateLimiter] = None,
+                              cards: Optional[SingleFlight] = None) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     🧠 Универсальный асинхронный запуск функций по кабинетам (WB)
 
@@ -34,6 +39,9 @@ async def execute_run_cabinet(name: str, api: str,
         api (Any): Авторизованный API-объект клиента (например, aiohttp.ClientSession)
         session (Any): Сессия подключения к WB/Ozon API
         func_name (str): Название вызываемой функции (`get_stocks`, `report_detail`, `campaign_query`)
+        limiter (RateLimiter): Общий лимитер запросов, передаётся в `get_cards()` и вызываемую функцию
+        cards (SingleFlight): Общий кеш `get_cards()` на запуск (мульти-режим `main(jobs=...)`) —
+            карточки кабинета скачиваются один раз, остальные функции ждут тот же запрос
 
     Возвращает:
         tuple[pd.DataFrame, pd.DataFrame] или None:
@@ -72,9 +80,29 @@ async def execute_run_cabinet(name: str, api: str,
         logger.error(message)
         raise ValueError(message)
 
+    limiter = limiter or RateLimiter()
+
+    with trace_cabinet(name):
+        return await _run_cabinet(name, api, session, func_name, allowed[func_name.lower()], limiter, cards)
+
+
+async def _run_cabinet(name: str, api: str, session: aiohttp.ClientSession, func_name: str, func,
+                       limiter: RateLimiter, cards: Optional[SingleFlight]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Тело `execute_run_cabinet`: карточки кабинета, затем `func` (спаны `cards` и `fetch`)."""
+
     try:
         logger.info(f"🚀 Запускаю get_cards для: {name}")
-        IDKT, ID = await get_cards(name=name, api=api, session=session)
+        with trace_span('cards', job=func_name) as span:
+            if cards is None:
+                IDKT, ID = await get_cards(name=name, api=api, session=session, limiter=limiter)
+            else:
+                IDKT, ID = await cards.do((name, api), lambda: get_cards(
+                    name=name, api=api, session=session, limiter=limiter))
+
+            span['rows'] = len(IDKT)
+
+            # postprocess меняет таблицы на месте — каждой функции свою копию
+            IDKT, ID = IDKT.copy(), ID.copy()
 
         if IDKT.empty or ID.empty:
             logger.warning(f"IDKT - пустой!!")
@@ -89,15 +117,15 @@ async def execute_run_cabinet(name: str, api: str,
         send_tg_message(msg)
         return pd.DataFrame(), pd.DataFrame()
 
-    func = allowed[func_name.lower()]
-
     try:
         logger.debug(
             f"🟢 Запускаю `{func_name}` для кабинета `{name}`")
 
         logger.debug(f"🧪 DEBUG: SELECTED FUNCTION = {func.__name__.upper()}")
 
-        result = await func(name=name, api=api, session=session)
+        with trace_span('fetch', job=func_name):
+            result = await func(name=name, api=api,
+                                session=session, limiter=limiter)
 
         logger.info(f"✅ `{func_name}` успешно отработала для `{name}`")
         logger.info(f"🏁 Кабинет `{name}` завершён без ошибок")
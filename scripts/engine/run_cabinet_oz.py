@@ -1,19 +1,27 @@
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.telegram_logger import send_tg_message
+from scripts.utils.rate_limiter import RateLimiter
+from scripts.utils.chunked import split_chunks
+from scripts.utils.tracing import trace_cabinet, trace_span
+from typing import AsyncIterator, Optional
 import aiohttp
 import pandas as pd
 
 logger = make_logger(__name__, use_telegram=False)
 
 
-async def execute_run_ozon(api_key: str, client_id: str, name: str, sessions: aiohttp.ClientSession) -> pd.DataFrame:
+async def execute_run_ozon(api_key: str, client_id: str, name: str, sessions: aiohttp.ClientSession,
+                           limiter: Optional[RateLimiter] = None) -> pd.DataFrame:
     """
     🚀 Асинхронная функция для сбора и обработки отчета по товарам и остаткам из кабинета Ozon.
 
     Функция выполняет полный цикл:
-    1. Выгружает атрибуты карточек товаров (`get_product_info_attributes`);
-    2. Извлекает SKU (`extract_sku`);
-    3. Получает информацию об остатках (`get_product_list_stocks`);
+    1. Постранично выгружает атрибуты карточек товаров (`iter_product_info_attributes`);
+    2. Каждую страницу сразу разбирает (`ProductInfoBuilder`) и отдаёт её SKU (`extract_sku`)
+       в очередь чанков;
+    3. Воркеры остатков (`get_product_list_stocks_stream`) забирают чанки из очереди, пока
+       следующие страницы карточек ещё грузятся — время кабинета ≈ самая долгая из двух фаз,
+       а не их сумма;
     4. Объединяет карточки и остатки, формирует финальный датафрейм (`prepare_final_ozon_data`).
 
     Используется как часть пайплайна массовой обработки кабинетов Ozon (например, через `main_run_ozon`).
@@ -34,6 +42,9 @@ async def execute_run_ozon(api_key: str, client_id: str, name: str, sessions: ai
     sessions : aiohttp.ClientSession
         Асинхронная HTTP-сессия (общая на все запросы).
 
+    limiter : RateLimiter, optional
+        Общий лимитер запросов (квота Ozon считается по `client_id`).
+
     📤 Возвращает:
     --------------
     pd.DataFrame
@@ -50,33 +61,42 @@ async def execute_run_ozon(api_key: str, client_id: str, name: str, sessions: ai
     """
 
     from scripts.postprocessors.ozon_data_transform import prepare_final_ozon_data
-    from scripts.pipelines_oz.get_cards_list_oz import extract_sku, get_product_info_attributes, read_product_info_json
-    from scripts.pipelines_oz.get_stocks_oz import get_product_list_stocks
+    from scripts.pipelines_oz.get_cards_list_oz import ProductInfoBuilder, extract_sku, iter_product_info_attributes
+    from scripts.pipelines_oz.get_stocks_oz import STOCKS_CHUNK_SIZE, get_product_list_stocks_stream
 
-    try:
-        logger.info(f'{name} - Выгружаю карточки товаров')
-        send_tg_message(
-            f'📦 {name} — начинаю загрузку карточек товаров (get_product_info_attributes)')
+    limiter = limiter or RateLimiter()
+    info = ProductInfoBuilder()
 
-        product_info_oz = await get_product_info_attributes(api_key=api_key, client_id=client_id, name=name, sessions=sessions)
+    async def sku_chunks() -> AsyncIterator[list[int]]:
+        async for items in iter_product_info_attributes(api_key=api_key, client_id=client_id, name=name,
+                                                        sessions=sessions, limiter=limiter):
+            info.add_page(items)
 
-    except Exception:
-        msg = f"❌ {name} — ошибка при загрузке карточек: {e}"
-        logger.exception(msg)
-        send_tg_message(msg)
-        raise
+            for chunk in split_chunks(extract_sku(name=name, data_attributes=items), STOCKS_CHUNK_SIZE):
+                yield chunk
 
-    try:
-        logger.info(f"📦 [{name}] Начинаю сбор отчета по кабинету")
-
-        df_stocks = await get_product_list_stocks(api_key=api_key, client_id=client_id, sku=extract_sku(name=name, data_attributes=product_info_oz), name=name, sessions=sessions)
+        logger.info(
+            f"{name} - ✅ Общее количество полученных карточек: {len(info)}")
 
-        group_df = prepare_final_ozon_data(
-            df_info=read_product_info_json(
-                name=name, data_attributes=product_info_oz),
-            df_stocks=df_stocks,
-            name=name
-        )
+    try:
+        logger.info(f'{name} - Выгружаю карточки товаров')
+        send_tg_message(
+            f'📦 {name} — начинаю загрузку карточек товаров и остатков (product_info_attributes → analytics_stocks)')
+
+        # карточки и остатки качаются одновременно — HTTP-спаны различаются по endpoint
+        with trace_cabinet(name):
+            with trace_span('fetch', job='ozon_stocks') as span:
+                df_stocks = await get_product_list_stocks_stream(api_key=api_key, client_id=client_id,
+                                                                 sku_chunks=sku_chunks(), name=name,
+                                                                 sessions=sessions, limiter=limiter)
+                span['rows'] = len(df_stocks)
+
+            with trace_span('postprocess', job='ozon_stocks'):
+                group_df = prepare_final_ozon_data(
+                    df_info=info.frame(),
+                    df_stocks=df_stocks,
+                    name=name
+                )
         return group_df
     except Exception as e:
         msg = f"КАБИНЕТ {name} — 💥 Ошибка в execute_run_ozon: {e}"
@@ -1,9 +1,20 @@
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.telegram_logger import send_tg_message
-from scripts.utils.config.factory import get_client_info
+from scripts.utils.config.factory import get_client_info, get_postprocess_pool
+from scripts.utils.rate_limiter import RateLimiter
+from scripts.utils.single_flight import SingleFlight
+from scripts.utils.http_cassette import open_session
+from scripts.utils.tracing import trace_span
+from scripts.postprocessors.batch import BATCH_POSTPROCESS, postprocess_cabinets
 from dotenv import load_dotenv
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from collections import defaultdict
-import aiohttp
+from functools import partial
+from typing import Any, Iterator, Optional
+import multiprocessing
+import importlib
+import os
 import asyncio
 import pandas as pd
 
@@ -12,7 +23,8 @@ load_dotenv()
 logger = make_logger(__name__, use_telegram=False)
 
 
-async def main(run_funck, exclude_names: list[str] = None, postprocess_func=None, cabinet=None) -> dict[str, tuple[pd.DataFrame, pd.DataFrame]]:
+async def main(run_funck=None, exclude_names: list[str] = None, postprocess_func=None, cabinet=None,
+               jobs: Optional[dict[str, tuple]] = None, batch: bool = False) -> dict[str, tuple[pd.DataFrame, pd.DataFrame]]:
     """
     🔁 Универсальный асинхронный движок для запуска обработки по кабинетам WB/Ozon.
 
@@ -26,7 +38,7 @@ async def main(run_funck, exclude_names: list[str] = None, postprocess_func=None
     ------------
     run_funck : Callable[..., Awaitable]
         Асинхронная функция, вызываемая для каждого кабинета. 
-        Должна принимать аргументы `name`, `api`, `session` и возвращать результат (обычно кортеж или DataFrame).
+        Должна принимать аргументы `name`, `api`, `session`, `limiter` и возвращать результат (обычно кортеж или DataFrame).
 
     postprocess_func : Callable[..., tuple[pd.DataFrame, pd.DataFrame]], optional
         Функция постобработки, применяемая к результату `run_funck` (например, объединение данных, агрегации и пр.).
@@ -35,6 +47,39 @@ async def main(run_funck, exclude_names: list[str] = None, postprocess_func=None
     cabinet : dict[str, str], optional
         Словарь кабинетов в формате `{name: api_key}`. Если не указан — используется `get_client_info()`.
 
+    jobs : dict[str, tuple[Callable, Callable | None]], optional
+        Мульти-режим: `{имя задачи: (run_funck, postprocess_func)}` вместо одной пары аргументов.
+        Все задачи по всем кабинетам запускаются одновременно, карточки кабинета (`get_cards`)
+        скачиваются один раз — `run_funck` получает общий `SingleFlight` аргументом `cards`.
+        Результат — `{имя задачи: {кабинет: результат}}`.
+
+    batch : bool, optional
+        Пакетная постобработка: ответы всех кабинетов склеиваются с номером кабинета и
+        обрабатываются одним вызовом (`BATCH_POSTPROCESS` в `scripts.postprocessors.batch`).
+        Результаты те же, что и по кабинетам; для постобработок без пакетной версии — обычный режим.
+
+    ⚙️ Постобработка:
+    -----------------
+    Постобработка кабинета запускается сразу после его запроса и выполняется в пуле
+    (`get_postprocess_pool()`: по умолчанию `ProcessPoolExecutor`), а не в event loop — медленные
+    кабинеты не задерживают быстрые, pandas не блокирует запросы. Время запуска ≈ самый медленный
+    кабинет + одна постобработка. При `batch` постобработка задачи ждёт все её кабинеты.
+
+    ⏱ Трассировка:
+    ---------------
+    Спаны `run`, `cards`, `fetch`, `postprocess` и каждого HTTP-запроса / ожидания лимита
+    пишутся в `scripts.utils.tracing.TRACER`; в конце процесса — JSON-lines и сводная таблица.
+
+    🚦 Лимиты:
+    ----------
+    Создаёт один `RateLimiter` на весь запуск и передаёт его в `run_funck` — все кабинеты
+    упираются в реальные квоты WB (по токену и endpoint-у), а не в фиксированные паузы.
+
+    📼 Кассета:
+    -----------
+    Сессия создаётся через `open_session`: при `HTTP_CASSETTE=record` ответы API пишутся
+    в кассету, при `HTTP_CASSETTE=replay` берутся из неё (офлайн-бенчмарк `py -m scripts.bench`).
+
     📤 Возвращает:
     --------------
     dict[str, tuple[pd.DataFrame, pd.DataFrame]]
@@ -54,11 +99,16 @@ async def main(run_funck, exclude_names: list[str] = None, postprocess_func=None
         postprocess_func=group_advert_and_id,
     ))
 
+    data = asyncio.run(main(jobs={
+        'stocks': (partial(execute_run_cabinet, func_name='get_stocks'), merge_and_transform_stocks_with_idkt),
+        'sales': (partial(execute_run_cabinet, func_name='report_detail'), get_current_week_sales_df),
+        'advert': (partial(execute_run_cabinet, func_name='campaign_query'), group_advert_and_id),
+    }))
+
     🧠 Автор: Илья  
     🗓 Версия: Июль 2025
     """
     status_report = defaultdict(str)
-    result, failed = {}, {}
 
     exclude_names = exclude_names or []
 
@@ -75,52 +125,164 @@ async def main(run_funck, exclude_names: list[str] = None, postprocess_func=None
         name: api for name, api in all_api_request.items() if name not in exclude_names
     }
 
-    async with aiohttp.ClientSession() as session:
-        tasks = [
-            run_funck(name=name, api=api, session=session)
-            for name, api in all_api_request.items()
-        ]
+    limiter = RateLimiter()
+
+    run_jobs = {None: (run_funck, postprocess_func)} if jobs is None else jobs
+
+    with trace_span('run', engine='wb', cabinets=len(all_api_request), jobs=len(run_jobs)), \
+            _postprocess_executor(len(all_api_request) * len(run_jobs)) as executor:
+        async with open_session('wb', all_api_request) as session:
+            run_kwargs = {'session': session, 'limiter': limiter}
+
+            if jobs is not None:
+                run_kwargs['cards'] = SingleFlight()
+
+            collected = await asyncio.gather(*(
+                _run_job(job_funck, job_postprocess, all_api_request, run_kwargs, executor, batch)
+                for job_funck, job_postprocess in run_jobs.values()
+            ))
+
+            result = {
+                job: _collect_results(all_api_request, response, processed,
+                                      job_postprocess, status_report, job=job)
+                for (job, (_, job_postprocess)), (response, processed) in zip(run_jobs.items(), collected)
+            }
+
+            if jobs is None:
+                result = result[None]
+
+    send_tg_message("\n".join(["📊 ИТОГОВЫЙ ОТЧЁТ ПО КАБИНЕТАМ:"] + [
+        f"{name:<15} - {status}" for name, status in status_report.items()
+    ]))
+
+    return result
+
+
+@contextmanager
+def _postprocess_executor(size: int) -> Iterator[Optional[Executor]]:
+    """
+    Пул для постобработки из `get_postprocess_pool()` на `size` постобработок;
+    `None` — постобработка в event loop.
+    """
+
+    config = get_postprocess_pool()
+    cpus = os.cpu_count() or 1
+    workers = max(1, config['workers'] or min(size, cpus))
+
+    if config['executor'] == 'inline':
+        yield None
+    elif config['executor'] == 'thread' or cpus == 1:
+        # на одном ядре процессы ничего не распараллелят — только копирование таблиц между ними
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='postprocess') as executor:
+            yield executor
+    else:
+        # spawn — как на Windows: дочерний процесс не наследует event loop и сессии aiohttp
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            # процессы стартуют и импортируют pandas, пока идут запросы, а не после первого ответа
+            for _ in range(workers):
+                executor.submit(importlib.import_module, 'scripts.postprocessors.batch')
+
+            yield executor
+
+
+async def _postprocess(executor: Optional[Executor], postprocess_func, data: dict[str, tuple],
+                       batch: bool = False) -> dict[str, Any]:
+    """`postprocess_cabinets` в пуле — event loop тем временем продолжает скачивать другие кабинеты."""
+
+    if executor is None:
+        return postprocess_cabinets(postprocess_func, data, batch=batch)
+
+    call = partial(postprocess_cabinets, postprocess_func, data, batch=batch)
 
-        response = await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
+    except BrokenExecutor as e:
+        logger.error(f"❌ Пул постобработки недоступен ({e}) — выполняю в event loop")
+        return call()
+
+
+async def _run_job(run_funck, postprocess_func, all_api_request: dict[str, str], run_kwargs: dict,
+                   executor: Optional[Executor], batch: bool = False) -> tuple[list, dict[str, Any]]:
+    """
+    Запросы одной задачи по всем кабинетам и их постобработка.
+
+    Постобработка кабинета запускается сразу после его запроса, не дожидаясь остальных кабинетов.
+    Пакетная постобработка (`batch`) ждёт все кабинеты задачи, но тоже выполняется в пуле.
+
+    Возвращает (ответы `run_funck` в порядке кабинетов, {кабинет: результат или исключение постобработки}).
+    """
+
+    processed = {}
+    batch_postprocess = batch and postprocess_func in BATCH_POSTPROCESS
+
+    async def run_cabinet(name: str, api: str):
+        res = await run_funck(name=name, api=api, **run_kwargs)
+
+        if postprocess_func and not batch_postprocess and isinstance(res, (list, tuple)):
+            with trace_span('postprocess', cabinet=name, job=postprocess_func.__name__):
+                processed.update(await _postprocess(executor, postprocess_func, {name: res}))
+            logger.info(f"⚙️ Постобработка {name} готова")
+
+        return res
+
+    response = await asyncio.gather(*(
+        run_cabinet(name, api) for name, api in all_api_request.items()
+    ), return_exceptions=True)
+
+    if batch_postprocess:
+        with trace_span('postprocess', cabinet='все (batch)', job=postprocess_func.__name__):
+            processed = await _postprocess(executor, postprocess_func, {
+                name: res for name, res in zip(all_api_request, response)
+                if isinstance(res, (list, tuple))
+            }, batch=True)
+
+    return response, processed
+
+
+def _collect_results(all_api_request: dict[str, str], response: list, processed: dict[str, Any],
+                     postprocess_func, status_report: dict[str, str], job: Optional[str] = None) -> dict:
+    """Раскладывает ответы и результаты постобработки кабинетов, заполняет `status_report`."""
+
+    result, failed = {}, {}
 
-        for (name, api_key), res in zip(all_api_request.items(), response):
+    for (name, api_key), res in zip(all_api_request.items(), response):
+        label = f"{job} {name}" if job else name
 
-            if isinstance(res, Exception):
-                logger.error(f"❌ Ошибка в {name}: {res}")
+        if isinstance(res, Exception):
+            logger.error(f"❌ Ошибка в {label}: {res}")
 
-                status_report[name] = "❌ ОШИБКА"
-                failed[name] = api_key
-                continue
+            status_report[label] = "❌ ОШИБКА"
+            failed[name] = api_key
+            continue
 
-            if postprocess_func:
-                try:
-                    if res is not None and isinstance(res, (list, tuple)):
-                        data = postprocess_func(*res, name=name)
+        if postprocess_func:
+            try:
+                if name in processed:
+                    data = processed[name]
 
-                        result[name] = data
-                        logger.info(f'🔥🔥🔥🔥🔥\nЗапрос {name} успешно выполнен!!')
+                    if isinstance(data, Exception):
+                        raise data
 
-                        status_report[name] = "✅ УСПЕШНО"
-                    else:
-                        logger.warning(
-                            f"⚠️ Пропущен postprocess для {name} — res = {res}")
+                    result[name] = data
+                    logger.info(f'🔥🔥🔥🔥🔥\nЗапрос {label} успешно выполнен!!')
 
-                        status_report[name] = "⚠️ ПРОПУЩЕН"
-                        failed[name] = api_key
+                    status_report[label] = "✅ УСПЕШНО"
+                else:
+                    logger.warning(
+                        f"⚠️ Пропущен postprocess для {label} — res = {res}")
 
-                except Exception as e:
-                    msg = f"❌ Ошибка при postprocess {postprocess_func.__name__} {name} - res: {e}"
-                    logger.error(msg)
-                    send_tg_message(msg)
-            else:
-                result[name] = res
-                logger.warning(f'🔥🔥🔥🔥🔥\nЗапрос  {name} НЕ выполнен!!')
+                    status_report[label] = "⚠️ ПРОПУЩЕН"
+                    failed[name] = api_key
 
-                status_report[name] = "⚠️ НЕ ОБРАБОТАН POSTPROCESS"
-                failed[name] = api_key
+            except Exception as e:
+                msg = f"❌ Ошибка при postprocess {postprocess_func.__name__} {label} - res: {e}"
+                logger.error(msg)
+                send_tg_message(msg)
+        else:
+            result[name] = res
+            logger.warning(f'🔥🔥🔥🔥🔥\nЗапрос  {label} НЕ выполнен!!')
 
-    send_tg_message("📊 ИТОГОВЫЙ ОТЧЁТ ПО КАБИНЕТАМ:")
-    for name, status in status_report.items():
-        send_tg_message(f"{name:<15} - {status}")
+            status_report[label] = "⚠️ НЕ ОБРАБОТАН POSTPROCESS"
+            failed[name] = api_key
 
     return result
@@ -1,7 +1,7 @@
 
 from scripts.utils.config.factory import sheets_names, tables_names
 from scripts.utils.prepare_values_df import prepare_values_for_sheets
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 from scripts.utils.setup_logger import make_logger
 from scripts.integrations.utils.tools import get_data_from_google_sheet
 import gspread
@@ -13,7 +13,7 @@ logger = make_logger(__name__, use_telegram=False)
 def add_barcode_from_ful_matrix_in_matrix_in_gsh(spreadshet: gspread.Spreadsheet, df: pd.DataFrame, ws: str):
     try:
         logger.info(f"📑 Открываю лист: **{ws}** в таблице: {spreadshet.title}")
-        worksheet = spreadshet.worksheet(ws)
+        worksheet = get_sheets_session().worksheet(spreadshet, ws)
         logger.info(f"✅ Лист '{ws}' успешно найден")
 
         logger.info(f"🧹 Очищаю содержимое листа '{ws}'")
@@ -25,6 +25,7 @@ def add_barcode_from_ful_matrix_in_matrix_in_gsh(spreadshet: gspread.Spreadsheet
     except Exception as e:
         logger.warning(f"⚠️ Лист '{ws}' не найден, создаю новый. Ошибка: {e}")
         worksheet = spreadshet.add_worksheet(title=ws, rows=1, cols=1)
+        get_sheets_session().invalidate(spreadshet)
         logger.info(f"📄 Новый лист '{ws}' успешно создан")
 
     try:
@@ -42,7 +43,7 @@ def add_barcode_from_ful_matrix_in_matrix_in_gsh(spreadshet: gspread.Spreadsheet
 
 
 if __name__ == '__main__':
-    gs = get_gspread_client()
+    gs = get_sheets_session()
     
     info_table = tables_names()
 
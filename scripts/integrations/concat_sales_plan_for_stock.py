@@ -1,6 +1,8 @@
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 import pandas as pd
 from scripts.utils.prepare_values_df import prepare_values_for_sheets
+from scripts.utils.sheets_scheduler import run_uploads
+from functools import partial
 
 
 import gspread
@@ -13,7 +15,7 @@ def get_data_from_google_sheet(spreadsheet: gspread.Spreadsheet, worksheet: str)
     try:
         logger.info(
             f"📥 Читаю данные из таблицы: {spreadsheet.title}, лист: {worksheet}")
-        ws = spreadsheet.worksheet(worksheet)
+        ws = get_sheets_session().worksheet(spreadsheet, worksheet)
 
         data = ws.get_all_values()
         logger.info(f"✅ Данные получены: {len(data)} строк")
@@ -39,7 +41,7 @@ def push_df_in_table(df: pd.DataFrame, spreadsheet: gspread.Spreadsheet, ws: str
     try:
         logger.info(
             f"📂 Подключаюсь к таблице: {spreadsheet.title}, лист: {ws}")
-        worksheet = spreadsheet.worksheet(ws)
+        worksheet = get_sheets_session().worksheet(spreadsheet, ws)
 
         logger.info(f"🧹 Очищен лист: {ws}")
         worksheet.clear()
@@ -48,6 +50,7 @@ def push_df_in_table(df: pd.DataFrame, spreadsheet: gspread.Spreadsheet, ws: str
         logger.warning(f"⚠️ Лист {ws} не найден, создаю новый")
 
         worksheet = spreadsheet.add_worksheet(title=ws, rows=1, cols=1,)
+        get_sheets_session().invalidate(spreadsheet)
 
     try:
         logger.info(
@@ -67,7 +70,7 @@ def push_df_in_table(df: pd.DataFrame, spreadsheet: gspread.Spreadsheet, ws: str
 
 if __name__ == '__main__':
    
-    gs = get_gspread_client()
+    gs = get_sheets_session()
 
     SHM = {
             'spreadsheet_sh':gs.open('План продаж ИП Шелудько'),
@@ -123,15 +126,12 @@ if __name__ == '__main__':
     }
 
 
-    for name, conf in info.items():
-        try:
-            logger.info(f"📂 [{name}] Загружаю данные в лист '{conf['worksheet']}'...")
+    logger.info(f"📂 Загружаю данные в {len(info)} таблиц параллельно...")
 
-            conf['func'](conf['df'], conf['spreadsheet'], conf['worksheet'])
-
-            logger.info(f"✅ [{name}] Данные успешно загружены")
-        except Exception as e:
-            logger.exception(f"❌ [{name}] Ошибка при обновлении: {e}")
+    run_uploads({
+        name: partial(conf['func'], conf['df'], conf['spreadsheet'], conf['worksheet'])
+        for name, conf in info.items()
+    })
 
 logger.info("🎉 Все обновления завершены!")
         
@@ -74,7 +74,7 @@
 
 🔧 Вспомогательные зависимости:
 
-▪ get_gspread_client()
+▪ get_sheets_session()
     → Из модуля scripts.gspread_client
     → Отвечает за авторизацию в Google Sheets API через service account
 
@@ -84,20 +84,21 @@
 """
 from scripts.utils.prepare_values_df import prepare_values_for_sheets
 from scripts.utils.config.factory import get_client_info, tables_names, sheets_names
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session, SheetsSession
+from scripts.utils.sheet_sync import sync_values
+from scripts.utils.sheets_scheduler import run_uploads
+from functools import partial
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.utils.setup_logger import make_logger
 from datetime import datetime
 import pandas as pd
-import gspread
-from gspread.utils import rowcol_to_a1
 
 logger = make_logger(__name__, use_telegram=False)
 
 
-def request_oz_and_wb_product_range_matrix() -> tuple[dict[str, pd.DataFrame], str, str, gspread.client.Client]:
+def request_oz_and_wb_product_range_matrix() -> tuple[dict[str, pd.DataFrame], str, str, SheetsSession]:
 
-    gs = get_gspread_client()
+    gs = get_sheets_session()
 
     table_entrepreneur = get_client_info()['finmodel_map']
 
@@ -112,13 +113,13 @@ def request_oz_and_wb_product_range_matrix() -> tuple[dict[str, pd.DataFrame], s
     sheet_directory_oz = sheets_names()['directory_oz']
     worksheet_barcode_oz = sheets_names()['barcodes_oz']
 
-    wb_directory_worksheet = spreadsheet_wb.worksheet(
+    wb_directory_worksheet = gs.worksheet(spreadsheet_wb, 
         sheet_directory_wb)
 
-    oz_directory_worksheet = spreadsheet_oz.worksheet(
+    oz_directory_worksheet = gs.worksheet(spreadsheet_oz, 
         sheet_directory_oz)
 
-    oz_directory_barcode = spreadsheet_oz.worksheet(
+    oz_directory_barcode = gs.worksheet(spreadsheet_oz, 
         worksheet_barcode_oz)
 
     get_date_directory_wb = wb_directory_worksheet.get_all_values()
@@ -155,43 +156,37 @@ def request_oz_and_wb_product_range_matrix() -> tuple[dict[str, pd.DataFrame], s
 
 
 def upload_to_sheet(data_dict: dict[str, tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]],
-                    sheet_directory_oz: str, worksheet_barcode_oz: str, sheet_directory_wb: str, gs: gspread.client.Client) -> None:
+                    sheet_directory_oz: str, worksheet_barcode_oz: str, sheet_directory_wb: str, gs: SheetsSession) -> None:
 
-    for table, (oz_directory, wb_directory, barcode) in data_dict.items():
+    def upload_table(table: str, oz_directory: pd.DataFrame, wb_directory: pd.DataFrame, barcode: pd.DataFrame) -> None:
         try:
             logger.info(f"Пробую открыть таблицу: {table}")
             # открываем таблицу
             upload_spreadsheet = gs.open(table)
 
             # открываем лист Справочник OZ
-            upload_worksheet_directory_oz = upload_spreadsheet.worksheet(
+            upload_worksheet_directory_oz = gs.worksheet(upload_spreadsheet, 
                 sheet_directory_oz)
             # открываем лист Справочник WB
-            upload_worksheet_directory_wb = upload_spreadsheet.worksheet(
+            upload_worksheet_directory_wb = gs.worksheet(upload_spreadsheet, 
                 sheet_directory_wb)
             # открываем лист Баркода OZ
-            upload_worksheet_barcode = upload_spreadsheet.worksheet(
+            upload_worksheet_barcode = gs.worksheet(upload_spreadsheet, 
                 worksheet_barcode_oz)
 
         except Exception as e:
             msg = f'Ошибка подключения к: {table}\n{e}'
             send_tg_message(msg)
             logger.error(msg)
+            return
 
         try:
-            row, col = oz_directory.shape
-            end_cell = rowcol_to_a1(row + 1, col)
-            logger.debug(f"Справочник OZ end_cell: {end_cell}".upper())
-
-            upload_worksheet_directory_oz.batch_clear([f"A2:{end_cell}"])
-
-           
             logger.info(f'Выгружаю Справочник OZ в гугл таблицу: {table}')
 
-            upload_worksheet_directory_oz.update(
+            sync_values(
+                worksheet=upload_worksheet_directory_oz,
                 values=prepare_values_for_sheets(oz_directory),
-                value_input_option="USER_ENTERED",
-                range_name='A2'
+                start_range='A2'
             )
 
             logger.info(f"✅ Данные успешно загружены в: {table}")
@@ -203,16 +198,10 @@ def upload_to_sheet(data_dict: dict[str, tuple[pd.DataFrame, pd.DataFrame, pd.Da
 
         try:
             logger.info(f'Выгружаю данные в лист Справочник WB: {table}')
-            row, col = wb_directory.shape
-            end_cell = rowcol_to_a1(row + 1, col)
-            logger.debug(f"Справочник WB end_cell: {end_cell}".upper())
-
-            upload_worksheet_directory_wb.batch_clear([f"A2:{end_cell}"])
-
-            upload_worksheet_directory_wb.update(
+            sync_values(
+                worksheet=upload_worksheet_directory_wb,
                 values=prepare_values_for_sheets(wb_directory),
-                value_input_option="USER_ENTERED",
-                range_name="A2"
+                start_range='A2'
             )
 
             logger.info(f'Справочник WB выгружен в таблицу: {table}')
@@ -222,22 +211,13 @@ def upload_to_sheet(data_dict: dict[str, tuple[pd.DataFrame, pd.DataFrame, pd.Da
             logger.error(msg)
 
         try:
-            row, col = barcode.shape
-            end_cell = rowcol_to_a1(row + 1, col)
-            logger.info(f'Очищаю диапозон листа: {worksheet_barcode_oz}')
-
-            upload_worksheet_barcode.batch_clear([f"A2:{end_cell}"])
-
-            logger.info(
-                f'Очищен диапозон: {end_cell} в {table}, лист {worksheet_barcode_oz}')
-
             logger.info(f'Выгружаю Баркода OZ в гугл таблицу: {table}')
 
-            upload_worksheet_barcode.update(
-                [barcode.columns.tolist()] +
+            sync_values(
+                worksheet=upload_worksheet_barcode,
+                values=[barcode.columns.tolist()] +
                 prepare_values_for_sheets(barcode),
-                value_input_option="USER_ENTERED",
-                range_name='A2'
+                start_range='A2'
             )
 
             logger.info(
@@ -248,6 +228,10 @@ def upload_to_sheet(data_dict: dict[str, tuple[pd.DataFrame, pd.DataFrame, pd.Da
             send_tg_message(msg)
             logger.error(msg)
 
+    run_uploads({
+        table: partial(upload_table, table, *frames) for table, frames in data_dict.items()
+    })
+
     logger.info("🎉 Все данные загружены!")
 
 
@@ -1,5 +1,5 @@
 from scripts.integrations.utils.tools import get_data_from_google_sheet
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 import gspread
 from scripts.utils.prepare_values_df import prepare_values_for_sheets
 from scripts.utils.config.factory import sheets_names, tables_names
@@ -24,7 +24,7 @@ def filtered_data_from_google_sheets(df: pd.DataFrame, filter_data: str):
 def add_data_from_google_sheets(spreadsheet: gspread.Spreadsheet, ws: str, df: pd.DataFrame):
     try:
         logger.info(f"📑 Открываю лист '{ws}' в таблице '{spreadsheet.title}'")
-        worksheet = spreadsheet.worksheet(ws)
+        worksheet = get_sheets_session().worksheet(spreadsheet, ws)
 
         logger.info(f"🧹 Очищаю лист '{ws}' перед загрузкой данных")
         row, col = df.shape
@@ -33,6 +33,7 @@ def add_data_from_google_sheets(spreadsheet: gspread.Spreadsheet, ws: str, df: p
     except Exception as e:
         logger.warning(f"⚠️ Лист '{ws}' не найден, создаю новый. Ошибка: {e}")
         worksheet = spreadsheet.add_worksheet(title=ws, cols=1, rows=1)
+        get_sheets_session().invalidate(spreadsheet)
 
     try:
         logger.info(
@@ -55,7 +56,7 @@ def add_data_from_google_sheets(spreadsheet: gspread.Spreadsheet, ws: str, df: p
 if __name__ == '__main__':
     info_table = tables_names()
     info_sheet = sheets_names()
-    gs = get_gspread_client()
+    gs = get_sheets_session()
 
     WB_MATRIX_SPREADSHEET = gs.open(info_table['wb_matrix_complete'])
     directory_wb = info_sheet['directory_wb']
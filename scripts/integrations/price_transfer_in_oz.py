@@ -1,4 +1,4 @@
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 from gspread_dataframe import set_with_dataframe
 from scripts.utils.config.factory import sheets_names, tables_names
 from scripts.utils.telegram_logger import send_tg_message
@@ -13,7 +13,7 @@ logger = make_logger(__name__, use_telegram=False)
 
 def price_transfer_from_am_in_am_oz() -> None:
     
-    gs = get_gspread_client()
+    gs = get_sheets_session()
 
     table_matrix_wb = tables_names()['wb_matrix_complete']
     table_matrix_oz = tables_names()['oz_matrix_complete']
@@ -25,10 +25,10 @@ def price_transfer_from_am_in_am_oz() -> None:
         logger.info(
             "📄 Открываем таблицы: 'Ассортиментная матрица. Полная' и 'Ассортиментная матрица OZON'")
         transfer_spreadsheet = gs.open(table_matrix_wb)
-        transfer_sheet = transfer_spreadsheet.worksheet(sheet_name)
+        transfer_sheet = gs.worksheet(transfer_spreadsheet, sheet_name)
 
         download_spreadsheet = gs.open(table_matrix_oz)
-        download_sheet = download_spreadsheet.worksheet(sheet_name)
+        download_sheet = gs.worksheet(download_spreadsheet, sheet_name)
 
     except Exception as e:
         msg = f"❌ Ошибка при открытии таблиц или листов: {e}"
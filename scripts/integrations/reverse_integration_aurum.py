@@ -1,28 +1,21 @@
 import pandas as pd
 from scripts.integrations.utils.tools import get_data_from_google_sheet
 from scripts.utils.prepare_values_df import prepare_values_for_sheets
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
+from scripts.utils.sheets_scheduler import run_uploads
 from scripts.utils.setup_logger import make_logger
 from gspread.utils import rowcol_to_a1
+from functools import partial
 import gspread
-import asyncio
 
 logger = make_logger(__name__, use_telegram=False)
 
-sem = asyncio.Semaphore(2)
-
-
-async def push_df_in_google_sheets_async(*args, **kwargs):
-    async with sem:
-        return await asyncio.to_thread(push_df_in_google_sheets,*args, **kwargs)
-
-
 def get_data_from_manager_table(spreadsheet: gspread.Spreadsheet, ws: str) -> pd.DataFrame:
 
     try:
         logger.info(
             f"📥 Читаю данные из таблицы менеджера: {spreadsheet.title}, лист: {ws}")
-        worksheet = spreadsheet.worksheet(ws)
+        worksheet = get_sheets_session().worksheet(spreadsheet, ws)
 
         data = worksheet.get_all_values()
 
@@ -49,7 +42,7 @@ def push_df_in_google_sheets(spreadsheet: gspread.Spreadsheet, df: pd.DataFrame,
         f"⬆️ Начинаю выгрузку DataFrame в таблицу: {spreadsheet.title}, лист: {ws}")
 
     try:
-        worksheet = spreadsheet.worksheet(ws)
+        worksheet = get_sheets_session().worksheet(spreadsheet, ws)
 
         logger.info(f"📂 Найден существующий лист {ws}, очищаю содержимое")
 
@@ -64,6 +57,7 @@ def push_df_in_google_sheets(spreadsheet: gspread.Spreadsheet, df: pd.DataFrame,
         logger.warning(
             f"⚠️ Лист {ws} не найден, создаю новый в {spreadsheet.title}")
         worksheet = spreadsheet.add_worksheet(title=ws, rows=1, cols=1)
+        get_sheets_session().invalidate(spreadsheet)
 
     try:
         logger.info(
@@ -84,7 +78,7 @@ def push_df_in_google_sheets(spreadsheet: gspread.Spreadsheet, df: pd.DataFrame,
 if __name__ == '__main__':
 
     
-    gs = get_gspread_client()
+    gs = get_sheets_session()
 
     MANAGER_DF =  get_data_from_manager_table(gs.open('Таблица менеджера'), ws='Aurum')
     
@@ -99,19 +93,12 @@ if __name__ == '__main__':
         },
     }
 
-    for name, conf in info.items():
-        logger.info(f"📂 [{name}] Начинаю загрузку данных в таблицу → {conf['update_sheet']}")
-
-        try:
-            push_df_in_google_sheets(
-                conf['spreadsheet'],
-                MANAGER_DF,
-                conf['update_sheet']
-            )
-            logger.info(f"✅ [{name}] Данные успешно загружены в '{conf['update_sheet']}'")
+    logger.info(f"📂 Загружаю данные Aurum в {len(info)} таблиц параллельно...")
 
-        except Exception as e:
-            logger.error(f"❌ [{name}] Ошибка при загрузке данных: {e}", exc_info=True)
+    run_uploads({
+        name: partial(push_df_in_google_sheets, conf['spreadsheet'], MANAGER_DF, conf['update_sheet'])
+        for name, conf in info.items()
+    })
 
    
 # py -m scripts.integrations.reverse_integration_aurum
@@ -1,5 +1,5 @@
 import pandas as pd
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.config.factory import sheets_names, tables_names
 from gspread_dataframe import set_with_dataframe
@@ -28,7 +28,7 @@ def upload_mywerehouse_in_gsheets() -> None:
     """
     try:
         logger.info("📡 Инициализация GSpread клиента...")
-        gs = get_gspread_client()
+        gs = get_sheets_session()
 
         sheet_name = sheets_names()['api_mywarehouse']
 
@@ -36,7 +36,7 @@ def upload_mywerehouse_in_gsheets() -> None:
 
         extract_table = tables_names()['wb_matrix_complete']
         extract_spreadsheet = gs.open(extract_table)
-        extract_wsheet = extract_spreadsheet.worksheet(sheet_name)
+        extract_wsheet = gs.worksheet(extract_spreadsheet, sheet_name)
 
         logger.info(f"📄 Чтение данных с листа: {sheet_name}")
         mywarehouse_data = extract_wsheet.get_all_values()
@@ -59,11 +59,11 @@ def upload_mywerehouse_in_gsheets() -> None:
 
         import_spreadsheet = gs.open(import_table)
 
-        if sheet_name in [ws.title for ws in import_spreadsheet.worksheets()]:
+        if sheet_name in [ws.title for ws in gs.worksheets(import_spreadsheet)]:
 
             logger.info(f"📄 Лист '{sheet_name}' найден — очищаю содержимое")
 
-            import_worksheet = import_spreadsheet.worksheet(sheet_name)
+            import_worksheet = gs.worksheet(import_spreadsheet, sheet_name)
 
             import_worksheet.clear()
             logger.info(f"🧹 Лист '{sheet_name}' успешно очищен")
@@ -76,6 +76,7 @@ def upload_mywerehouse_in_gsheets() -> None:
                 rows=mywarehouse_df.shape[0],
                 cols=mywarehouse_df.shape[1]
             )
+            gs.invalidate(import_spreadsheet)
     except Exception as e:
         msg = f"❌ Ошибка при подготовке листа '{sheet_name}' в таблице '{import_table}': {e}"
         send_tg_message(msg)
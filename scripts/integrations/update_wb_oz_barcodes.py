@@ -1,5 +1,5 @@
 from scripts.utils.config.factory import tables_names, sheets_names
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.utils.config.factory import sheets_names
 from scripts.utils.setup_logger import make_logger
@@ -44,7 +44,7 @@ def transfer_wb_barcodes_to_oz_sheet(clear_range=['A:B']) -> None:
     ────────────────────────────────────────────────────────────────────────────
 
     📦 Зависимости:
-    - `get_gspread_client()` → авторизация через Google API
+    - `get_sheets_session()` → общая сессия Google Sheets (клиент, таблицы, листы)
     - `set_with_dataframe()` → запись DataFrame в лист Google Sheets
     - `sheets_names()` → ключи для определения листов
     - `get_assortment_matrix_complete[_OZON]()` → названия таблиц
@@ -65,7 +65,7 @@ def transfer_wb_barcodes_to_oz_sheet(clear_range=['A:B']) -> None:
     try:
         logger.info("🔌 Подключаюсь к GSpread клиенту...")
 
-        gs = get_gspread_client()
+        gs = get_sheets_session()
 
         wsheet = sheets_names()['barcodes_wb_oz']
         table_matrix_oz = tables_names()['oz_matrix_complete']
@@ -86,7 +86,7 @@ def transfer_wb_barcodes_to_oz_sheet(clear_range=['A:B']) -> None:
             table_matrix_wb = tables_names()['wb_matrix_complete']
             spreadsheet = gs.open(table_matrix_wb)
 
-            worksheet = spreadsheet.worksheet(sheet_name)
+            worksheet = gs.worksheet(spreadsheet, sheet_name)
 
             barcode = [row[:2] for row in worksheet.get_all_values()]
 
@@ -103,7 +103,7 @@ def transfer_wb_barcodes_to_oz_sheet(clear_range=['A:B']) -> None:
     try:
         spreadsheet_oz = gs.open(table_matrix_oz)
 
-        wsheet_oz = spreadsheet_oz.worksheet(wsheet)
+        wsheet_oz = gs.worksheet(spreadsheet_oz, wsheet)
         logger.info(f"📄 Найден лист назначения: '{wsheet}'")
 
     except Exception:
@@ -1,3 +1,4 @@
+from scripts.utils.gspread_client import get_sheets_session
 from scripts.utils.setup_logger import make_logger
 import gspread
 import pandas as pd
@@ -9,7 +10,7 @@ logger = make_logger(__name__, use_telegram=False)
 def get_data_from_google_sheet(spreadshet: gspread.Spreadsheet, ws: str):
     try:
 
-        worksheet = spreadshet.worksheet(ws)
+        worksheet = get_sheets_session().worksheet(spreadshet, ws)
         logger.info(f"✅ Лист '{ws}' успешно найден")
 
         data = worksheet.get_all_values()
@@ -1,9 +1,15 @@
 from scripts.spreadsheet_tools.push_mywarehouse import upload_my_werehouse_df_in_assortment_matrix_full
+from scripts.my_werehouse.moysklad_client import MoySkladClient
+from scripts.utils.config.factory import get_requests_url_moysklad
+from scripts.utils.rate_limiter import RateLimiter
 from scripts.utils.setup_logger import make_logger
+from scripts.utils.telegram_logger import send_tg_message
 from dotenv import load_dotenv
+from typing import Optional
+import asyncio
+import gzip
 import json
 import pandas as pd
-import requests
 import time
 import os
 load_dotenv()
@@ -12,89 +18,86 @@ load_dotenv()
 logger = make_logger(__name__, use_telegram=True)
 
 
+COLUMNS = ['АртикулМойСклад', 'ОстаткиВсего']
+
+
+def _snapshot_path() -> Optional[str]:
+    """Куда писать сырой снимок отчёта (NDJSON, gzip): `MYWAREHOUSE_SNAPSHOT`, пусто — не писать."""
+    return os.getenv('MYWAREHOUSE_SNAPSHOT', '').strip() or None
+
+
+async def stream_mywerehouse_stocks(token: str, snapshot_path: Optional[str] = None,
+                                    limiter: Optional[RateLimiter] = None) -> pd.DataFrame:
+    """
+    🚰 Остатки МойСклад (`report/stock/all`) потоком: каждая страница сразу сводится
+    к (артикул, остаток) с положительным остатком, сырые строки не копятся.
+
+    Без снимка из строк отчёта оставляются только `article` и `stock` (см. `MoySkladClient.iter_rows`).
+    Со снимком (`snapshot_path`) строки страницы целиком дописываются в NDJSON (gzip) по мере
+    прихода страниц, в порядке отчёта. В памяти при этом остаётся только
+    текущая страница и отфильтрованные пары.
+
+    📤 Возвращает:
+    --------------
+    pd.DataFrame — `АртикулМойСклад`, `ОстаткиВсего` в порядке отчёта.
+    """
+
+    url = get_requests_url_moysklad()['stock_all']
+    columns = None if snapshot_path else ('article', 'stock')
+
+    pages: dict[int, tuple[list, list]] = {}
+    total = 0
+
+    snapshot = None
+    if snapshot_path:
+        os.makedirs(os.path.dirname(snapshot_path) or '.', exist_ok=True)
+        snapshot = gzip.open(snapshot_path, 'wt', encoding='utf8')
+
+    try:
+        async with MoySkladClient(token, limiter=limiter) as client:
+            async for offset, rows in client.iter_rows(url, columns=columns):
+                if snapshot is not None:
+                    snapshot.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+
+                positive = [row for row in rows if (row.get('stock') or 0) > 0]
+                pages[offset] = ([row.get('article') for row in positive],
+                                 [row['stock'] for row in positive])
+                total += len(rows)
+
+    finally:
+        if snapshot is not None:
+            snapshot.close()
+
+    if snapshot_path:
+        logger.debug(f'💾 Снимок отчёта сохранён: {snapshot_path}')
+
+    offsets = sorted(pages)
+    result = pd.DataFrame({
+        'АртикулМойСклад': [article for offset in offsets for article in pages[offset][0]],
+        'ОстаткиВсего': [stock for offset in offsets for stock in pages[offset][1]],
+    }, columns=COLUMNS)
+
+    logger.info(f"📊 Получено {total} позиций от МойСклад, с остатком: {len(result)}")
+
+    return result
+
+
 def get_mywerehouse_stocks() -> pd.DataFrame:
     logger.info("📦 Старт сбора остатков из API Мой Склад")
+    begin = time.time()
+
+    try:
+        result = asyncio.run(stream_mywerehouse_stocks(
+            os.getenv('my_warehouse', '').strip(), snapshot_path=_snapshot_path()))
+
+    except Exception as e:
+        msg = f"❌ Ошибка при получении данных с API МойСклад: {e}"
+        logger.error(msg)
+        send_tg_message(msg)
+        return pd.DataFrame(columns=COLUMNS)
 
-    url = 'https://api.moysklad.ru/api/remap/1.2/report/stock/all'
-    headers = {
-        'Authorization': f"Bearer {os.getenv('my_warehouse')}",
-
-    }
-    print("🧪 my_warehouse =", os.getenv('my_warehouse'))
-
-    werehouse = []
-    offset = 0
-    limit = 1000
-    while True:
-        try:
-
-            params = {
-                'limit': limit,
-                'offset': offset
-            }
-            logger.info(f"🔄 Получение с offset= {offset}")
-
-            res = requests.get(url=url, headers=headers, params=params)
-
-            if res.status_code != 200:
-                logger.warning(f"⚠️ Ошибка запроса: {res.status_code}")
-                logger.warning(res.text)
-                break
-
-            result = res.json()
-            rows = result.get('rows', [])
-
-            if not rows:
-                logger.info("🚫 Больше данных нет, завершаем.")
-                break
-
-            werehouse.extend(rows)
-
-            logger.info(
-                f"✅ Загружено {len(rows)} строк, всего: {len(werehouse)}")
-
-            offset += limit
-
-            time.sleep(0.5)
-
-        except Exception:
-            logger.exception("❌ Ошибка при получении данных с API")
-
-    path = r'C:\Users\Ilya\OneDrive\Рабочий стол\iosifovy\house.json'
-    with open(path, 'w', encoding='utf8') as file:
-        json.dump(werehouse, file, indent=2, ensure_ascii=False)
-        logger.debug('werehouse сохранен')
-
-    result_werehouse = []
-    for house in werehouse:
-        result_werehouse.append({
-            # 'meta': house.get('meta'),
-            'ОстаткиВсего': house.get('stock'),
-            'inTransit': house.get('inTransit'),
-            'reserve': house.get('reserve'),
-            'Остатки': house.get('quantity'),
-            'Наименование': house.get('name'),
-            'code': house.get('code'),
-            'АртикулМойСклад': house.get('article'),
-            'price': house.get('price'),
-            'salePrice': house.get('salePrice'),
-            'uom': house.get('uom', {}).get('name', 'Не указано'),
-            'externalCode': house.get('externalCode'),
-            'stockDays': house.get('stockDays'),
-            "cabinet": house.get('folder', {}).get("name")
-        })
-    logger.info(f"📊 Получено {len(result_werehouse)} позиций от МойСклад")
-
-    res = pd.DataFrame(result_werehouse)
-
-    logger.debug(f"df до фильтрации == {res.shape}")
-    res = res[res['ОстаткиВсего'] > 0]
-
-    filtered_res = res.filter(
-        ['АртикулМойСклад', 'ОстаткиВсего'])
-
-    logger.debug(f'df после фильтрации == {filtered_res.shape}')
-    return filtered_res
+    logger.info(f"✅ Остатки МойСклад получены за {time.time() - begin:.1f} сек")
+    return result
 
 
 if __name__ == '__main__':
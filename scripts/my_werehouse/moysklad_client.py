@@ -0,0 +1,158 @@
+from scripts.utils.rate_limiter import RateLimiter
+from scripts.utils.http_cassette import open_session
+from scripts.utils.paginator import Page, iter_pages
+from scripts.utils.setup_logger import make_logger
+from typing import AsyncIterator, Iterable, Optional
+import asyncio
+import aiohttp
+
+logger = make_logger(__name__, use_telegram=False)
+
+# статусы, после которых запрос имеет смысл повторить
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class MoySkladError(RuntimeError):
+    pass
+
+
+class MoySkladClient:
+    """
+    🏬 Асинхронный клиент JSON API МойСклад (remap 1.2).
+
+    Одна сессия aiohttp с пулом соединений на всё время работы; темп запросов задаёт общий
+    `RateLimiter` (лимит МойСклад — на аккаунт, см. `get_rate_limits`). Каждый запрос
+    повторяется не больше `retries` раз с растущей паузой — только при сетевой ошибке,
+    429 и 5xx; остальные ошибки сразу поднимают `MoySkladError`.
+
+    Постраничные отчёты (`iter_rows`) идут по offset: первая страница запрашивается отдельно,
+    по `meta.size` становится известно число строк, и остальные offset запрашиваются
+    одновременно (`iter_pages`, не больше `concurrency` в полёте).
+
+    ─────────────────────────────────────────────────────────────
+
+    🔧 Параметры:
+    -------------
+    token : str
+        Bearer-токен МойСклад.
+    session : aiohttp.ClientSession, optional
+        Готовая сессия; без неё клиент создаёт свою в `async with` и закрывает на выходе.
+    limiter : RateLimiter, optional
+    concurrency : int, optional
+        Сколько страниц в полёте; по умолчанию — burst лимитера.
+    retries : int
+        Сколько попыток на один запрос.
+    retry_delay : float
+        Пауза перед повтором (удваивается с каждой попыткой).
+
+    📌 Использование:
+    ----------------
+    async with MoySkladClient(token) as client:
+        async for offset, rows in client.iter_rows(url, columns=('article', 'stock')):
+            ...
+    """
+
+    def __init__(self, token: str, session: Optional[aiohttp.ClientSession] = None,
+                 limiter: Optional[RateLimiter] = None, concurrency: Optional[int] = None,
+                 retries: int = 4, retry_delay: float = 1.0) -> None:
+
+        self.token = token
+        self.session = session
+        self.own_session = session is None
+        self.limiter = limiter or RateLimiter()
+        self.concurrency = concurrency
+        self.retries = max(retries, 1)
+        self.retry_delay = retry_delay
+        self.headers = {
+            'Authorization': f"Bearer {token}",
+            'Accept-Encoding': 'gzip',
+        }
+
+    async def __aenter__(self) -> 'MoySkladClient':
+        if self.session is None:
+            self.session = open_session('moysklad', {'МойСклад': self.token},
+                                        timeout=aiohttp.ClientTimeout(total=120))
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self.own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get(self, url: str, params: Optional[dict] = None) -> dict:
+        """GET с лимитером и ограниченным числом повторов."""
+
+        last_error = None
+
+        for attempt in range(1, self.retries + 1):
+            await self.limiter.acquire(url, self.token)
+
+            try:
+                async with self.session.get(url, headers=self.headers, params=params) as response:
+                    self.limiter.update(url, self.token, response.status, response.headers)
+
+                    if response.status == 200:
+                        return await response.json()
+
+                    text = await response.text()
+
+                    if response.status not in RETRY_STATUSES:
+                        raise MoySkladError(f"{response.status} — {text[:500]}")
+
+                    last_error = f"{response.status} — {text[:200]}"
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = f"{type(e).__name__}: {e}"
+
+            if attempt < self.retries:
+                delay = self.retry_delay * 2 ** (attempt - 1)
+                logger.warning(
+                    f"⚠️ МойСклад {params or ''}: {last_error}. Повтор {attempt + 1}/{self.retries} через {delay:.0f} сек")
+                await asyncio.sleep(delay)
+
+        raise MoySkladError(f"не удалось получить {url} {params or ''} за {self.retries} попыток: {last_error}")
+
+    async def iter_rows(self, url: str, params: Optional[dict] = None, limit: int = 1000,
+                        columns: Optional[Iterable[str]] = None) -> AsyncIterator[tuple[int, list[dict]]]:
+        """
+        📄 Постраничный обход отчёта / списка сущностей по offset.
+
+        `columns` — какие поля строк оставить. Отбор на стороне клиента: у `report/stock/all`
+        нет проекции полей, API всегда отдаёт строки целиком, и объём ответа не меняется.
+        Остальные поля (meta, uom, folder, image…) отбрасываются сразу при разборе страницы,
+        поэтому между страницами в памяти лежат только нужные значения.
+
+        📤 Отдаёт:
+        ----------
+        (offset, строки) — по порядку offset (см. `iter_pages`).
+        """
+
+        columns = tuple(columns) if columns is not None else None
+
+        async def fetch_page(page: int) -> Page:
+            offset = page * limit
+            result = await self.get(url, {**(params or {}), 'limit': limit, 'offset': offset})
+
+            rows = result.get('rows') or []
+            if columns is not None:
+                rows = [{key: row.get(key) for key in columns} for row in rows]
+
+            logger.info(f"🔄 МойСклад offset={offset}: {len(rows)} строк")
+
+            return Page(items=rows, total=(result.get('meta') or {}).get('size'))
+
+        concurrency = self.concurrency or self.limiter.burst(url, self.token)
+
+        async for page, rows in iter_pages(fetch_page, page_size=limit, first_page=0, concurrency=concurrency):
+            yield page * limit, rows
+
+    async def fetch_rows(self, url: str, params: Optional[dict] = None, limit: int = 1000,
+                         columns: Optional[Iterable[str]] = None) -> list[dict]:
+        """Все строки отчёта в порядке offset (см. `iter_rows`)."""
+
+        pages = {}
+
+        async for offset, rows in self.iter_rows(url, params, limit, columns):
+            pages[offset] = rows
+
+        return [row for offset in sorted(pages) for row in pages[offset]]
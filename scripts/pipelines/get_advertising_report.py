@@ -1,13 +1,16 @@
 from scripts.spreadsheet_tools.upload_to_gsheet_advert_sales import save_in_gsh
-from scripts.postprocessors.group_advert import group_advert_and_id
+from scripts.postprocessors.group_advert import flatten_fullstats, group_advert_and_id
 from scripts.utils.config.factory import get_requests_url_wb, sheets_names
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.engine.run_cabinet import execute_run_cabinet
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.engine.universal_main import main
 from scripts.utils.setup_logger import make_logger
+from scripts.utils.rate_limiter import RateLimiter
+from scripts.utils.chunked import fetch_chunks, split_chunks
 from datetime import datetime, timedelta
 from functools import partial
+from typing import Awaitable, Callable, Optional
 import pandas as pd
 import aiohttp
 import asyncio
@@ -18,8 +21,12 @@ load_dotenv()
 
 logger = make_logger(__name__, use_telegram=False)
 
+# WB принимает в `adv/v2/fullstats` не больше 100 кампаний за запрос
+FULLSTATS_CHUNK_SIZE = 100
 
-async def campaign_query(api: str, name: str, session: aiohttp.ClientSession) -> pd.DataFrame:
+
+async def campaign_query(api: str, name: str, session: aiohttp.ClientSession,
+                         limiter: Optional[RateLimiter] = None) -> pd.DataFrame:
     """
     📢 Получение рекламной статистики WB по активным кампаниям за последнюю неделю.
 
@@ -42,6 +49,9 @@ async def campaign_query(api: str, name: str, session: aiohttp.ClientSession) ->
     session : aiohttp.ClientSession
         Асинхронная HTTP-сессия для выполнения запросов.
 
+    limiter : RateLimiter, optional
+        Общий лимитер запросов (квоты `promotion_count` и `advert_fullstats`).
+
     📤 Возвращает:
     -------------
     pd.DataFrame
@@ -55,7 +65,7 @@ async def campaign_query(api: str, name: str, session: aiohttp.ClientSession) ->
     🗂️ Используемые ключевые URL:
     -----------------------------
     - `promotion_count` — получить список всех активных кампаний.
-    - `advert_fullstats` — получить подробную статистику по всем кампаниям.
+    - `advert_fullstats` — подробная статистика кампаний, чанками по `FULLSTATS_CHUNK_SIZE` id.
 
     📆 Период:
     ---------
@@ -66,7 +76,11 @@ async def campaign_query(api: str, name: str, session: aiohttp.ClientSession) ->
     ------------
     - Если нет кампаний: вернёт пустой DataFrame и логгирует предупреждение.
     - Если API вернёт ошибку: сообщение попадёт в Telegram.
-    - Данные из `fullstats` собираются по дням, приложениям и `nmId`.
+    - Чанки кампаний запрашиваются через `fetch_chunks` под квотой `advert_fullstats`
+      (в полёте не больше burst лимита); упавший чанк повторяется, остальные — нет.
+      Если не получен ни один чанк — ValueError, если часть — сообщение в Telegram.
+    - Данные из `fullstats` разворачиваются по дням, приложениям и `nmId` в типизированные
+      колонки (`flatten_fullstats`).
 
     📌 Пример запуска:
     ------------------
@@ -85,14 +99,16 @@ async def campaign_query(api: str, name: str, session: aiohttp.ClientSession) ->
 
     url_fullstats = get_requests_url_wb()['advert_fullstats']
 
-    camp_data = []
-
     date_from = (datetime.now()-timedelta(days=7)).strftime('%Y-%m-%d')
     date_to = (datetime.now()-timedelta(days=1)).strftime('%Y-%m-%d')
 
     headers = {'Authorization': api}
+    limiter = limiter or RateLimiter()
+
+    await limiter.acquire(url_count, api)
 
     async with session.get(url_count, headers=headers) as adverts:
+        limiter.update(url_count, api, adverts.status, adverts.headers)
 
         if adverts.status == 204:
             msg = f"⚠️ ⚠️ Из 'campaign_query': Нет данных (204) для {name}"
@@ -120,53 +136,73 @@ async def campaign_query(api: str, name: str, session: aiohttp.ClientSession) ->
         logger.info(
             f"✅✅ Получено {len(advert_id)} кампаний для {name}".upper())
 
-    params = [{'id': c, 'interval': {
-        'begin': date_from, 'end': date_to}} for c in advert_id]
+    if not advert_id:
+        msg = f"⚠️ Нет кампаний для {name}"
+        logger.warning(msg)
+        send_tg_message(msg)
+        return pd.DataFrame()
+
+    chunks = split_chunks(advert_id, FULLSTATS_CHUNK_SIZE)
 
     logger.info(
-        f"📥 Загружаю статистику для {len(params)} кампаний — {name}".upper())
+        f"📥 Загружаю статистику для {len(advert_id)} кампаний ({len(chunks)} чанков) — {name}".upper())
 
-    async with session.post(url_fullstats, headers=headers, json=params) as stats:
-        if stats.status != 200:
-            error_text = await stats.text()
-            msg = f"⚠️⚠️ Ошибка запроса статистики: {error_text}"
-            send_tg_message(msg)
+    results, failed = await fetch_chunks(
+        chunks, _fullstats_chunk_fetcher(api, name, session, limiter, date_from, date_to),
+        concurrency=limiter.burst(url_fullstats, api), name=name)
+
+    if failed:
+        msg = (f"⚠️⚠️ {name}: не получена статистика по {len(failed)} из {len(chunks)} чанков кампаний: "
+               f"{', '.join(f'{chunks[i][0]}…{chunks[i][-1]}' for i in failed)}")
+        send_tg_message(msg)
+
+        if len(failed) == len(chunks):
             raise ValueError(msg)
 
-        fullstats = await stats.json()
+        logger.error(msg)
 
-        if not fullstats:
-            msg = f"⚠️ Нет статистики для {name}"
-            logger.warning(msg)
-            send_tg_message(msg)
-            return pd.DataFrame()
+    camp_df = flatten_fullstats(campaign for fullstats in results if fullstats for campaign in fullstats)
+    results.clear()
 
-        logger.info(
-            f"📊 Получена статистика для {name}: {len(fullstats)} записей".upper())
+    if camp_df.empty:
+        msg = f"⚠️ Нет статистики для {name}"
+        logger.warning(msg)
+        send_tg_message(msg)
+        return pd.DataFrame()
 
-    if fullstats != None:
+    camp_df['Кабинет'] = name
+    send_tg_message(
+        f"✅ Рекламная статистика для кабинета '{name}' успешно получена: {len(camp_df)} строк")
 
-        for c in fullstats:
-            for d in c['days']:
-                for a in d['apps']:
-                    for nm in a['nm']:
-                        nm['appType'] = a['appType']
-                        nm['date'] = d['date']
-                        nm['advertId'] = c['advertId']
-                        camp_data.append(nm)
+    return camp_df
 
-        camp_df = pd.DataFrame(camp_data)
-        camp_df['Кабинет'] = name
-        send_tg_message(
-            f"✅ Рекламная статистика для кабинета '{name}' успешно получена: {len(camp_df)} строк")
 
-        return camp_df
+def _fullstats_chunk_fetcher(api: str, name: str, session: aiohttp.ClientSession, limiter: RateLimiter,
+                             date_from: str, date_to: str) -> Callable[[int, list[int]], Awaitable[list[dict]]]:
+    """Запрос `advert_fullstats` по одному чанку кампаний (для `fetch_chunks`)."""
 
-    else:
-        msg = f"⚠️ Нет данных статистики для {name}"
-        logger.warning(msg)
-        send_tg_message(msg)
-        return pd.DataFrame()
+    url = get_requests_url_wb()['advert_fullstats']
+    headers = {'Authorization': api}
+
+    async def fetch_chunk(index: int, chunk_id: list[int]) -> list[dict]:
+        params = [{'id': c, 'interval': {'begin': date_from, 'end': date_to}} for c in chunk_id]
+
+        await limiter.acquire(url, api)
+
+        async with session.post(url, headers=headers, json=params) as stats:
+            limiter.update(url, api, stats.status, stats.headers)
+
+            if stats.status != 200:
+                raise RuntimeError(f"{stats.status} — {await stats.text()}")
+
+            fullstats = await stats.json() or []
+
+        logger.info(
+            f"📊 {name}: чанк {index + 1} — статистика по {len(fullstats)} из {len(chunk_id)} кампаний")
+
+        return fullstats
+
+    return fetch_chunk
 
 
 if __name__ == '__main__':
@@ -179,6 +215,7 @@ if __name__ == '__main__':
         run_funck=partial(execute_run_cabinet,
                           func_name='campaign_query'),
         postprocess_func=group_advert_and_id,
+        batch=True,
         cabinet={'Галилова': os.getenv('Galilova')}
         # exclude_names=['Мишнева', 'Шелудько',]
 
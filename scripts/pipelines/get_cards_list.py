@@ -1,15 +1,119 @@
 from scripts.utils.config.factory import get_requests_url_wb
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.telegram_logger import send_tg_message
+from scripts.utils.rate_limiter import RateLimiter
+from scripts.utils.cards_cache import load_cards_cache, save_cards_cache, merge_cards
+from scripts.utils.dtypes import compact_frame
 from datetime import datetime
+from typing import Optional
+from array import array
 import pandas as pd
-import asyncio
+import numpy as np
 import aiohttp
 
 logger = make_logger(__name__, use_telegram=False)
 
+CARD_COLUMNS = ['Артикул WB', 'ID KT', 'Наименование', 'Артикул поставщика', 'Бренд', 'Категория',
+                'Фото', 'Ширина', 'Высота', 'Длина', 'updatedAt']
+SIZE_COLUMNS = ['Размер', 'chrtID', 'Баркод']
+IDKT_COLUMNS = ['Артикул WB', 'ID KT', 'Наименование', 'Бренд', 'Размер', 'Баркод',
+                'Артикул поставщика', 'Категория', 'Фото', 'Ширина', 'Высота', 'Длина']
 
-async def get_cards(session: aiohttp.ClientSession, name: str, api: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+
+class CardsColumnarBuilder:
+    """
+    🧱 Инкрементальная колоночная сборка карточек WB.
+
+    Каждая страница `cards/list` раскладывается сразу по колонкам: поля карточки пишутся
+    один раз на карточку (nmID/imtID — в типизированные массивы int64), поля размеров — один раз
+    на размер. Строки таблицы получаются в `build()` повтором индекса карточки по числу её размеров,
+    без промежуточных словарей на каждую строку.
+
+    Одна строка на размер, баркод — последний из `skus` (как и раньше в `get_cards`).
+    """
+
+    def __init__(self) -> None:
+        self.nm_id = array('q')
+        self.imt_id = array('q')
+        self.card_values: dict[str, list] = {
+            col: [] for col in CARD_COLUMNS[2:]}
+        self.repeats = array('q')
+        self.size_values: dict[str, list] = {col: [] for col in SIZE_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.size_values['Размер'])
+
+    def add_page(self, cards: list[dict]) -> None:
+        title, vendor, brand, subject, photo, width, height, length, updated = self.card_values.values()
+        tech_size, chrt_id, barcodes = self.size_values.values()
+
+        for card in cards:
+            if not isinstance(card, dict):
+                continue
+
+            sizes = card.get('sizes', [])
+            if not sizes:
+                continue
+
+            dimensions = card['dimensions']
+            photos = card.get('photos')
+
+            self.nm_id.append(card['nmID'])
+            self.imt_id.append(card['imtID'])
+            title.append(card['title'])
+            vendor.append(card['vendorCode'])
+            brand.append(card['brand'])
+            subject.append(card['subjectName'])
+            photo.append(photos[0]['big'] if photos else None)
+            width.append(dimensions['width'])
+            height.append(dimensions['height'])
+            length.append(dimensions['length'])
+            updated.append(card['updatedAt'])
+
+            for size in sizes:
+                skus = size.get('skus', []) or [None]
+
+                tech_size.append(size.get('techSize'))
+                chrt_id.append(size.get('chrtID'))
+                barcodes.append(skus[-1] if skus[-1] else None)
+
+            self.repeats.append(len(sizes))
+
+    def frame(self) -> pd.DataFrame:
+        """Полная таблица: поля карточки + Размер, chrtID, Баркод."""
+
+        if not len(self):
+            return pd.DataFrame(columns=CARD_COLUMNS + SIZE_COLUMNS)
+
+        cards = pd.DataFrame({
+            'Артикул WB': np.frombuffer(self.nm_id, dtype=np.int64),
+            'ID KT': np.frombuffer(self.imt_id, dtype=np.int64),
+            **self.card_values
+        })
+
+        rows = np.repeat(np.arange(len(cards)),
+                         np.frombuffer(self.repeats, dtype=np.int64))
+        result = cards.take(rows).reset_index(drop=True)
+
+        for col, values in self.size_values.items():
+            result[col] = values
+
+        return result
+
+    def build(self) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Возвращает (полная таблица, res_idkt_save, idkt_nmid)."""
+
+        return split_cards_frame(self.frame())
+
+
+def split_cards_frame(result: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Делит полную таблицу карточек на (полная таблица, res_idkt_save, idkt_nmid)."""
+
+    return result, result.filter(IDKT_COLUMNS), result[['Артикул WB', 'ID KT', 'updatedAt']]
+
+
+async def get_cards(session: aiohttp.ClientSession, name: str, api: str,
+                    limiter: Optional[RateLimiter] = None) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     📦 Получение карточек товаров (ID KT, баркоды, размеры и др.) из кабинета WB.
 
@@ -32,6 +136,9 @@ async def get_cards(session: aiohttp.ClientSession, name: str, api: str) -> tupl
     api : str
         Токен авторизации WB API для доступа к кабинету.
 
+    limiter : RateLimiter, optional
+        Общий лимитер запросов. Если не передан — создаётся с лимитами из `get_rate_limits()`.
+
     📤 Возвращает:
     --------------
     Tuple[pd.DataFrame, pd.DataFrame]
@@ -45,22 +152,30 @@ async def get_cards(session: aiohttp.ClientSession, name: str, api: str) -> tupl
     🧪 Обработка:
     ------------
     - Запрос осуществляется постранично, с поддержкой курсора (updatedAt, nmID).
-    - Удаляется поле `description`, чтобы уменьшить нагрузку.
+    - Каждая страница сразу раскладывается по колонкам (`CardsColumnarBuilder`), сырые карточки не копятся.
     - Фото берётся первое (`photos[0]['big']`), если есть.
     - Баркоды извлекаются из `sizes -> skus`.
+    - Каталог кабинета хранится в `cache/cards` (`cards_cache`): если кеш свежий, запрашиваются
+      только карточки, изменённые после сохранённого курсора (сортировка по возрастанию `updatedAt`),
+      и вливаются в кеш. Раз в `CARDS_CACHE_MAX_AGE_DAYS` каталог выгружается полностью.
 
     🚨 Ошибки:
     ---------
     - При ошибке запроса отправляется сообщение в Telegram.
     - Некорректный формат ответа или отсутствие курсора логгируются отдельно.
-    - После каждой страницы — задержка `DELAY` секунд (для избежания rate-limit).
+    - Перед каждой страницей — ожидание токена лимитера (квота `card_list`, без фиксированных пауз).
 
     🧠 Автор: Илья  
     🗓 Версия: Июль 2025
     """
-    DELAY = 3
     url = get_requests_url_wb()['card_list']
-    all_cards, rows, cursor = [], [], None
+    limiter = limiter or RateLimiter()
+    builder, cursor = CardsColumnarBuilder(), None
+    complete = True
+
+    cached = load_cards_cache(name, api)
+    if cached is not None:
+        cursor = cached.cursor
 
     while True:
 
@@ -68,7 +183,7 @@ async def get_cards(session: aiohttp.ClientSession, name: str, api: str) -> tupl
 
         payload = {
             "settings": {
-                "sort": {"ascending": False},
+                "sort": {"ascending": cached is not None},
                 "filter": {"withPhoto": -1},
                 "cursor": {"limit": 100},
                 "period": {
@@ -82,7 +197,10 @@ async def get_cards(session: aiohttp.ClientSession, name: str, api: str) -> tupl
             payload["settings"]["cursor"].update(cursor)
 
         try:
+            await limiter.acquire(url, api)
+
             async with session.post(url, headers=headers, json=payload) as response:
+                limiter.update(url, api, response.status, response.headers)
 
                 if response.status != 200:
                     error_text = await response.text()
@@ -101,12 +219,10 @@ async def get_cards(session: aiohttp.ClientSession, name: str, api: str) -> tupl
         else:
             if 'cards' not in cards_list or 'cursor' not in cards_list:
                 logger.error('❌ Неверный формат ответа!')
+                complete = False
                 break
 
-            all_cards.extend([
-                {k: v for k, v in card.items() if k != 'description'}
-                for card in cards_list['cards'] if isinstance(card, dict)
-            ])
+            builder.add_page(cards_list['cards'])
 
             if not cards_list or 'cards' not in cards_list or len(cards_list['cards']) < 100:
                 break
@@ -120,44 +236,21 @@ async def get_cards(session: aiohttp.ClientSession, name: str, api: str) -> tupl
                 msg = f"⚠️ В ответе от {name} отсутствует 'updatedAt' или 'nmID'"
                 logger.error(msg)
                 send_tg_message(msg)
+                complete = False
                 break
 
-            logger.info('Спим ⏳⏳⏳')
-
-            await asyncio.sleep(DELAY)
-
-    if all_cards:
-        for card in all_cards:
-            info = {
-                'Артикул WB': card['nmID'],
-                'ID KT': card['imtID'],
-                'Наименование': card['title'],
-                'Артикул поставщика': card['vendorCode'],
-                'Бренд': card['brand'],
-                'Категория': card['subjectName'],
-                'Фото': card['photos'][0]['big'] if card.get('photos') else None,
-                'Ширина': card['dimensions']['width'],
-                'Высота': card['dimensions']['height'],
-                'Длина': card['dimensions']['length'],
-                'updatedAt': card['updatedAt']
-            }
-            for size in card.get('sizes', []):
-                for barcode in size.get('skus', []) or [None]:
-                    row = info.copy()
-                    row.update({
-                        'Размер': size.get('techSize'),
-                        'chrtID': size.get('chrtID'),
-                        'Баркод': barcode if barcode else None
-                    })
-                rows.append(row)
-
-    result = pd.DataFrame(rows)
-
-
-#  Оставляем только нужные столбцы в датафрейм
-    res_idkt_save = result.filter(
-        ['Артикул WB', 'ID KT', 'Наименование', 'Бренд', 'Размер', 'Баркод', 'Артикул поставщика', 'Категория', 'Фото', 'Ширина', 'Высота', 'Длина'])
-    idkt_nmid = result[['Артикул WB', 'ID KT', 'updatedAt']]
+    result = builder.frame()
+
+    if cached is not None:
+        logger.info(f"🔄 {name}: изменённых карточек {result['Артикул WB'].nunique()}")
+        result = merge_cards(cached.frame, result)
+
+    result = compact_frame(result, name, 'карточки')
+
+    if complete:
+        save_cards_cache(name, api, result)
+
+    result, res_idkt_save, idkt_nmid = split_cards_frame(result)
 
     logger.info(
         f"📦 Данные кабинета {name} успешно распакованы и преобразованы в DataFrame: {result.shape}\nidkt_nmid сохранен: {idkt_nmid.shape}")
@@ -1,14 +1,18 @@
 from scripts.spreadsheet_tools.upload_to_gsheet_advert_sales import save_in_gsh
-from scripts.postprocessors.group_sales import get_current_week_sales_df
+from scripts.postprocessors.group_sales import get_current_week_sales_df, flatten_sales_cards
 from scripts.utils.config.factory import get_requests_url_wb, sheets_names
 from scripts.engine.run_cabinet import execute_run_cabinet
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.telegram_logger import send_tg_message
+from scripts.utils.rate_limiter import RateLimiter
+from scripts.utils.paginator import Page, iter_pages
 from scripts.engine.universal_main import main
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from functools import partial
+from typing import Optional
+import pandas as pd
 import aiohttp
 import asyncio
 import time
@@ -19,7 +23,7 @@ load_dotenv()
 logger = make_logger(__name__, use_telegram=False)
 
 
-async def report_detail(name: str, api: str, session: aiohttp.ClientSession):
+async def report_detail(name: str, api: str, session: aiohttp.ClientSession, limiter: Optional[RateLimiter] = None):
     """
     📊 Скрипт сбора детализированной статистики продаж с Wildberries API (report_detail) и сохранения её в Google Sheets
 
@@ -48,9 +52,11 @@ async def report_detail(name: str, api: str, session: aiohttp.ClientSession):
     - `name` (str): название кабинета (бренд, аккаунт и т.п.)
     - `api` (str): API-ключ авторизации Wildberries.
     - `session` (aiohttp.ClientSession): сессия для асинхронных HTTP-запросов.
+    - `limiter` (RateLimiter, optional): общий лимитер запросов (квота `report_detail`).
 
     📦 Возвращает:
-        list[dict]: список карточек (данные за последние 7 дней), объединённых по страницам.
+        pd.DataFrame: плоская таблица карточек (данные за последние 7 дней), собранная из страниц
+        в порядке их номеров. Каждая страница разворачивается `flatten_sales_cards` сразу по приходу.
 
     ───────────────────────────────────────────────────────────────────────────────
 
@@ -64,8 +70,9 @@ async def report_detail(name: str, api: str, session: aiohttp.ClientSession):
     - Считается от текущей даты: последние **7 дней**, не включая сегодняшний.
 
     🕒 Лимит API:
-    - Пагинация по 1000 карточек
-    - Пауза 21 секунда между запросами
+    - Пагинация по 1000 карточек, страницы после первой запрашиваются параллельно (`iter_pages`)
+    - Страница, не полученная за 5 попыток (429, ошибка ответа), — ошибка кабинета с сообщением в Telegram
+    - 3 запроса в минуту (burst 3) — паузы выдерживает `RateLimiter`
 
     ───────────────────────────────────────────────────────────────────────────────
 
@@ -82,63 +89,81 @@ async def report_detail(name: str, api: str, session: aiohttp.ClientSession):
     📅 Версия: Июль 2025
 
     """
-    stop, page, all_data = 21, 1, []
-    url = get_requests_url_wb()
-    while True:
-
-        headers = {
-            'Authorization': api,
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
+    PAGE_SIZE, MAX_RETRIES = 1000, 5
+    url = get_requests_url_wb()['report_detail']
+    limiter = limiter or RateLimiter()
+
+    headers = {
+        'Authorization': api,
+        'Content-Type': 'application/json',
+        'Accept': 'application/json'
+    }
+    period = {
+        'begin': (datetime.now()-timedelta(days=7)).strftime('%Y-%m-%d 00:00:00'),
+        'end': (datetime.now()-timedelta(days=1)).strftime('%Y-%m-%d 23:59:59')
+    }
+
+    async def fetch_page(page: int) -> Page:
         params = {
-
             'timezone': 'Europe/Moscow',
-            'period': {
-
-                'begin': (datetime.now()-timedelta(days=7)).strftime('%Y-%m-%d 00:00:00'),
-                'end': (datetime.now()-timedelta(days=1)).strftime('%Y-%m-%d 23:59:59')
-            },
+            'period': period,
             'orderBy': {
                 'field': 'openCard',
                 'mode': 'desc'
             },
             'page': page
         }
-        try:
-            async with session.post(url['report_detail'], headers=headers, json=params) as result:
-                logger.info(f"{name} подключение {result.status}")
+        last_error = None
+
+        for _ in range(MAX_RETRIES):
+            try:
+                await limiter.acquire(url, api)
+
+                async with session.post(url, headers=headers, json=params) as result:
+                    logger.info(f"{name} подключение {result.status}, страница {page}")
+                    limiter.update(url, api, result.status, result.headers)
+
+                    if result.status == 429:
+                        last_error = '429 — лимит запросов'
+                        continue
+
+                    if result.status != 200:
+                        last_error = f"{result.status} — {(await result.text())[:200]}"
+                        break
+
+                    detail = await result.json()
 
-                if result.status != 200:
-                    logger.error(f"Ошибка запроса: {result.status}")
-                    send_tg_message(f'report_detail_sales:\n{result.status}')
-                    break
+            except Exception as e:
+                last_error = f"{type(e).__name__}: {e}"
+                logger.warning(f"⚠️ Ошибка при запросе к {name}, страница {page}: {e}")
 
-                detail = await result.json()
-        except Exception as e:
-            msg = f"❌❌  Произошла ошибка при запросе к {name}: {e}"
-            send_tg_message(msg)
-            logger.error(msg)
+            else:
+                data = detail.get('data') or {}
+                return Page(items=data.get('cards') or [], has_next=data.get('isNextPage'))
 
-        else:
-            cards = detail.get('data', {}).get('cards', [])
+        # без страницы отчёт кабинета неполный — кабинет падает, а не выгружается обрезанным
+        msg = f"❌❌ report_detail_sales {name}: страница {page} не получена ({last_error})"
+        logger.error(msg)
+        send_tg_message(msg)
+        raise RuntimeError(msg)
 
-            if not cards:
-                break
+    frames, total = {}, 0
 
-            all_data.extend(cards)
+    # страницы разворачиваются в плоский DataFrame сразу по приходу — сырой JSON не копится
+    async for page, cards in iter_pages(fetch_page, page_size=PAGE_SIZE, concurrency=limiter.burst(url, api)):
+        if not cards:
+            continue
 
-            logger.info(
-                f'Получено {len(cards)} записей кабинета {name}. Всего: {len(all_data)}')
-            if len(cards) < 1000:
-                break
+        frames[page] = flatten_sales_cards(cards)
+        total += len(cards)
 
-            page += 1
-            logger.info(f'Спим {stop} сек')
+        logger.info(
+            f'Получено {len(cards)} записей кабинета {name} (страница {page}). Всего: {total}')
 
-            await asyncio.sleep(stop)
+    if not frames:
+        return pd.DataFrame()
 
-    return all_data
+    return pd.concat([frames[page] for page in sorted(frames)], ignore_index=True)
 
 
 if __name__ == '__main__':
@@ -151,6 +176,7 @@ if __name__ == '__main__':
         run_funck=partial(execute_run_cabinet,
                           func_name='report_detail'),
         postprocess_func=get_current_week_sales_df,
+        batch=True,
         cabinet={'Галилова': os.getenv('Galilova')}
         # exclude_names=['Мишнева', 'Шелудько']
 
@@ -9,9 +9,12 @@ from scripts.utils.telegram_logger import send_tg_message
 from scripts.engine.run_cabinet import execute_run_cabinet
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.telegram_logger import send_tg_message
+from scripts.utils.rate_limiter import RateLimiter
+from scripts.utils.dtypes import compact_frame
 from scripts.engine.universal_main import main
 from functools import partial
 from datetime import datetime
+from typing import Optional
 import pandas as pd
 import asyncio
 import aiohttp
@@ -22,7 +25,8 @@ import os
 logger = make_logger(__name__, use_telegram=False)
 
 
-async def get_stocks(session: aiohttp.ClientSession, name: str, api: str) -> pd.DataFrame:
+async def get_stocks(session: aiohttp.ClientSession, name: str, api: str,
+                     limiter: Optional[RateLimiter] = None) -> pd.DataFrame:
     """
     📦 Скрипт сбора и обработки остатков Wildberries по кабинетам с выгрузкой в Google Таблицы
 
@@ -89,9 +93,14 @@ async def get_stocks(session: aiohttp.ClientSession, name: str, api: str) -> pd.
     params = {
         "dateFrom": "2024-01-01"
     }
+    limiter = limiter or RateLimiter()
+
     try:
+        await limiter.acquire(url, api)
+
         async with session.get(url, headers=headers, params=params) as response:
             logger.info(f"🚀🚀  Начинаю запрос ОСТАТКОВ к кабинету {name}")
+            limiter.update(url, api, response.status, response.headers)
 
             if response.status != 200:
                 msg = f"⚠️⚠️ Ошибка запроса 'ОСТАТКОВ': {await response.text()}"
@@ -138,7 +147,9 @@ async def get_stocks(session: aiohttp.ClientSession, name: str, api: str) -> pd.
             'Discount': 'Скидка',
             'supplierArticle': 'Артикул поставщика'})
 
-    
+        # строка на склад × баркод: бренд, склад, размер повторяются — category / int32
+        data_stoks = compact_frame(data_stoks, name, 'остатки')
+
         logger.info(
                 f"[✅ Остатки {name} успешно распакованы: {len(data_stoks)} строк")
 
@@ -158,6 +169,7 @@ if __name__ == '__main__':
         run_funck=partial(execute_run_cabinet,
                           func_name='get_stocks'),
         postprocess_func=merge_and_transform_stocks_with_idkt,
+        batch=True,
       
         
     ))
@@ -1,4 +1,4 @@
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 from scripts.utils.config.factory import get_requests_url_wb
 from scripts.utils.config.factory import sheets_names, tables_names
 from gspread_dataframe import set_with_dataframe
@@ -11,10 +11,10 @@ import os
 
 def tariffs_for_boxes(clear_range: list[str] = ['A:H']) -> None:
    
-    gs = get_gspread_client()
+    gs = get_sheets_session()
 
     spreadsheet = gs.open(tables_names()['wb_matrix_complete'])
-    sheets = spreadsheet.worksheet(sheets_names()['tariffs_box_api'])
+    sheets = gs.worksheet(spreadsheet, sheets_names()['tariffs_box_api'])
 
     headers = {
         "Authorization": os.getenv('Rachel').strip()
@@ -1,6 +1,8 @@
-from scripts.utils.config.factory import get_requests_url_oz, get_headers
+from scripts.utils.config.factory import get_requests_url_oz, get_headers, get_ozon_attribute_columns
 from scripts.utils.setup_logger import make_logger
+from scripts.utils.rate_limiter import RateLimiter
 from dotenv import load_dotenv
+from typing import AsyncIterator, Optional
 import pandas as pd
 import aiohttp
 
@@ -10,46 +12,23 @@ load_dotenv()
 logger = make_logger(__name__, use_telegram=True)
 
 
-async def get_product_info_attributes(api_key: str, client_id: str, name: str, sessions: aiohttp.ClientSession) -> list[dict[str, object]]:
+async def iter_product_info_attributes(api_key: str, client_id: str, name: str, sessions: aiohttp.ClientSession,
+                                       limiter: Optional[RateLimiter] = None) -> AsyncIterator[list[dict[str, object]]]:
     """
-    Асинхронно получает список товаров с атрибутами из Ozon API (product_info_attributes).
+    📄 Постранично отдаёт товары с атрибутами из Ozon API (product_info_attributes).
 
-    Делает постраничные запросы к API с фильтром по видимости (ALL),
-    собирает все записи до тех пор, пока не достигнет конца списка (`last_id`).
+    Страницы (до 1000 товаров) идут по курсору `last_id`, поэтому запрашиваются строго
+    по очереди; каждая страница отдаётся сразу после получения — разбор и запросы остатков
+    по её SKU начинаются, не дожидаясь конца каталога (см. `execute_run_ozon`).
 
-    Параметры:
-    ----------
-    api_key : str
-        Ключ API от Ozon (API key).
-    client_id : str
-        ID клиента от Ozon.
-    name : str
-        Название аккаунта (не используется в теле функции, но может быть полезно для логирования).
-    sessions : aiohttp.ClientSession
-        Сессия aiohttp для выполнения асинхронных HTTP-запросов.
-
-    Возвращает:
-    -----------
-    list[dict[str, object]]
-        Список словарей с информацией о товарах, каждый словарь содержит данные по одному товару.
-
-    Исключения:
-    -----------
-    Exception
-        Генерируется, если ответ от API имеет статус, отличный от 200, с сообщением из тела ответа.
-
-    Пример:
-    -------
-        >>> async with aiohttp.ClientSession() as session:
-        >>>  data = await get_product_info_attributes(api_key, client_id, "MyStore", session)
-        >>> print(len(data))
+    Параметры — как у `get_product_info_attributes`.
     """
 
     url = get_requests_url_oz()['product_info_attributes']
-    all_rows = []
 
     last_id = None
     limit = 1000
+    limiter = limiter or RateLimiter()
 
     while True:
         try:
@@ -66,28 +45,78 @@ async def get_product_info_attributes(api_key: str, client_id: str, name: str, s
             logger.info(
                 f"{name} - Отправляю запрос к Ozon API с last_id={last_id}")
 
+            await limiter.acquire(url, client_id)
+
             async with sessions.post(url, headers=get_headers(api_key=api_key, client_id=client_id), json=params) as response:
+                limiter.update(url, client_id, response.status,
+                               response.headers)
+
                 if response.status != 200:
                     text = await response.text()
                     raise Exception(f"Ошибка {response.status}: {text}")
 
                 res = await response.json()
-
                 items = res['result']
-                logger.info(f"{name} - Получено: {len(items)} товаров")
 
-                all_rows.extend(items)
+        except Exception as e:
+            logger.error(f"{name} - 💥 Ошибка при получении данных: {e}")
+            continue
 
-                last_id = res.get('last_id')
-                logger.info(f"{name} - Следующий last_id: {last_id}")
+        logger.info(f"{name} - Получено: {len(items)} товаров")
 
-                if len(items) < limit:
-                    logger.warning(
-                        f"{name} - 🚫 Получены все данные. Завершение итерации.")
-                    break
+        last_id = res.get('last_id')
+        logger.info(f"{name} - Следующий last_id: {last_id}")
 
-        except Exception as e:
-            logger.error(f"{name} - 💥 Ошибка при получении данных: {e}")
+        yield items
+
+        if len(items) < limit:
+            logger.warning(
+                f"{name} - 🚫 Получены все данные. Завершение итерации.")
+            break
+
+
+async def get_product_info_attributes(api_key: str, client_id: str, name: str, sessions: aiohttp.ClientSession,
+                                      limiter: Optional[RateLimiter] = None) -> list[dict[str, object]]:
+    """
+    Асинхронно получает список товаров с атрибутами из Ozon API (product_info_attributes).
+
+    Делает постраничные запросы к API с фильтром по видимости (ALL),
+    собирает все записи до тех пор, пока не достигнет конца списка (`last_id`).
+
+    Параметры:
+    ----------
+    api_key : str
+        Ключ API от Ozon (API key).
+    client_id : str
+        ID клиента от Ozon.
+    name : str
+        Название аккаунта (не используется в теле функции, но может быть полезно для логирования).
+    sessions : aiohttp.ClientSession
+        Сессия aiohttp для выполнения асинхронных HTTP-запросов.
+    limiter : RateLimiter, optional
+        Общий лимитер запросов (квота считается на `client_id`).
+
+    Возвращает:
+    -----------
+    list[dict[str, object]]
+        Список словарей с информацией о товарах, каждый словарь содержит данные по одному товару.
+
+    Исключения:
+    -----------
+    Ошибки запросов логируются, страница запрашивается повторно.
+
+    Пример:
+    -------
+        >>> async with aiohttp.ClientSession() as session:
+        >>>  data = await get_product_info_attributes(api_key, client_id, "MyStore", session)
+        >>> print(len(data))
+    """
+
+    all_rows = []
+
+    async for items in iter_product_info_attributes(api_key=api_key, client_id=client_id, name=name,
+                                                    sessions=sessions, limiter=limiter):
+        all_rows.extend(items)
 
     logger.info(
         f"{name} - ✅ Общее количество полученных карточек: {len(all_rows)}")
@@ -105,51 +134,90 @@ def extract_sku(name: str, data_attributes: list[dict[str, object]]) -> list[int
     return skus
 
 
-def read_product_info_json(name: str, data_attributes: list[dict[str, object]]) -> pd.DataFrame:
+# колонка таблицы карточек → поле товара в ответе product_info_attributes
+PRODUCT_INFO_FIELDS = {
+    'Артикул': 'offer_id',
+    'Название товара': 'name',
+    'Штрихкод': 'barcode',
+    'Ширина упаковки, мм': 'width',
+    'Высота упаковки, мм': 'height',
+    'Длина упаковки, мм': 'depth',
+    'Ссылка на главное фото': 'primary_image',
+    'sku': 'sku',
+}
 
-    all_data = []
 
-    try:
-        logger.info(
-            f"{name} - Начинаю обработку {len(data_attributes)} карточек")
-        for item in data_attributes:
-            info = {
-                'Бренд в одежде и обуви': None,
-                'Объединить на одной карточке': None,
-                'Цвет товара': None,
-                'Тип': None,
-                'Артикул': item.get('offer_id'),
-                'Название товара': item.get('name'),
-                'Штрихкод': item.get('barcode'),
-                'Ширина упаковки, мм': item.get('width'),
-                'Высота упаковки, мм': item.get('height'),
-                'Длина упаковки, мм': item.get('depth'),
-                'Ссылка на главное фото': item.get('primary_image'),
-                'sku': item.get('sku')
+class ProductInfoBuilder:
+    """
+    🧱 Колоночный разбор карточек Ozon (product_info_attributes).
 
-            }
+    Поля товара (`PRODUCT_INFO_FIELDS`) забираются по колонке за проход страницы. Характеристики
+    разбираются по заранее построенной таблице «id атрибута → массив колонки»
+    (`get_ozon_attribute_columns()`): на каждый атрибут товара — один поиск в словаре, без
+    цепочки сравнений, поэтому новые характеристики не замедляют цикл.
+
+    Страницы можно добавлять по мере получения (`add_page`); `frame()` совпадает с прежним
+    `pd.DataFrame` из словаря на товар: колонки характеристик, затем поля товара.
+    """
+
+    def __init__(self, attribute_columns: Optional[dict[str, tuple[int, ...]]] = None,
+                 fields: Optional[dict[str, str]] = None) -> None:
+        attribute_columns = attribute_columns or get_ozon_attribute_columns()
+
+        self.fields = fields or PRODUCT_INFO_FIELDS
+        self.attribute_values: dict[str, list] = {
+            col: [] for col in attribute_columns}
+        self.field_values: dict[str, list] = {col: [] for col in self.fields}
+        self.lookup: dict[int, list] = {
+            attr_id: self.attribute_values[col]
+            for col, ids in attribute_columns.items()
+            for attr_id in ids
+        }
+        self.rows = 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def add_page(self, items: list[dict[str, object]]) -> None:
+        for col, key in self.fields.items():
+            self.field_values[col].extend([item.get(key) for item in items])
+
+        for values in self.attribute_values.values():
+            values.extend([None] * len(items))
+
+        lookup = self.lookup
 
+        for row, item in enumerate(items, self.rows):
             for attr in item.get('attributes', []):
-                attr_id = attr.get('id')
-                values = attr.get('values', [])
+                column = lookup.get(attr.get('id'))
 
-                if not values:
+                if column is None:
                     continue
 
-                value = values[0].get('value')
+                values = attr.get('values', [])
+
+                if values:
+                    column[row] = values[0].get('value')
+
+        self.rows += len(items)
+
+    def frame(self) -> pd.DataFrame:
+        if not self.rows:
+            return pd.DataFrame()
+
+        return pd.DataFrame({**self.attribute_values, **self.field_values})
 
-                if attr_id == 31:
-                    info['Бренд в одежде и обуви'] = value
-                elif attr_id == 8292:
-                    info['Объединить на одной карточке'] = value
-                elif attr_id in (10096, 10097):
-                    info['Цвет товара'] = value
-                elif attr_id in (4501, 4503):
-                    info['Тип'] = value
 
-            all_data.append(info)
+def read_product_info_json(name: str, data_attributes: list[dict[str, object]]) -> pd.DataFrame:
+
+    try:
+        logger.info(
+            f"{name} - Начинаю обработку {len(data_attributes)} карточек")
+
+        builder = ProductInfoBuilder()
+        builder.add_page(data_attributes)
 
-        df = pd.DataFrame(all_data)
+        df = builder.frame()
         logger.info(
             f"{name} - ✅ DataFrame сформирован: {df.shape[0]} строк, {df.shape[1]} колонок")
         return df
@@ -6,7 +6,11 @@ import time
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.utils.config.factory import get_requests_url_oz
+from scripts.utils.rate_limiter import RateLimiter
+from scripts.utils.chunked import fetch_chunks, fetch_chunks_stream, split_chunks
+from scripts.utils.records_builder import RecordsBuilder
 from dotenv import load_dotenv
+from typing import AsyncIterable, Awaitable, Callable, Optional
 from scripts.engine.main_ozon import main_run_ozon
 from scripts.engine.run_cabinet_oz import execute_run_ozon
 from scripts.utils.config.factory import get_headers
@@ -16,6 +20,8 @@ load_dotenv()
 
 logger = make_logger(__name__, use_telegram=True)
 
+STOCKS_CHUNK_SIZE = 100
+
 
 # def get_memory_usage_mb() -> float:
 #     """Возвращает текущую память процесса в мегабайтах"""
@@ -152,46 +158,105 @@ logger = make_logger(__name__, use_telegram=True)
 #         raise
 
 
-async def get_product_list_stocks(api_key: str, client_id: str, sku: list[int], name: str, sessions: aiohttp.ClientSession) -> pd.DataFrame:
-    all_stocks = []
+def _stocks_chunk_fetcher(api_key: str, client_id: str, name: str, sessions: aiohttp.ClientSession,
+                          limiter: RateLimiter) -> Callable[[int, list[int]], Awaitable[list[dict]]]:
+    """Запрос `analytics_stocks` по одному чанку SKU (для `fetch_chunks` / `fetch_chunks_stream`)."""
 
     url = get_requests_url_oz()['analytics_stocks']
 
-    chunk = 100
+    async def fetch_chunk(index: int, chunk_sku: list[int]) -> list[dict]:
+        params = {
+            'skus': list(map(str, chunk_sku))
+        }
+
+        await limiter.acquire(url, client_id)
+
+        async with sessions.post(url, headers=get_headers(client_id=client_id, api_key=api_key), json=params) as response:
+            limiter.update(url, client_id, response.status,
+                           response.headers)
+
+            if response.status != 200:
+                raise RuntimeError(
+                    f"{response.status} — {await response.text()}")
+
+            result = await response.json()
+
+        logger.debug(
+            f"КАБИНЕТ {name} 📊 Чанк {index + 1}: {len(result['items'])} записей")
 
-    for i in range(0, len(sku), chunk):
+        return result['items']
 
-        try:
-            logger.info(
-                f"КАБИНЕТ {name} 🔍 Начинаю получение аналитики по {len(sku)} SKU")
-            chunk_size = sku[i:i+chunk]
+    return fetch_chunk
 
-            params = {
 
-                'skus': list(map(str, chunk_size))
-            }
-            async with sessions.post(url, headers=get_headers(client_id=client_id, api_key=api_key), json=params) as response:
+def _stocks_frame(name: str, chunks: list[list[int]], results: list[Optional[list[dict]]], failed: list[int]) -> pd.DataFrame:
+    if failed:
+        msg = (f"КАБИНЕТ {name} 💥 Не получены остатки по {len(failed)} чанкам SKU: "
+               f"{', '.join(f'{chunks[i][0]}…{chunks[i][-1]}' for i in failed)}")
+        logger.error(msg)
+        send_tg_message(msg)
 
-                if response.status != 200:
-                    logger.error(
-                        f"КАБИНЕТ {name} ❌ Ошибка запроса {url}: {response.status} — {await response.text()}")
+    builder = RecordsBuilder()
 
-                result = await response.json()
+    for index, items in enumerate(results):
+        if items:
+            builder.add(items)
+        results[index] = None
+
+    logger.info(
+        f"КАБИНЕТ {name} ✅ Получено всего: {len(builder)} записей по складам")
+
+    return builder.frame()
 
-                all_stocks.extend(result['items'])
-                logger.info(
-                    f"КАБИНЕТ {name} 📊 Текущий объем: {len(all_stocks)} записей")
 
-                await asyncio.sleep(3)
+async def get_product_list_stocks(api_key: str, client_id: str, sku: list[int], name: str, sessions: aiohttp.ClientSession,
+                                  limiter: Optional[RateLimiter] = None) -> pd.DataFrame:
+    """
+    📊 Аналитика остатков Ozon (`analytics_stocks`) по списку SKU.
+
+    SKU делятся на чанки по 100, чанки запрашиваются конкурентно (`fetch_chunks`) — в полёте
+    не больше burst лимита `analytics_stocks`, темп по `client_id` задаёт `RateLimiter`.
+    Упавшие чанки повторяются отдельно, остальные повторно не запрашиваются.
+    Записи складываются в `RecordsBuilder` в порядке чанков.
+    """
+
+    url = get_requests_url_oz()['analytics_stocks']
+    limiter = limiter or RateLimiter()
+
+    chunks = split_chunks(sku, STOCKS_CHUNK_SIZE)
+
+    logger.info(
+        f"КАБИНЕТ {name} 🔍 Начинаю получение аналитики по {len(sku)} SKU ({len(chunks)} чанков)")
+
+    results, failed = await fetch_chunks(
+        chunks, _stocks_chunk_fetcher(api_key, client_id, name, sessions, limiter),
+        concurrency=limiter.burst(url, client_id), name=name)
+
+    return _stocks_frame(name, chunks, results, failed)
+
+
+async def get_product_list_stocks_stream(api_key: str, client_id: str, sku_chunks: AsyncIterable[list[int]], name: str,
+                                         sessions: aiohttp.ClientSession, limiter: Optional[RateLimiter] = None) -> pd.DataFrame:
+    """
+    🚰 Как `get_product_list_stocks`, но чанки SKU приходят по мере загрузки каталога
+    (`fetch_chunks_stream`): остатки по первой странице карточек запрашиваются, пока
+    следующие страницы ещё грузятся. Чанки — не больше `STOCKS_CHUNK_SIZE` SKU.
+    """
+
+    url = get_requests_url_oz()['analytics_stocks']
+    limiter = limiter or RateLimiter()
+
+    logger.info(
+        f"КАБИНЕТ {name} 🔍 Начинаю получение аналитики остатков по мере загрузки карточек")
 
-        except Exception:
-            logger.exception(
-                f"КАБИНЕТ {name} 💥 Ошибка при получении данных по SKU {i+1}–{i+len(chunk_size)}")
+    chunks, results, failed = await fetch_chunks_stream(
+        sku_chunks, _stocks_chunk_fetcher(api_key, client_id, name, sessions, limiter),
+        concurrency=limiter.burst(url, client_id), name=name)
 
     logger.info(
-        f"КАБИНЕТ {name} ✅ Получено всего: {len(all_stocks)} записей по складам")
+        f"КАБИНЕТ {name} 🔍 Обработано {sum(map(len, chunks))} SKU ({len(chunks)} чанков)")
 
-    return pd.DataFrame(all_stocks)
+    return _stocks_frame(name, chunks, results, failed)
 
 if __name__ == '__main__':
     start = time.perf_counter()
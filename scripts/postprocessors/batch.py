@@ -0,0 +1,59 @@
+from scripts.utils.setup_logger import make_logger
+from scripts.postprocessors.group_stocks import merge_and_transform_stocks_with_idkt, merge_and_transform_stocks_batch
+from scripts.postprocessors.group_sales import get_current_week_sales_df, get_current_week_sales_batch
+from scripts.postprocessors.group_advert import group_advert_and_id, group_advert_batch
+from typing import Any, Callable
+import pandas as pd
+
+logger = make_logger(__name__, use_telegram=False)
+
+# постобработка одного кабинета → та же постобработка всех кабинетов одним проходом
+BATCH_POSTPROCESS: dict[Callable, Callable] = {
+    merge_and_transform_stocks_with_idkt: merge_and_transform_stocks_batch,
+    group_advert_and_id: group_advert_batch,
+    get_current_week_sales_df: get_current_week_sales_batch,
+}
+
+
+def _batchable(res: tuple) -> bool:
+    return all(isinstance(df, pd.DataFrame) and not df.empty for df in res)
+
+
+def postprocess_cabinets(postprocess_func: Callable, data: dict[str, tuple],
+                         batch: bool = False) -> dict[str, Any]:
+    """
+    📦 `postprocess_func(*res, name=name)` для каждого кабинета `data`.
+
+    При `batch=True` и наличии пары в `BATCH_POSTPROCESS` кабинеты с непустыми таблицами
+    обрабатываются одним вызовом пакетной функции (данные склеиваются с номером кабинета,
+    группировки — с кабинетом в ключе). Кабинеты с пустыми таблицами и все кабинеты при ошибке
+    пакетной функции обрабатываются по одному.
+
+    📤 Возвращает:
+    --------------
+    {кабинет: результат или исключение постобработки} — в порядке `data`.
+    """
+
+    output = {}
+    batch_func = BATCH_POSTPROCESS.get(postprocess_func) if batch else None
+
+    if batch_func is not None:
+        frames = {name: res for name, res in data.items() if _batchable(res)}
+
+        if len(frames) > 1:
+            try:
+                output.update(batch_func(frames))
+            except Exception as e:
+                logger.error(f"❌ Пакетная постобработка {batch_func.__name__} упала ({e}) — "
+                             f"обрабатываю кабинеты по одному")
+
+    for name, res in data.items():
+        if name in output:
+            continue
+
+        try:
+            output[name] = postprocess_func(*res, name=name)
+        except Exception as e:
+            output[name] = e
+
+    return {name: output[name] for name in data}
@@ -0,0 +1,26 @@
+from typing import Sequence
+import pandas as pd
+import numpy as np
+
+# служебная колонка с номером кабинета в объединённых таблицах пакетной постобработки
+CABINET = '_cabinet'
+
+
+def concat_cabinets(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Таблицы кабинетов одна под другой; `CABINET` — номер кабинета в `frames`."""
+
+    df = pd.concat(frames, ignore_index=True)
+    df[CABINET] = np.repeat(np.arange(len(frames), dtype=np.int32), [len(frame) for frame in frames])
+    return df
+
+
+def split_cabinets(df: pd.DataFrame, count: int) -> list[pd.DataFrame]:
+    """
+    Обратно к таблицам кабинетов: строки каждого кабинета в исходном порядке, без `CABINET`.
+    Кабинет без строк → пустая таблица с теми же колонками.
+    """
+
+    parts = dict(tuple(df.groupby(CABINET, sort=True)))
+    empty = df.iloc[:0].drop(columns=CABINET)
+
+    return [parts[i].drop(columns=CABINET) if i in parts else empty for i in range(count)]
@@ -1,17 +1,85 @@
 from scripts.utils.setup_logger import make_logger
+from scripts.utils.json_flatten import JsonFlattener
+from scripts.postprocessors.cabinets import CABINET, concat_cabinets, split_cabinets
+from typing import Any, Iterable
 import pandas as pd
 import numpy as np
 
 
 logger = make_logger(__name__, use_telegram=True)
 
+# строка `nm` в `adv/v2/fullstats` → колонка; остальные поля ответа в отчёт не идут
+FULLSTATS_NM_SCHEMA = {
+    'nmId': 'nmId',
+    'views': 'views',
+    'clicks': 'clicks',
+    'atbs': 'atbs',
+    'orders': 'orders',
+    'shks': 'shks',
+    'sum_price': 'sum_price',
+    'sum': 'sum',
+}
+
+FULLSTATS_NM_FLATTENER = JsonFlattener(
+    FULLSTATS_NM_SCHEMA,
+    {column: 'int' if column == 'nmId' else 'float' for column in FULLSTATS_NM_SCHEMA.values()},
+)
+
+
+def flatten_fullstats(fullstats: Iterable[dict[str, Any]]) -> pd.DataFrame:
+    """
+    Разворачивает ответ `adv/v2/fullstats` (кампании → дни → приложения → nm) в плоский DataFrame.
+
+    Строки `nm` собираются в колонки `FULLSTATS_NM_FLATTENER` (метрики — float64, `nmId` — int64),
+    а поля уровней выше записываются один раз на приложение / день и повторяются на его строки:
+    `advertId` — int64, `appType` — int16, `date` — datetime64 (дата дня, без времени и пояса),
+    `Неделя` — ISO-неделя этой даты (считается один раз на день, а не на строку).
+    """
+
+    nm_rows: list[dict] = []
+    counts, advert_ids, app_types, day_index = [], [], [], []
+    days: list[str] = []
+
+    for campaign in fullstats:
+        for day in campaign.get('days') or ():
+            days.append(str(day['date'])[:10])
+
+            for app in day.get('apps') or ():
+                nm = app.get('nm') or ()
+                if not nm:
+                    continue
+
+                nm_rows.extend(nm)
+                counts.append(len(nm))
+                advert_ids.append(campaign['advertId'])
+                app_types.append(app['appType'])
+                day_index.append(len(days) - 1)
+
+    df = FULLSTATS_NM_FLATTENER.frame(nm_rows)
+
+    if df.empty:
+        return df
+
+    dates = pd.DatetimeIndex(pd.to_datetime(days, format='%Y-%m-%d'))
+    weeks = dates.isocalendar().week.to_numpy(dtype=np.int8)
+    day_of_row = np.repeat(np.array(day_index, dtype=np.int64), counts)
+
+    df['appType'] = np.repeat(np.array(app_types, dtype=np.int16), counts)
+    df['date'] = dates.values[day_of_row]
+    df['Неделя'] = weeks[day_of_row]
+    df['advertId'] = np.repeat(np.array(advert_ids, dtype=np.int64), counts)
+
+    return df
+
 
 def group_advert_and_id(camp_df: pd.DataFrame, ID: pd.DataFrame, name: str) -> pd.DataFrame:
     """_summary_
-    функция объединяет (merge) и группирует (groupby) два датафрейма, после фильтрует их по столбцам
+    функция сопоставляет артикулам рекламной статистики ID склейки и группирует расходы и
+    переходы по (ID, неделя, артикул) одним groupby
 
     Args:
-        camp_df (_type_): DataFrame рекламной кампании за определенный период
+        camp_df (_type_): DataFrame рекламной кампании за определенный период (`flatten_fullstats`:
+                          колонка `Неделя` уже посчитана)
 
         ID (_type_): DataFrame возвращается из функции get_cards() которая находится в файле test.py, которая возвращает все созданные карточки
                      товаров с idkt (idkt - это id склейки артикулов wb)
@@ -23,69 +91,15 @@ def group_advert_and_id(camp_df: pd.DataFrame, ID: pd.DataFrame, name: str) -> p
     """
     try:
         logger.info(f'Обрабатываю кабинет: {name}')
-        ID['updatedAt'] = pd.to_datetime(ID['updatedAt'])
-
-        latest_idkt = (
-            ID.sort_values('updatedAt').drop_duplicates(
-                subset='Артикул WB', keep='last').reset_index(drop=True)
-        )
-        camp_df['date'] = pd.to_datetime(camp_df['date']).dt.date
-
-        camp_df['Неделя'] = pd.to_datetime(
-            camp_df['date']).dt.isocalendar().week
-        camp_df = camp_df.rename(columns={'sum': 'expenses'})
 
-        camp_df.drop(columns=['date'], inplace=True)
+        latest_idkt = _latest_idkt(ID, ['Артикул WB'])
 
-        logger.info(
-            f"{name}💰 Сумма ДО merge: {camp_df['expenses'].sum():,.2f} ₽\033[0m\n\033[93m🔍 Строк до merge: {len(camp_df)}")
-
-        camp_df = pd.merge(
-            camp_df.rename(columns={'nmId': 'Артикул WB'}),
-            latest_idkt.rename(columns={'ID KT': 'ID'}),
-            left_on='Артикул WB',
-            right_on='Артикул WB',
-            how='left'
-        )
+        camp_df = _advert_rows(camp_df, latest_idkt.reindex(camp_df['nmId']).to_numpy())
 
         logger.info(
-            f"💥 Сумма ПОСЛЕ merge: {camp_df['expenses'].sum():,.2f} ₽\033[0m\n\033[93m🔍 Строк после merge: {len(camp_df)}")
-
-        camp_df['ID'] = pd.to_numeric(
-            camp_df['ID'], errors='coerce').fillna(0).astype(int)
-
-        result = camp_df.groupby(['ID', 'Неделя', 'Артикул WB']).agg({
-            'views': 'sum',
-            'clicks': 'sum',
-            'atbs': 'sum',
-            'orders': 'sum',
-            'shks': 'sum',
-            'sum_price': 'sum',
-            'expenses': 'sum'
-        }).reset_index()
-
-        result = result.drop_duplicates()
-
-        result = result.rename(columns={
-            'views': 'Просмотры',
-            'clicks': 'Переходы',
-            'atbs': 'Добавления в корзину',
-            'orders': 'Количество заказов',
-            'shks': 'Количество заказанных товаров',
-            'sum_price': 'Сумма заказов',
-            'expenses': 'Расход,Р'
-        })
-
-        result['CTR'] = np.where(
-            result['Просмотры'] == 0,
-            0,
-            (
-                result['Переходы'] / result['Просмотры']
-            ).round(3)
-        )
+            f"{name}💰 Сумма расходов: {camp_df['expenses'].sum():,.2f} ₽\033[0m\n\033[93m🔍 Строк: {len(camp_df)}")
 
-        result = result.filter(
-            ['ID', 'Неделя', 'Расход,Р', 'Артикул WB', 'CTR'])
+        result = _group_advert(camp_df, ['ID', 'Неделя', 'Артикул WB'])
 
         logger.info(
             f"🎯 Агрегация по ID выполнена для {name}!\n {result['Расход,Р'].sum():,.2f}"
@@ -95,3 +109,85 @@ def group_advert_and_id(camp_df: pd.DataFrame, ID: pd.DataFrame, name: str) -> p
 
     except Exception:
         logger.exception(f"Ошибка в {name}")
+
+
+def _latest_idkt(ID: pd.DataFrame, keys: list[str]) -> pd.Series:
+    """ID KT последней по updatedAt склейки для каждого ключа (`Артикул WB` [+ кабинет])."""
+
+    return (
+        ID.assign(updatedAt=pd.to_datetime(ID['updatedAt']))
+        .sort_values('updatedAt', kind='stable')
+        .drop_duplicates(subset=keys, keep='last')
+        .set_index(keys)['ID KT']
+    )
+
+
+def _advert_rows(camp_df: pd.DataFrame, idkt: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({
+        'ID': pd.to_numeric(idkt, errors='coerce'),
+        'Неделя': camp_df['Неделя'].to_numpy(),
+        'Артикул WB': camp_df['nmId'].to_numpy(),
+        'views': camp_df['views'].to_numpy(),
+        'clicks': camp_df['clicks'].to_numpy(),
+        'expenses': camp_df['sum'].to_numpy(),
+    }).fillna({'ID': 0}).astype({'ID': int})
+
+
+def _group_advert(camp_df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    result = camp_df.groupby(keys).agg({
+        'views': 'sum',
+        'clicks': 'sum',
+        'expenses': 'sum'
+    }).reset_index()
+
+    result = result.rename(columns={
+        'views': 'Просмотры',
+        'clicks': 'Переходы',
+        'expenses': 'Расход,Р'
+    })
+
+    result['CTR'] = np.where(
+        result['Просмотры'] == 0,
+        0,
+        (
+            result['Переходы'] / result['Просмотры']
+        ).round(3)
+    )
+
+    return result.filter(['ID', 'Неделя', 'Расход,Р', 'Артикул WB', 'CTR'] + [CABINET])
+
+
+def group_advert_batch(frames: dict[str, tuple[pd.DataFrame, pd.DataFrame]]) -> dict[str, pd.DataFrame]:
+    """
+    📦 `group_advert_and_id` сразу для всех кабинетов.
+
+    Статистика и справочники ID кабинетов объединяются в две таблицы с номером кабинета,
+    даты склеек разбираются одним `pd.to_datetime`, ID KT подставляется и метрики группируются
+    одним groupby по (кабинет, ID, неделя, артикул). Таблица каждого кабинета совпадает
+    с результатом `group_advert_and_id` (регрессия — `scripts.bench.batch_postprocess`).
+
+    📤 Возвращает:
+    --------------
+    {кабинет: DataFrame} — в порядке `frames`.
+    """
+
+    names = list(frames)
+
+    camp_df = concat_cabinets([camp[['nmId', 'Неделя', 'views', 'clicks', 'sum']] for camp, _ in frames.values()])
+    ID = concat_cabinets([ids[['Артикул WB', 'ID KT', 'updatedAt']] for _, ids in frames.values()])
+
+    latest_idkt = _latest_idkt(ID, [CABINET, 'Артикул WB'])
+    idkt = latest_idkt.reindex(pd.MultiIndex.from_arrays([camp_df[CABINET], camp_df['nmId']])).to_numpy()
+
+    rows = _advert_rows(camp_df, idkt)
+    rows[CABINET] = camp_df[CABINET].to_numpy()
+
+    logger.info(
+        f"💰 Сумма расходов по {len(names)} кабинетам: {rows['expenses'].sum():,.2f} ₽ (строк: {len(rows)})")
+
+    result = _group_advert(rows, [CABINET, 'ID', 'Неделя', 'Артикул WB'])
+
+    return {
+        name: part.reset_index(drop=True)
+        for name, part in zip(names, split_cabinets(result, len(names)))
+    }
@@ -1,10 +1,103 @@
 import pandas as pd
 from scripts.utils.setup_logger import make_logger
-from typing import Any, Dict
+from scripts.utils.json_flatten import JsonFlattener
+from scripts.postprocessors.cabinets import CABINET, concat_cabinets, split_cabinets
+import numpy as np
+from typing import Any
 
 logger = make_logger(__name__, use_telegram=True)
 
 
+def _period_schema(path: str, prev: bool) -> dict[str, str]:
+    p = ' (пред.)' if prev else ''
+    rub = ' (пред., руб)' if prev else ' (руб)'
+    pct = ' (пред., %)' if prev else ' (%)'
+    when = 'предыдущего' if prev else 'текущего'
+
+    return {
+        f'{path}.begin': f'Начало {when} периода',
+        f'{path}.end': f'Конец {when} периода',
+        f'{path}.openCardCount': f'Просмотры карточки{p}',
+        f'{path}.addToCartCount': f'Добавления в корзину{p}',
+        f'{path}.ordersCount': f'Количество заказов{p}',
+        f'{path}.ordersSumRub': f'Сумма заказов{rub}',
+        f'{path}.buyoutsCount': f'Количество выкупов{p}',
+        f'{path}.buyoutsSumRub': f'Сумма выкупов{rub}',
+        f'{path}.cancelCount': f'Количество отмен{p}',
+        f'{path}.cancelSumRub': f'Сумма отмен{rub}',
+        f'{path}.avgOrdersCountPerDay': f'Среднее заказов в день{p}',
+        f'{path}.avgPriceRub': f'Средняя цена{rub}',
+        f'{path}.conversions.addToCartPercent': f'Конверсия в корзину{pct}',
+        f'{path}.conversions.cartToOrderPercent': f'Конверсия в заказ{pct}',
+        f'{path}.conversions.buyoutsPercent': f'Конверсия в выкуп{pct}',
+    }
+
+
+# путь в карточке `report_detail` → колонка; порядок колонок — как в выгрузке
+SALES_CARD_SCHEMA = {
+    'nmID': 'Артикул WB',
+    'vendorCode': 'Артикул поставщика',
+    'brandName': 'Бренд',
+    'object.id': 'ID категории',
+    'object.name': 'Название категории',
+    **_period_schema('statistics.selectedPeriod', prev=False),
+    **_period_schema('statistics.previousPeriod', prev=True),
+    'statistics.periodComparison.openCardDynamics': 'Динамика просмотров (%)',
+    'statistics.periodComparison.addToCartDynamics': 'Динамика корзины (%)',
+    'statistics.periodComparison.ordersCountDynamics': 'Динамика заказов (%)',
+    'statistics.periodComparison.ordersSumRubDynamics': 'Динамика суммы заказов (%)',
+    'statistics.periodComparison.buyoutsCountDynamics': 'Динамика выкупов (%)',
+    'statistics.periodComparison.buyoutsSumRubDynamics': 'Динамика суммы выкупов (%)',
+    'statistics.periodComparison.cancelCountDynamics': 'Динамика отмен (%)',
+    'statistics.periodComparison.cancelSumRubDynamics': 'Динамика суммы отмен (%)',
+    'statistics.periodComparison.avgOrdersCountPerDayDynamics': 'Динамика ср. заказов в день (%)',
+    'statistics.periodComparison.avgPriceRubDynamics': 'Динамика ср. цены (%)',
+    'statistics.periodComparison.conversions.addToCartPercent': 'Изменение конверсии в корзину',
+    'statistics.periodComparison.conversions.cartToOrderPercent': 'Изменение конверсии в заказ',
+    'statistics.periodComparison.conversions.buyoutsPercent': 'Изменение конверсии в выкуп',
+    'stocks.stocksMp': 'Остатки на маркетплейсе',
+    'stocks.stocksWb': 'Остатки на WB',
+}
+
+# штуки и остатки — int, суммы / средние / проценты — float, тексты и даты — как есть
+_TEXT_PATHS = ('vendorCode', 'brandName', 'object.name', '.begin', '.end')
+_INT_PATHS = ('nmID', 'object.id', 'Count', 'stocksMp', 'stocksWb')
+
+SALES_CARD_DTYPES = {
+    column: 'int' if path.endswith(_INT_PATHS) else 'float'
+    for path, column in SALES_CARD_SCHEMA.items()
+    if not path.endswith(_TEXT_PATHS)
+}
+
+SALES_CARD_FLATTENER = JsonFlattener(SALES_CARD_SCHEMA, SALES_CARD_DTYPES)
+
+# кабинеты, у которых продажи группируются по артикулу, а не по ID склейки
+BY_ARTICLE_CABINETS = ('Мелихов', 'Мартыненко')
+
+SALES_RENAME = {
+    'ID KT': 'ID',
+    'Номнед': 'Неделя',
+    'Просмотры карточки': 'Переходы в карточку',
+    'Добавления в корзину': 'Положили в корзину',
+    'Количество заказов': 'Заказали, шт',
+    'Количество выкупов': 'Выкупили, шт',
+    'Количество отмен': 'Отменили, шт',
+    'Сумма заказов (руб)': 'Заказали на сумму, руб',
+}
+
+SALES_METRICS = ['Переходы в карточку', 'Положили в корзину', 'Заказали, шт',
+                 'Выкупили, шт', 'Отменили, шт', 'Заказали на сумму, руб']
+
+
+def flatten_sales_cards(cards: list[dict[str, Any]]) -> pd.DataFrame:
+    """
+    Разворачивает карточки `report_detail` в плоский DataFrame (одна страница или весь отчёт).
+    Колонки — по явной схеме `SALES_CARD_SCHEMA` (путь в JSON → русское название), поэтому
+    порядок и новые ключи в ответе API не сдвигают названия.
+    """
+    return SALES_CARD_FLATTENER.frame(cards)
+
+
 def get_current_week_sales_df(sales: pd.DataFrame, ID: pd.DataFrame, name: str) -> pd.DataFrame:
     """
     📊 Обработка статистики продаж за текущую неделю Wildberries с агрегацией по ID и неделе.
@@ -14,9 +107,9 @@ def get_current_week_sales_df(sales: pd.DataFrame, ID: pd.DataFrame, name: str)
 
     Параметры:
     ----------
-    sales : pd.DataFrame
-        DataFrame с вложенными JSON-данными по продажам за текущий и предыдущий периоды (как правило,
-        полученные через API Wildberries).
+    sales : pd.DataFrame | list[dict]
+        Плоский DataFrame с колонками `SALES_CARD_SCHEMA`, собранный `report_detail` постранично
+        через `flatten_sales_cards`, или список «сырых» карточек с вложенными JSON-данными.
 
     ID : pd.DataFrame
         Справочник с колонкой "Артикул WB" и "ID KT" для маппинга товаров на внутренние идентификаторы.
@@ -44,46 +137,20 @@ def get_current_week_sales_df(sales: pd.DataFrame, ID: pd.DataFrame, name: str)
     - Пропущенные значения ID KT заполняются 0.
     - Функция логирует первые 5 строк итогового результата и отправляет сообщение в Telegram при ошибках (если настроено).
     """
-    def read_to_json(data: dict[str, Any], parent_key='', sep='_') -> Dict[str, Any]:
-
-        items = []
-
-        for k, v in data.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            if isinstance(v, dict):
-                items.extend(read_to_json(v, new_key, sep=sep).items())
-            else:
-                items.append((new_key, v))
-
-        return dict(items)
-
-    data = [read_to_json(item) for item in sales]
-    df = pd.DataFrame(data)
+    if isinstance(sales, pd.DataFrame):
+        df = sales
+    else:
+        df = flatten_sales_cards(sales)
 
     assert isinstance(df, pd.DataFrame), "Входной df должен быть DataFrame"
 
-    columns_rus = [
-        'Артикул WB', 'Артикул поставщика', 'Бренд', 'ID категории', 'Название категории', 'Начало текущего периода', 'Конец текущего периода', 'Просмотры карточки', 'Добавления в корзину',
-        'Количество заказов', 'Сумма заказов (руб)', 'Количество выкупов', 'Сумма выкупов (руб)', 'Количество отмен', 'Сумма отмен (руб)', 'Среднее заказов в день', 'Средняя цена (руб)',
-        'Конверсия в корзину (%)', 'Конверсия в заказ (%)', 'Конверсия в выкуп (%)', 'Начало предыдущего периода', 'Конец предыдущего периода', 'Просмотры карточки (пред.)', 'Добавления в корзину (пред.)',
-        'Количество заказов (пред.)', 'Сумма заказов (пред., руб)', 'Количество выкупов (пред.)', 'Сумма выкупов (пред., руб)', 'Количество отмен (пред.)', 'Сумма отмен (пред., руб)', 'Среднее заказов в день (пред.)',
-        'Средняя цена (пред., руб)', 'Конверсия в корзину (пред., %)', 'Конверсия в заказ (пред., %)', 'Конверсия в выкуп (пред., %)', 'Динамика просмотров (%)', 'Динамика корзины (%)',
-        'Динамика заказов (%)', 'Динамика суммы заказов (%)', 'Динамика выкупов (%)', 'Динамика суммы выкупов (%)', 'Динамика отмен (%)', 'Динамика суммы отмен (%)', 'Динамика ср. заказов в день (%)',
-        'Динамика ср. цены (%)', 'Изменение конверсии в корзину', 'Изменение конверсии в заказ', 'Изменение конверсии в выкуп', 'Остатки на маркетплейсе', 'Остатки на WB'
-    ]
-
-    df = df.rename(
-        columns=dict(zip(df.columns.tolist(), columns_rus))
-    )
-
     date_col = ['Начало текущего периода', 'Конец текущего периода',
                 'Начало предыдущего периода', 'Конец предыдущего периода']
 
     df[date_col] = df[date_col].apply(
         pd.to_datetime, errors='coerce').apply(lambda x: x.dt.date)
 
-    current_week_col = df.columns[:df.columns.get_loc(
-        'Начало предыдущего периода')].tolist() + df.columns[-3:].tolist()
+    current_week_col = _current_week_columns(df.columns)
 
     current_week = df[current_week_col].copy()
 
@@ -122,7 +189,7 @@ def get_current_week_sales_df(sales: pd.DataFrame, ID: pd.DataFrame, name: str)
 
     })
 
-    if name not in ('Мелихов', 'Мартыненко'):
+    if name not in BY_ARTICLE_CABINETS:
         final_df = final_df.filter([
             'ID', 'Неделя', 'Переходы в карточку',	'Положили в корзину',	'Заказали, шт',	'Выкупили, шт', 'Отменили, шт',	'Заказали на сумму, руб',
         ])
@@ -169,3 +236,86 @@ def get_current_week_sales_df(sales: pd.DataFrame, ID: pd.DataFrame, name: str)
         ])
         logger.info(final_group_df.columns.tolist())
     return final_group_df
+
+
+def _current_week_columns(columns: pd.Index) -> list[str]:
+    return columns[:columns.get_loc('Начало предыдущего периода')].tolist() + [
+        'Изменение конверсии в выкуп', 'Остатки на маркетплейсе', 'Остатки на WB']
+
+
+def get_current_week_sales_batch(frames: dict[str, tuple[pd.DataFrame, pd.DataFrame]]) -> dict[str, pd.DataFrame]:
+    """
+    📦 `get_current_week_sales_df` сразу для всех кабинетов.
+
+    Колонки текущей недели всех кабинетов объединяются в одну таблицу с номером кабинета:
+    даты разбираются один раз (номер недели — из той же даты), merge со справочниками ID —
+    по (кабинет, `Артикул WB`), дубликаты убираются один раз. Группировка — одна на все
+    кабинеты с ID склейки и одна на `BY_ARTICLE_CABINETS`, с номером кабинета в ключе.
+
+    Значения и порядок строк каждого кабинета совпадают с `get_current_week_sales_df`; типы —
+    общие для всех кабинетов (например, ID — float, если хоть у одного кабинета есть артикулы
+    без склейки). Входные таблицы не меняются.
+
+    📤 Возвращает:
+    --------------
+    {кабинет: DataFrame} — в порядке `frames`.
+    """
+
+    names = list(frames)
+    sales = [df if isinstance(df, pd.DataFrame) else flatten_sales_cards(df) for df, _ in frames.values()]
+
+    current_week = concat_cabinets([df[_current_week_columns(df.columns)] for df in sales])
+    ID = concat_cabinets([ids for _, ids in frames.values()])
+
+    begin = pd.to_datetime(current_week['Начало текущего периода'], errors='coerce')
+    current_week['Начало текущего периода'] = begin.dt.date
+    current_week['Конец текущего периода'] = pd.to_datetime(
+        current_week['Конец текущего периода'], errors='coerce').dt.date
+    current_week['Номнед'] = begin.dt.isocalendar().week
+
+    # номер кабинета — обычная колонка таблицы (как `Кабинет` у одного кабинета)
+    cabinet = current_week.pop(CABINET)
+    current_week[CABINET] = cabinet
+
+    final_df = pd.merge(
+        current_week,
+        ID,
+        on=[CABINET, 'Артикул WB'],
+        how='left',
+        indicator=True
+    )
+
+    final_df['Кабинет'] = np.asarray(names, dtype=object)[final_df[CABINET].to_numpy()]
+    final_df['ID KT'] = final_df['ID KT'].fillna(0)
+
+    final_df = final_df.drop_duplicates().rename(columns=SALES_RENAME)
+
+    by_article = final_df['Кабинет'].isin(BY_ARTICLE_CABINETS)
+
+    by_id = final_df.loc[~by_article, [CABINET, 'ID', 'Неделя'] + SALES_METRICS]
+    by_id = by_id.groupby([CABINET, 'ID', 'Неделя']).agg(
+        {col: 'sum' for col in SALES_METRICS}).reset_index()
+
+    articles = final_df[by_article]
+    id_mapping = articles[[CABINET, 'Артикул WB', 'ID']].drop_duplicates()
+
+    grouped = articles.groupby([CABINET, 'Неделя', 'Артикул WB']).agg(
+        {col: 'sum' for col in SALES_METRICS}).reset_index()
+    grouped = grouped.merge(id_mapping, on=[CABINET, 'Артикул WB'], how='left')
+
+    # индекс — как после merge отдельного кабинета (с нуля), пропуски — от drop_duplicates
+    grouped.index = grouped.groupby(CABINET).cumcount().to_numpy()
+    grouped = grouped.drop_duplicates()
+
+    output = {}
+
+    for name, id_part, article_part in zip(names, split_cabinets(by_id, len(names)),
+                                           split_cabinets(grouped, len(names))):
+        if name in BY_ARTICLE_CABINETS:
+            output[name] = article_part.filter(['ID', 'Неделя'] + SALES_METRICS + ['Артикул WB'])
+        else:
+            output[name] = id_part.reset_index(drop=True)
+
+    logger.info(f"✅ Продажи {len(names)} кабинетов обработаны одним проходом ({len(final_df)} строк)")
+
+    return output
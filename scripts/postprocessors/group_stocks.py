@@ -1,53 +1,106 @@
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.utils.setup_logger import make_logger
+from scripts.postprocessors.cabinets import CABINET, concat_cabinets, split_cabinets
+from pandas.api.types import is_bool_dtype, is_integer_dtype
 import pandas as pd
+import numpy as np
 
 logger = make_logger(__name__, use_telegram=False)
 
 
-def merge_and_transform_stocks_with_idkt(stocks: pd.DataFrame, IDKT: pd.DataFrame, name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
-  
+KEYS = ['Артикул WB', 'Баркод']
+CARD_ROW = '_card_row'
+CARD_CODE = '_card_code'
 
-    stocks['Дата Обновления'] = pd.to_datetime(
-            stocks['Дата Обновления'],  errors='coerce').dt.date
+NUM_COLUMNS = ['Цена', 'Скидка', 'Итого остатки', 'Ширина', 'Высота', 'Длина', 'quantity']
+STRING_COLUMNS = ['Бренд', 'Размер', 'Категория', 'Наименование']
+STOCK_SERVICE_COLUMNS = ['warehouseName', 'inWayToClient', 'inWayFromClient',
+                         'category', 'subject', 'isRealization', 'SCCode', 'isSupply']
 
-    logger.info(stocks['Дата Обновления'])
-        # сортируем в порядке убывания
-    df_sort = stocks.sort_values('Дата Обновления', ascending=False)
+RESULT_COLUMNS = [
+    'Артикул WB', 'ID KT', 'Артикул поставщика', 'Бренд', 'Наименование', 'Категория',
+    'Итого остатки', 'Цена', 'Скидка', 'Цена до СПП', 'Фото', 'Ширина', 'Высота', 'Длина', 'Кабинет', 'Баркод', 'Размер', 'Дата Обновления', 'quantity'
+]
+# кабинеты, для которых в таблицу не идут дата, склады и баркоды
+SHORT_RESULT_CABINETS = ('Мишнева', 'Шелудько')
+SHORT_RESULT_DROP = ['Дата Обновления', 'Остатки', 'Баркод', 'Размер']
 
-        # создаем новый столбец и подставяем туда последнюю актуальную цену
-    last_date = stocks.groupby('Артикул WB')[
-            'Дата Обновления'].transform('max')
-        
-    latest_rows = stocks[stocks['Дата Обновления'] == last_date]
-
-       
-    max_price = (
-            latest_rows
-            .groupby('Артикул WB', as_index=False)['Цена']
-            .max()
-            .rename(columns={'Цена': 'Макс_цена'})
-        )
 
-    max_discount = (
-            latest_rows
-            .groupby('Артикул WB', as_index=False)['Скидка']
-            .max()
-            .rename(columns={'Скидка': 'Макс_скидка'})
-        )
-    df_sort = (
-            df_sort
-            .merge(max_price, on='Артикул WB', how='left')
-            .merge(max_discount, on='Артикул WB', how='left')
-        )
+def _fill_gaps(df: pd.DataFrame) -> pd.DataFrame:
+    num_cols = [col for col in NUM_COLUMNS if col in df.columns]
+    string_cols = [col for col in STRING_COLUMNS if col in df.columns]
+
+    df[num_cols] = df[num_cols].fillna(0)
+
+    # category (после compact_frame): '-' добавляется в категории с сохранением порядка сортировки
+    for col in string_cols:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and '-' not in df[col].cat.categories:
+            df[col] = df[col].cat.set_categories(sorted([*df[col].cat.categories, '-']))
+
+    df[string_cols] = df[string_cols].fillna('-')
+    return df
+
+
+def card_codes(IDKT: pd.DataFrame, outer_gaps: bool) -> tuple[np.ndarray, pd.DataFrame]:
+    """
+    Коды описаний карточек.
+
+    Одинаковые строки IDKT (после тех же заполнений пропусков, что и в итоговой таблице)
+    получают один код; коды идут в порядке сортировки строк, поэтому сортировка по коду
+    совпадает с сортировкой по всем колонкам описания. -1 — в описании есть пропуск
+    (например, нет фото): такие строки в группировку не попадают.
+
+    `outer_gaps` — в outer merge были остатки без карточки: колонки IDKT получили пропуски,
+    int стали float, bool — object; типы приводятся так же.
+
+    📤 Возвращает:
+    --------------
+    (код для каждой строки IDKT, описания — строка на код в порядке кодов)
+    """
+
+    cards = IDKT.copy()
+
+    if outer_gaps:
+        for col in cards.columns:
+            if col in KEYS:
+                continue
+            if is_bool_dtype(cards[col]):
+                cards[col] = cards[col].astype(object)
+            elif is_integer_dtype(cards[col]):
+                cards[col] = cards[col].astype(float)
+
+    cards = _fill_gaps(cards)
 
-    df_sort['Цена'] = df_sort['Макс_цена']
-    df_sort['Скидка'] = df_sort['Макс_скидка']
-    df_sort = df_sort.drop(['Макс_цена', 'Макс_скидка',], axis=1)
+    codes = cards.groupby(list(cards.columns), sort=True, observed=True).ngroup()
+    codes = codes.fillna(-1).to_numpy(dtype=np.int64)
 
-    if name not in ('Мишнева', 'Шелудько'):
-        logger.warning(f"{name} зашли в дату обновления last_date")
-        df_sort['Дата Обновления'] = last_date
+    _, first = np.unique(codes, return_index=True)
+    first = first[codes[first] >= 0]
+
+    return codes, cards.iloc[first].reset_index(drop=True)
+
+
+def merge_and_transform_stocks_with_idkt(stocks: pd.DataFrame, IDKT: pd.DataFrame, name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    📦 Объединяет остатки кабинета WB (`get_stocks`) с карточками (IDKT) и группирует их.
+
+    Одна строка итоговой таблицы — описание карточки/баркода + дата обновления и цена со складов.
+    Описание (ID KT, наименование, бренд, размер, фото, габариты…) берётся из IDKT, поэтому
+    с остатками объединяются только ключи (`Артикул WB`, `Баркод`), а группировки идут по коду
+    описания (`card_codes`, считается по IDKT) и колонкам остатков. Описание подставляется
+    по коду в конце. Таблица совпадает с прежней группировкой по всем колонкам, включая порядок
+    строк и типы (регрессия — `scripts.bench.group_stocks`).
+
+    Цена / Скидка: пустые (карточка без остатков) заполняются предыдущим значением артикула,
+    затем на весь артикул ставится цена первой строки (одна именованная агрегация).
+
+    📤 Возвращает:
+    --------------
+    (остатки по кабинету, `Артикул WB` / `Баркод` / `Артикул поставщика` / `Размер`)
+    """
+
+    stocks['Дата Обновления'] = pd.to_datetime(
+        stocks['Дата Обновления'], errors='coerce').dt.date
 
     try:
         logger.info(
@@ -69,17 +122,21 @@ def merge_and_transform_stocks_with_idkt(stocks: pd.DataFrame, IDKT: pd.DataFram
         msg = f"❌ Не удалось привести типы данных {name}: {e}"
         send_tg_message(msg)
         logger.error(msg)
-        # Объединяем две таблицы остатки цепляем к idkt
+        # Объединяем ключи карточек с остатками; описание карточек подставим после группировки
     try:
         logger.info("🔗 Выполняем объединение таблиц (merge)...")
 
+        # колонки остатков, которые есть и в IDKT (бренд, размер, артикул поставщика), берутся из IDKT
+        stock_part = stocks.drop(
+            columns=[col for col in stocks.columns if col in IDKT.columns and col not in KEYS] + STOCK_SERVICE_COLUMNS,
+            errors='ignore')
+
         result = pd.merge(
-            IDKT,
-            stocks,
-            on=['Артикул WB', 'Баркод'],
+            IDKT[KEYS].assign(**{CARD_ROW: np.arange(len(IDKT))}),
+            stock_part,
+            on=KEYS,
             how='outer',
-            indicator=True,
-            suffixes=('_IDKT', '_stocks')
+            indicator=True
         )
         logger.info("✅ Объединение выполнено успешно!")
 
@@ -90,21 +147,6 @@ def merge_and_transform_stocks_with_idkt(stocks: pd.DataFrame, IDKT: pd.DataFram
 
     try:
         logger.info("🧹 Начинаем финальную очистку и обработку данных...")
-        # Удаляем не нужные столбцы
-        result = result.drop(columns=[col for col in result.columns if col.endswith('_stocks')]+['warehouseName',
-                                                                                                 'inWayToClient', 'inWayFromClient',
-                                                                                                 'category', 'subject', 'isRealization', 'SCCode', 'isSupply'], errors='ignore')
-
-        # удаляем суффиксы _IDKT у столбцов, которые остались
-        result.columns = [
-            col.replace('_IDKT', '') for col in result.columns
-        ]
-
-        # выбираем столбцы
-        num_col = ['Цена', 'Скидка',
-                   'Итого остатки', 'Ширина', 'Высота', 'Длина', 'quantity']
-        string_cols = ['Бренд', 'Размер', 'Категория', 'Наименование',
-                       ]
 
         # Заполняем NAN в Цена и Скидка последними известными знач для артикула
         result['Дата Обновления'] = result['Дата Обновления'].astype(str)
@@ -112,8 +154,7 @@ def merge_and_transform_stocks_with_idkt(stocks: pd.DataFrame, IDKT: pd.DataFram
         result[['Цена', 'Скидка']] = result.groupby(
             'Артикул WB')[['Цена', 'Скидка']].ffill()
         # заполняем пустоты нужными значениями
-        result[num_col] = result[num_col].fillna(0)
-        result[string_cols] = result[string_cols].fillna('-')
+        result = _fill_gaps(result)
 
         # сохраняем только те строки, которые есть в таблице stocks остатки
         right_only_rows = result[result['_merge'] == 'right_only']
@@ -121,52 +162,63 @@ def merge_and_transform_stocks_with_idkt(stocks: pd.DataFrame, IDKT: pd.DataFram
         # в осноном дф удаляем строки которые есть только в правой таблице, они косячные
         result = result[result['_merge'] != 'right_only']
 
-        # удаляем столбец _merge
-        result = result.drop(columns='_merge')
+        codes, cards = card_codes(IDKT, outer_gaps=len(right_only_rows) > 0)
+
+        stock_columns = [col for col in result.columns
+                         if col not in KEYS + [CARD_ROW, '_merge', 'quantity', 'Итого остатки']]
+
+        code = codes[result[CARD_ROW].to_numpy(dtype=np.int64)]
+        result = result[stock_columns + ['quantity', 'Итого остатки']]
+        result.insert(0, CARD_CODE, code)
+        result = result[code >= 0]
 
         # группируем по столбцу итого остатки
         logger.debug('Группируем Итого остатки')
-        result = result.groupby([
-            col for col in result.columns if col != 'Итого остатки' and col !='quantity'
-        ]).agg({
+        result = result.groupby([CARD_CODE] + stock_columns).agg({
             'quantity': 'sum',
-            'Итого остатки':'sum'
+            'Итого остатки': 'sum'
         }).reset_index()
 
+        card_index = result[CARD_CODE].to_numpy()
+
         logger.debug(result.columns.tolist())
         logger.info(result.head(5))
-        # ['Итого остатки'].sum().reset_index()
         # Создаем новый столбец Цена до СПП
         result['Цена до СПП'] = result['Цена'] * \
             (1 - result['Скидка']/100)
 
         # дф с артикулом и баркодом
 
-        seller_article = result.filter([
+        seller_article = cards.filter([
             'Артикул WB', 'Баркод', 'Артикул поставщика', 'Размер'
-        ])
+        ]).take(card_index).reset_index(drop=True)
 
-        # result = result.drop(columns=[
-        #     'Баркод', 'Размер'
-        # ])
+        # на весь артикул — цена и скидка первой строки (строки уже отсортированы по описанию)
+        nm_id = cards['Артикул WB'].to_numpy()[card_index]
 
-        result[['Цена', 'Скидка', 'Цена до СПП']] = result.groupby(
-            'Артикул WB')[['Цена', 'Скидка', 'Цена до СПП']].transform('first')
+        first_price = result.groupby(nm_id, sort=False).agg(**{
+            'Цена': ('Цена', 'first'),
+            'Скидка': ('Скидка', 'first'),
+            'Цена до СПП': ('Цена до СПП', 'first'),
+        })
+        for col in first_price.columns:
+            result[col] = first_price[col].reindex(nm_id).to_numpy()
 
         # группировка после удаления по сумме остатков
-        result = result.groupby([
-            col for col in result.columns if col != 'Итого остатки'
-        ])['Итого остатки'].sum().reset_index()
+        result = result.groupby(
+            [CARD_CODE] + stock_columns + ['quantity', 'Цена до СПП']
+        )['Итого остатки'].sum().reset_index()
+
+        # подставляем описание карточек
+        result = pd.concat([
+            cards.take(result[CARD_CODE].to_numpy()).reset_index(drop=True),
+            result.drop(columns=CARD_CODE)
+        ], axis=1)
 
         result['Кабинет'] = name
         
-        new_order = [
-            'Артикул WB', 'ID KT', 'Артикул поставщика', 'Бренд', 'Наименование', 'Категория',
-            'Итого остатки', 'Цена', 'Скидка', 'Цена до СПП', 'Фото', 'Ширина', 'Высота', 'Длина', 'Кабинет', 'Баркод', 'Размер', 'Дата Обновления', 'quantity'
-        ]
-
         # применяем новое расположение
-        result = result[new_order].rename(columns={'quantity': 'Остатки'})
+        result = result[RESULT_COLUMNS].rename(columns={'quantity': 'Остатки'})
       
 
         result = result.sort_values('Итого остатки', ascending=False)
@@ -190,7 +242,132 @@ def merge_and_transform_stocks_with_idkt(stocks: pd.DataFrame, IDKT: pd.DataFram
         logger.error(msg)
 
     logger.debug(f"\n{name} -> {result.columns.tolist()}")
-    if name in ('Мишнева', 'Шелудько'):
-        result = result.drop(columns=['Дата Обновления', 'Остатки',  'Баркод', 'Размер'])
+    if name in SHORT_RESULT_CABINETS:
+        result = result.drop(columns=SHORT_RESULT_DROP)
 
     return result, seller_article
+
+
+def merge_and_transform_stocks_batch(frames: dict[str, tuple[pd.DataFrame, pd.DataFrame]]
+                                     ) -> dict[str, tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    📦 `merge_and_transform_stocks_with_idkt` сразу для всех кабинетов.
+
+    Остатки и IDKT кабинетов объединяются в две таблицы с номером кабинета (`CABINET`), и тот же
+    алгоритм идёт по ним один раз: даты и типы приводятся одним вызовом, merge — по
+    (кабинет, `Артикул WB`, `Баркод`), коды описаний (`card_codes`) — по IDKT всех кабинетов
+    (номер кабинета — первая колонка описания), группировки и «цена первой строки» — с номером
+    кабинета в ключе. В конце таблица делится по кабинетам, и каждая часть сортируется так же,
+    как в `merge_and_transform_stocks_with_idkt`.
+
+    Значения и порядок строк каждого кабинета совпадают с поштучной обработкой; типы колонок —
+    общие для всех кабинетов, как после `pd.concat` при выгрузке (регрессия —
+    `scripts.bench.batch_postprocess`). Входные таблицы не меняются.
+
+    📤 Возвращает:
+    --------------
+    {кабинет: (остатки, `Артикул WB` / `Баркод` / `Артикул поставщика` / `Размер`)} — в порядке `frames`.
+    """
+
+    names = list(frames)
+
+    stocks = concat_cabinets([stock for stock, _ in frames.values()])
+    IDKT = concat_cabinets([idkt for _, idkt in frames.values()])
+
+    stocks['Дата Обновления'] = pd.to_datetime(stocks['Дата Обновления'], errors='coerce').dt.date
+
+    for df in (stocks, IDKT):
+        df['Артикул WB'] = df['Артикул WB'].astype(int)
+        df['Баркод'] = df['Баркод'].astype(str)
+        df['Размер'] = df['Размер'].astype(str)
+
+    IDKT['ID KT'] = IDKT['ID KT'].astype(int)
+
+    # номер кабинета — первая колонка описания: коды идут по кабинетам, внутри — как у одного кабинета
+    IDKT = IDKT[[CABINET] + [col for col in IDKT.columns if col != CABINET]]
+    keys = [CABINET] + KEYS
+
+    stock_part = stocks.drop(
+        columns=[col for col in stocks.columns if col in IDKT.columns and col not in keys] + STOCK_SERVICE_COLUMNS,
+        errors='ignore')
+
+    result = pd.merge(
+        IDKT[keys].assign(**{CARD_ROW: np.arange(len(IDKT))}),
+        stock_part,
+        on=keys,
+        how='outer',
+        indicator=True
+    )
+
+    result['Дата Обновления'] = result['Дата Обновления'].astype(str)
+    result[['Цена', 'Скидка']] = result.groupby([CABINET, 'Артикул WB'])[['Цена', 'Скидка']].ffill()
+    result = _fill_gaps(result)
+
+    right_only = result['_merge'] == 'right_only'
+    broken = result.loc[right_only, [CABINET, 'Артикул WB']]
+    result = result[~right_only]
+
+    codes, cards = card_codes(IDKT, outer_gaps=bool(right_only.any()))
+
+    stock_columns = [col for col in result.columns
+                     if col not in keys + [CARD_ROW, '_merge', 'quantity', 'Итого остатки']]
+
+    code = codes[result[CARD_ROW].to_numpy(dtype=np.int64)]
+    result = result[[CABINET] + stock_columns + ['quantity', 'Итого остатки']]
+    result.insert(0, CARD_CODE, code)
+    result = result[code >= 0]
+
+    result = result.groupby([CARD_CODE, CABINET] + stock_columns).agg({
+        'quantity': 'sum',
+        'Итого остатки': 'sum'
+    }).reset_index()
+
+    card_index = result[CARD_CODE].to_numpy()
+
+    result['Цена до СПП'] = result['Цена'] * (1 - result['Скидка']/100)
+
+    seller_article = cards.filter([
+        CABINET, 'Артикул WB', 'Баркод', 'Артикул поставщика', 'Размер'
+    ]).take(card_index).reset_index(drop=True)
+
+    # на весь артикул кабинета — цена и скидка первой строки
+    nm_id = pd.MultiIndex.from_arrays([result[CABINET].to_numpy(), cards['Артикул WB'].to_numpy()[card_index]])
+
+    first_price = result.groupby(nm_id, sort=False).agg(**{
+        'Цена': ('Цена', 'first'),
+        'Скидка': ('Скидка', 'first'),
+        'Цена до СПП': ('Цена до СПП', 'first'),
+    })
+    for col in first_price.columns:
+        result[col] = first_price[col].reindex(nm_id).to_numpy()
+
+    result = result.groupby(
+        [CARD_CODE, CABINET] + stock_columns + ['quantity', 'Цена до СПП']
+    )['Итого остатки'].sum().reset_index()
+
+    result = pd.concat([
+        cards.drop(columns=CABINET).take(result[CARD_CODE].to_numpy()).reset_index(drop=True),
+        result.drop(columns=CARD_CODE)
+    ], axis=1)
+
+    result['Кабинет'] = np.asarray(names, dtype=object)[result[CABINET].to_numpy()]
+    result = result[RESULT_COLUMNS + [CABINET]].rename(columns={'quantity': 'Остатки'})
+
+    output = {}
+    parts = zip(names, split_cabinets(result, len(names)), split_cabinets(seller_article, len(names)))
+
+    for i, (name, part, articles) in enumerate(parts):
+        part = part.reset_index(drop=True).sort_values('Итого остатки', ascending=False)
+
+        if name in SHORT_RESULT_CABINETS:
+            part = part.drop(columns=SHORT_RESULT_DROP)
+
+        missing = broken.loc[broken[CABINET] == i, 'Артикул WB']
+        if len(missing):
+            logger.warning(f"косячная карточка кабинета {name} = {len(missing)} строк\n{missing.to_list()}")
+
+        output[name] = (part, articles.reset_index(drop=True))
+
+    logger.info(f"✅ Остатки {len(names)} кабинетов обработаны одним проходом ({len(result)} строк)")
+
+    return output
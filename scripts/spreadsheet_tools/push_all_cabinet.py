@@ -1,9 +1,9 @@
 from scripts.utils.setup_logger import make_logger
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 from scripts.utils.config.factory import tables_names
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.utils.prepare_values_df import prepare_values_for_sheets
-from gspread.utils import rowcol_to_a1
+from scripts.utils.sheet_sync import sync_values
 from typing import Optional
 import pandas as pd
 import time
@@ -77,6 +77,10 @@ def push_concat_all_cabinet_stocks_to_sheets(
         Опционально. Список артикулов (NM ID), которые нужно исключить перед загрузкой.
         Применяется фильтрация по столбцу "Артикул WB".
 
+    - start_range (str | None):
+        Левая верхняя ячейка выгрузки. Если задана — лист обновляется через `sync_values()`:
+        отправляются только изменившиеся с прошлой выгрузки ячейки.
+
     ────────────────────────────────────────────────────────────────────────────
 
     🔁 Алгоритм работы:
@@ -85,14 +89,14 @@ def push_concat_all_cabinet_stocks_to_sheets(
     2. Получение таблицы `Ассортиментная матрица. Полная` и листа `sheet_name`.
     3. Объединение всех датафреймов в один.
     4. Фильтрация по блок-листу, если указан.
-    5. Очистка листа (весь или по диапазону).
+    5. Запись только изменившихся ячеек (`start_range`) или очистка и полная запись листа.
     6. Загрузка объединённых данных с заголовками.
     7. Логирование результатов и отправка ошибок в Telegram.
 
     ────────────────────────────────────────────────────────────────────────────
 
     🧾 Используемые утилиты:
-    - `get_gspread_client()` → авторизация в Google Sheets
+    - `get_sheets_session()` → общая сессия Google Sheets (клиент, таблицы, листы)
     - `get_assortment_matrix_complete()` → имя таблицы
     - `send_tg_message()` → уведомление об ошибках
     - `make_logger()` → логирование в файл/терминал
@@ -111,7 +115,7 @@ def push_concat_all_cabinet_stocks_to_sheets(
         sh = tables_names()['wb_matrix_complete']
         logger.info('🔌 Подключаюсь к Google Sheets клиенту...')
 
-        gs = get_gspread_client()
+        gs = get_sheets_session()
         logger.info('✅ Успешно подключен к Google Sheets!')
 
     except Exception:
@@ -134,7 +138,7 @@ def push_concat_all_cabinet_stocks_to_sheets(
                 else:
                     raise
 
-        worksheet = spreadsheet.worksheet(sheet_name)
+        worksheet = gs.worksheet(spreadsheet, sheet_name)
 
         if block_nmid is not None and not block_nmid.empty:
 
@@ -153,16 +157,18 @@ def push_concat_all_cabinet_stocks_to_sheets(
             logger.info(f"📊 Объединено строк: {len(df_combined)}")
 
         if start_range:
-            cols = df_combined.shape[1]
             logger.debug(f"start_range == {start_range}")
-            clear_range = f"{start_range}:{rowcol_to_a1(1, cols).rstrip('0123456789')}"
-
-            logger.debug(f"clear_range == {clear_range}")
-            worksheet.batch_clear([clear_range])
-            
-            logger.info(
-                f"🧼 Очищен диапазон {clear_range} в листе '{sheet_name}'")
-            values =prepare_values_for_sheets(df_combined)
+
+            sync_values(
+                worksheet=worksheet,
+                values=prepare_values_for_sheets(df_combined),
+                start_range=start_range,
+                clear_columns=True,
+            )
+
+            logger.info(f"✅ Данные успешно выгружены в лист '{sheet_name}'")
+            return
+
         else:
             worksheet.batch_clear()
             logger.info(f"🧼 Полностью очищен лист '{sheet_name}'")
@@ -1,5 +1,5 @@
 import pandas as pd
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.config.factory import table_name_mirshik
 from gspread_dataframe import set_with_dataframe
@@ -8,7 +8,7 @@ logger = make_logger(__name__, use_telegram=False)
 
 
 def push_stocks_mishneva_sheludko(data: dict[str, pd.DataFrame], sheet_name: str = 'Остатки API'):
-    gs = get_gspread_client()
+    gs = get_sheets_session()
     table_names = table_name_mirshik()
 
     group_map = {
@@ -32,7 +32,7 @@ def push_stocks_mishneva_sheludko(data: dict[str, pd.DataFrame], sheet_name: str
 
         try:
 
-            worksheet = spreadsheet.worksheet(sheet_name)
+            worksheet = gs.worksheet(spreadsheet, sheet_name)
             logger.info(f"📄 Лист найден: {sheet_name}")
 
         except Exception:
@@ -42,6 +42,7 @@ def push_stocks_mishneva_sheludko(data: dict[str, pd.DataFrame], sheet_name: str
 
                 worksheet = spreadsheet.add_worksheet(
                     title=sheet_name, rows=1, cols=1)
+                gs.invalidate(spreadsheet)
                 logger.info(f"✅ Лист создан: {sheet_name}")
 
             except Exception as e:
@@ -1,7 +1,7 @@
 import pandas as pd
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.config.factory import tables_names, sheets_names
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 from scripts.utils.prepare_values_df import prepare_values_for_sheets
 from scripts.utils.telegram_logger import send_tg_message
 from gspread.utils import rowcol_to_a1
@@ -17,7 +17,7 @@ def upload_my_werehouse_df_in_assortment_matrix_full(mywerehouse: pd.DataFrame,
 
     try:
         logger.info('🔌 Подключаюсь к gspread...')
-        gs = get_gspread_client()
+        gs = get_sheets_session()
 
         logger.info('📄 Получаю название таблицы для загрузки...')
         table_name = tables_names()['wb_matrix_complete']
@@ -32,7 +32,7 @@ def upload_my_werehouse_df_in_assortment_matrix_full(mywerehouse: pd.DataFrame,
 
     try:
         logger.info(f'🔎 Проверяю наличие листа: "{sheet_name}"')
-        worksheet = spreadsheet.worksheet(sheet_name)
+        worksheet = gs.worksheet(spreadsheet, sheet_name)
         if start_range:
             clear_range = f"{start_range}:{rowcol_to_a1(1, num_cols).rstrip('123456789')}"
             logger.debug(f'📄 Лист найден. диапозон clear_range {clear_range}...')
@@ -46,6 +46,7 @@ def upload_my_werehouse_df_in_assortment_matrix_full(mywerehouse: pd.DataFrame,
                 rows=mywerehouse.shape[0],
                 cols=mywerehouse.shape[1]
             )
+        gs.invalidate(spreadsheet)
         values = prepare_values_for_sheets(mywerehouse) + mywerehouse.values.tolist()
 
 
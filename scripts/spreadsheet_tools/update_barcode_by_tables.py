@@ -1,8 +1,10 @@
 from scripts.utils.config.factory import get_client_info, sheets_names
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.utils.setup_logger import make_logger
+from scripts.utils.sheets_scheduler import run_uploads
 from gspread_dataframe import set_with_dataframe
+from functools import partial
 
 from collections import defaultdict
 import pandas as pd
@@ -38,8 +40,8 @@ def update_barcode(data: dict[str, tuple[pd.DataFrame, pd.DataFrame, pd.DataFram
     1. Получает карту групп пользователей `get_group_map()`:
         - Определяет, в какую таблицу какие пользователи входят.
     2. Группирует штрихкоды (`df_barcode`) по соответствующим таблицам.
-    3. Подключается к Google Sheets через `get_gspread_client()`.
-    4. Для каждой целевой таблицы:
+    3. Подключается к Google Sheets через `get_sheets_session()`.
+    4. Для каждой целевой таблицы (параллельно, через `run_uploads()`):
         - Открывает лист `api_wb_barcode`
         - Очищает диапазон (по умолчанию A:C)
         - Загружает отфильтрованные штрихкоды.
@@ -48,7 +50,7 @@ def update_barcode(data: dict[str, tuple[pd.DataFrame, pd.DataFrame, pd.DataFram
     ────────────────────────────────────────────────────────────────────────────
 
     🧾 Зависимости:
-    - `get_gspread_client()` → авторизация в Google Sheets
+    - `get_sheets_session()` → общая сессия Google Sheets (клиент, таблицы, листы)
     - `get_group_map()` → карта распределения пользователей по таблицам
     - `sheets_names()` → получение имени листа для выгрузки
     - `set_with_dataframe()` → выгрузка DataFrame в лист
@@ -79,7 +81,7 @@ def update_barcode(data: dict[str, tuple[pd.DataFrame, pd.DataFrame, pd.DataFram
 
     try:
         logger.info('🔌 Подключаюсь к Google Sheets клиенту...')
-        gs = get_gspread_client()
+        gs = get_sheets_session()
 
         logger.info('✅ Подключение к Google Sheets установлено')
     except Exception:
@@ -97,13 +99,13 @@ def update_barcode(data: dict[str, tuple[pd.DataFrame, pd.DataFrame, pd.DataFram
     logger.info("📊 Данные баркодов сгруппированы по таблицам")
 
     # === Загрузка данных в таблицы ===
-    for sheet, df_barcode in grouped_df.items():
+    def upload_sheet(sheet: str, df_barcode: pd.DataFrame) -> None:
         try:
             logger.info(f'📂 Открываю таблицу: "{sheet}"')
             spreadsheet = gs.open(sheet)
 
             logger.info(f'📄 Открываю лист: "{sheet_name}"')
-            worksheet = spreadsheet.worksheet(sheet_name)
+            worksheet = gs.worksheet(spreadsheet, sheet_name)
 
             logger.info(
                 f'🧼 Очищаю диапазон {clear_range} в листе "{sheet_name}"')
@@ -127,4 +129,9 @@ def update_barcode(data: dict[str, tuple[pd.DataFrame, pd.DataFrame, pd.DataFram
             logger.exception(msg)
             send_tg_message(msg)
 
+    run_uploads({
+        sheet: partial(upload_sheet, sheet, df_barcode)
+        for sheet, df_barcode in grouped_df.items()
+    })
+
     send_tg_message("🏁 Загрузка всех баркодов завершена")
@@ -1,6 +1,6 @@
 from scripts.utils.config.factory import sheets_names, tables_names
 from gspread.exceptions import APIError
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.utils.setup_logger import make_logger
 from gspread_dataframe import set_with_dataframe
@@ -48,7 +48,7 @@ def upload_oz_stocks_oz_matrix(data: dict[str, pd.DataFrame], clear_range=['A:M'
         logger.info(
             '📡 Инициализирую GSpread клиента и получаю название таблицы...')
 
-        gs = get_gspread_client()
+        gs = get_sheets_session()
         table = tables_names()['oz_matrix_complete']
 
         logger.info(f"✅ Таблица найдена: '{table}'")
@@ -68,7 +68,7 @@ def upload_oz_stocks_oz_matrix(data: dict[str, pd.DataFrame], clear_range=['A:M'
             sheet_name = f"{sheets_names()['ozon_stocks']}_{name}"
             spreadsheet = gs.open(table)
 
-            work_sheets = [ws.title for ws in spreadsheet.worksheets()]
+            work_sheets = [ws.title for ws in gs.worksheets(spreadsheet)]
 
             logger.info(f"📌 {name} → Название листа: '{sheet_name}'")
 
@@ -84,7 +84,7 @@ def upload_oz_stocks_oz_matrix(data: dict[str, pd.DataFrame], clear_range=['A:M'
 
                 logger.info(
                     f"🧼 {name} → Лист найден, очищаю и настраиваю размеры")
-                wsheet = spreadsheet.worksheet(sheet_name)
+                wsheet = gs.worksheet(spreadsheet, sheet_name)
 
                 wsheet.batch_clear(clear_range)
 
@@ -93,6 +93,7 @@ def upload_oz_stocks_oz_matrix(data: dict[str, pd.DataFrame], clear_range=['A:M'
                 logger.info(f"🆕 {name} → Лист не найден, создаю новый")
                 wsheet = spreadsheet.add_worksheet(
                     title=sheet_name, rows=df.shape[0], cols=df.shape[1])
+                gs.invalidate(spreadsheet)
 
         except Exception as e:
             msg = f"❌ {name} → Ошибка при работе с листом: {e}"
@@ -2,7 +2,9 @@
 from scripts.utils.telegram_logger import send_tg_message
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.config.factory import get_client_info
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
+from scripts.utils.sheets_scheduler import run_uploads
+from functools import partial
 import pandas as pd
 
 logger = make_logger(__name__, use_telegram=True)
@@ -39,6 +41,7 @@ def save_in_gsh(dict_data: dict[str, pd.DataFrame], worksheet_name: str) -> None
         - Таблица открывается через Google Sheets API.
         - Если данных больше текущих размеров листа, он расширяется.
         - Данные добавляются после последней строки.
+    3. Итоговые таблицы обновляются параллельно (`run_uploads()`).
 
     Возвращает:
     -----------
@@ -48,7 +51,7 @@ def save_in_gsh(dict_data: dict[str, pd.DataFrame], worksheet_name: str) -> None
     ------------
     - gspread
     - pandas
-    - gspread_client.get_gspread_client()
+    - gspread_client.get_sheets_session()
 
     Пример:
     -------
@@ -90,44 +93,49 @@ def save_in_gsh(dict_data: dict[str, pd.DataFrame], worksheet_name: str) -> None
             return {}
 
     def update_sheet(group: dict[str, pd.DataFrame], worksheet_name: str) -> None:
-        gs = get_gspread_client()
+        gs = get_sheets_session()
 
         if not group:
             logger.warning(
                 "⛔️ Нет данных для обновления таблицы — update_sheet() не будет выполнен")
             return
 
-        try:
+        def append_rows(name: str, df: pd.DataFrame) -> None:
+            logger.info(
+                f"📌 Открываю Google Sheet: '{name}' → Лист: '{worksheet_name}'")
 
-            for name, df in group.items():
-                logger.info(
-                    f"📌 Открываю Google Sheet: '{name}' → Лист: '{worksheet_name}'")
+            sh = gs.open(name)
+            worksheet = gs.worksheet(sh, worksheet_name)
 
-                sh = gs.open(name)
-                worksheet = sh.worksheet(worksheet_name)
+            existing = worksheet.get_all_values()
+            start_row = len(existing) + 1 if existing else 1
 
-                existing = worksheet.get_all_values()
-                start_row = len(existing) + 1 if existing else 1
+            current_rows = worksheet.row_count
+            current_cols = worksheet.col_count
 
-                current_rows = worksheet.row_count
-                current_cols = worksheet.col_count
+            req_rows = len(df) + start_row
+            req_cols = df.shape[1]
 
-                req_rows = len(df) + start_row
-                req_cols = df.shape[1]
+            if req_cols > current_cols or req_rows > current_rows:
 
-                if req_cols > current_cols or req_rows > current_rows:
+                worksheet.resize(
+                    rows=max(req_rows, current_rows),
+                    cols=max(req_cols, current_cols)
+                )
 
-                    worksheet.resize(
-                        rows=max(req_rows, current_rows),
-                        cols=max(req_cols, current_cols)
-                    )
+            logger.info(
+                f"📤 Кабинет {name} Добавляю {len(df)} строк в таблицу '{worksheet_name}' начиная с A{start_row}")
 
-                logger.info(
-                    f"📤 Кабинет {name} Добавляю {len(df)} строк в таблицу '{worksheet_name}' начиная с A{start_row}")
+            # запись в диапазон, посчитанный по одному чтению (не values.append): повтор запроса
+            # после 5xx в QuotaHTTPClient перезапишет те же ячейки, а не добавит строки второй раз
+            worksheet.update(
+                range_name=f"A{start_row}",
+                values=df.values.tolist())
 
-                worksheet.update(
-                    range_name=f"A{start_row}",
-                    values=df.values.tolist())
+        try:
+            run_uploads({
+                name: partial(append_rows, name, df) for name, df in group.items()
+            })
         except Exception:
             logger.exception("Ошибка при обновлении листов")
 
@@ -0,0 +1,122 @@
+from scripts.utils.setup_logger import make_logger
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+import pandas as pd
+import hashlib
+import json
+import os
+
+logger = make_logger(__name__, use_telegram=False)
+
+CACHE_DIR = os.path.join('cache', 'cards')
+CACHE_VERSION = 1
+
+
+class CachedCards(NamedTuple):
+    frame: pd.DataFrame
+    cursor: dict[str, object]
+
+
+def _token_hash(api: str) -> str:
+    return hashlib.sha256(api.encode('utf-8')).hexdigest()[:16]
+
+
+def _paths(name: str) -> tuple[str, str]:
+    base = os.path.join(os.getenv('CARDS_CACHE_DIR', CACHE_DIR), name)
+    return f"{base}.parquet", f"{base}.json"
+
+
+def _max_age() -> timedelta:
+    return timedelta(days=float(os.getenv('CARDS_CACHE_MAX_AGE_DAYS', 7)))
+
+
+def load_cards_cache(name: str, api: str) -> Optional[CachedCards]:
+    """
+    📂 Читает сохранённый каталог карточек кабинета и курсор последнего изменения.
+
+    Возвращает None (нужна полная выгрузка), если:
+    - кеша нет или он повреждён;
+    - кеш сохранён с другим токеном (сменили ключ / другой кабинет под тем же именем);
+    - кеш старше `CARDS_CACHE_MAX_AGE_DAYS` (по умолчанию 7 дней) — раз в период каталог
+      перекачивается полностью, чтобы убрать удалённые карточки.
+    """
+    data_path, meta_path = _paths(name)
+
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        logger.info(f"📂 {name}: кеш карточек не найден — полная выгрузка")
+        return None
+
+    try:
+        with open(meta_path, encoding='utf-8') as file:
+            meta = json.load(file)
+
+        if meta.get('version') != CACHE_VERSION or meta.get('token') != _token_hash(api):
+            logger.info(
+                f"📂 {name}: кеш карточек от другой версии/токена — полная выгрузка")
+            return None
+
+        saved_at = datetime.fromisoformat(meta['saved_at'])
+        if datetime.now() - saved_at > _max_age():
+            logger.info(
+                f"📂 {name}: кеш карточек от {saved_at:%Y-%m-%d} устарел — полная выгрузка")
+            return None
+
+        frame = pd.read_parquet(data_path)
+
+    except Exception as e:
+        logger.warning(f"⚠️ {name}: не удалось прочитать кеш карточек: {e}")
+        return None
+
+    logger.info(
+        f"📂 {name}: кеш карточек {frame.shape}, курсор {meta['cursor']}")
+    return CachedCards(frame=frame, cursor=meta['cursor'])
+
+
+def save_cards_cache(name: str, api: str, frame: pd.DataFrame) -> None:
+    """💾 Сохраняет каталог карточек кабинета и курсор самого свежего `updatedAt`/`nmID`."""
+
+    if frame.empty:
+        return
+
+    data_path, meta_path = _paths(name)
+
+    try:
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+        frame.to_parquet(data_path, index=False)
+
+        with open(meta_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                'version': CACHE_VERSION,
+                'token': _token_hash(api),
+                'saved_at': datetime.now().isoformat(timespec='seconds'),
+                'cursor': latest_cursor(frame),
+            }, file, ensure_ascii=False, indent=2)
+
+        logger.info(f"💾 {name}: кеш карточек сохранён {frame.shape}")
+
+    except Exception as e:
+        logger.warning(f"⚠️ {name}: не удалось сохранить кеш карточек: {e}")
+
+
+def latest_cursor(frame: pd.DataFrame) -> dict[str, object]:
+    """Курсор WB (`updatedAt`, `nmID`) самой поздно изменённой карточки."""
+
+    latest = frame.sort_values(['updatedAt', 'Артикул WB']).iloc[-1]
+    return {'updatedAt': latest['updatedAt'], 'nmID': int(latest['Артикул WB'])}
+
+
+def merge_cards(cached: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """
+    Подменяет в кеше все строки изменившихся карточек строками из `delta`.
+    Порядок — как при полной выгрузке: свежие карточки сверху.
+    """
+
+    if delta.empty:
+        return cached
+
+    kept = cached[~cached['Артикул WB'].isin(delta['Артикул WB'].unique())]
+
+    return (pd.concat([kept, delta], ignore_index=True)
+            .sort_values(['updatedAt', 'Артикул WB'], ascending=False, kind='stable')
+            .reset_index(drop=True))
@@ -0,0 +1,155 @@
+from scripts.utils.setup_logger import make_logger
+from typing import AsyncIterable, Awaitable, Callable, Optional, Sequence, TypeVar
+import asyncio
+
+logger = make_logger(__name__, use_telegram=False)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def split_chunks(items: Sequence[T], size: int) -> list[Sequence[T]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def fetch_chunks(chunks: Sequence[T],
+                       fetch_chunk: Callable[[int, T], Awaitable[R]],
+                       concurrency: int = 3,
+                       retries: int = 3,
+                       retry_delay: float = 2.0,
+                       name: str = '') -> tuple[list[Optional[R]], list[int]]:
+    """
+    📦 Конкурентная обработка чанков (пачек id / SKU) с сохранением порядка.
+
+    Одновременно в полёте не больше `concurrency` чанков, темп запросов задаёт `RateLimiter`
+    внутри `fetch_chunk`. Чанк, на котором `fetch_chunk` упал, повторяется в следующем
+    раунде — повторяются только упавшие чанки, всего не больше `retries` раундов.
+
+    ─────────────────────────────────────────────────────────────
+
+    🔧 Параметры:
+    -------------
+    chunks : Sequence
+        Чанки в нужном порядке (см. `split_chunks`).
+    fetch_chunk : Callable[[int, chunk], Awaitable]
+        Обработка одного чанка: номер чанка и сам чанк → результат. Ошибка = чанк не получен.
+    concurrency : int
+        Сколько чанков может быть в полёте одновременно.
+    retries : int
+        Сколько раундов попыток на каждый чанк.
+    retry_delay : float
+        Пауза перед повторным раундом (растёт линейно с номером раунда).
+    name : str
+        Кабинет (для логов).
+
+    📤 Возвращает:
+    --------------
+    (результаты в порядке чанков — `None` для неполученных, номера неполученных чанков)
+    """
+
+    results: list[Optional[R]] = [None] * len(chunks)
+    pending = list(range(len(chunks)))
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(index: int) -> bool:
+        async with semaphore:
+            try:
+                results[index] = await fetch_chunk(index, chunks[index])
+                return True
+
+            except Exception as e:
+                logger.warning(
+                    f"КАБИНЕТ {name} ⚠️ Чанк {index + 1}/{len(chunks)} не получен: {e}")
+                return False
+
+    for attempt in range(1, retries + 1):
+        done = await asyncio.gather(*(run(index) for index in pending))
+        pending = [index for index, ok in zip(pending, done) if not ok]
+
+        if not pending:
+            break
+
+        if attempt < retries:
+            logger.warning(
+                f"КАБИНЕТ {name} 🔁 Повторяю {len(pending)} чанков (раунд {attempt + 1}/{retries})")
+            await asyncio.sleep(retry_delay * attempt)
+
+    return results, pending
+
+
+async def fetch_chunks_stream(chunks: AsyncIterable[T],
+                              fetch_chunk: Callable[[int, T], Awaitable[R]],
+                              concurrency: int = 3,
+                              retries: int = 3,
+                              retry_delay: float = 2.0,
+                              name: str = '') -> tuple[list[T], list[Optional[R]], list[int]]:
+    """
+    🚰 То же, что `fetch_chunks`, но чанки приходят из асинхронного источника (например,
+    по мере получения страниц каталога).
+
+    `concurrency` воркеров разбирают очередь чанков сразу, не дожидаясь конца источника;
+    упавшие чанки повторяются раундами `fetch_chunks` после того, как источник закончился.
+    Если источник упал — воркеры останавливаются, исключение пробрасывается.
+
+    📤 Возвращает:
+    --------------
+    (полученные чанки, результаты в порядке чанков — `None` для неполученных, номера неполученных чанков)
+    """
+
+    received: list[T] = []
+    results: list[Optional[R]] = []
+    failed: list[int] = []
+    queue: asyncio.Queue[Optional[int]] = asyncio.Queue()
+
+    async def worker() -> None:
+        while True:
+            index = await queue.get()
+
+            if index is None:
+                return
+
+            try:
+                results[index] = await fetch_chunk(index, received[index])
+
+            except Exception as e:
+                logger.warning(
+                    f"КАБИНЕТ {name} ⚠️ Чанк {index + 1} не получен: {e}")
+                failed.append(index)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(concurrency, 1))]
+
+    try:
+        async for chunk in chunks:
+            received.append(chunk)
+            results.append(None)
+            queue.put_nowait(len(received) - 1)
+
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        raise
+
+    for _ in workers:
+        queue.put_nowait(None)
+
+    await asyncio.gather(*workers)
+
+    if failed and retries > 1:
+        failed.sort()
+
+        logger.warning(
+            f"КАБИНЕТ {name} 🔁 Повторяю {len(failed)} чанков (раунд 2/{retries})")
+        await asyncio.sleep(retry_delay)
+
+        retried, pending = await fetch_chunks(
+            [received[index] for index in failed],
+            lambda i, chunk: fetch_chunk(failed[i], chunk),
+            concurrency=concurrency, retries=retries - 1, retry_delay=retry_delay, name=name)
+
+        for index, result in zip(failed, retried):
+            results[index] = result
+
+        failed = [failed[i] for i in pending]
+
+    return received, results, sorted(failed)
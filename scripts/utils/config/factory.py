@@ -103,6 +103,21 @@ def get_requests_url_oz() -> dict[str, str]:
     }
 
 
+def get_ozon_attribute_columns() -> dict[str, tuple[int, ...]]:
+    """
+    Характеристики Ozon (product_info_attributes), которые попадают в таблицу карточек:
+    {колонка: id атрибутов}. Берётся первое значение атрибута; если у товара есть несколько
+    id одной колонки — побеждает последний по списку `attributes` товара.
+    Чтобы выгрузить ещё одну характеристику, достаточно добавить её сюда.
+    """
+    return {
+        'Бренд в одежде и обуви': (31,),
+        'Объединить на одной карточке': (8292,),
+        'Цвет товара': (10096, 10097),
+        'Тип': (4501, 4503),
+    }
+
+
 def get_headers(api_key: str, client_id: str) -> dict[str, str]:
     return {
 
@@ -128,6 +143,92 @@ def get_requests_url_wb() -> dict[str, str]:
     }
 
 
+def get_requests_url_moysklad() -> dict[str, str]:
+    """
+    'stock_all' - Отчёт «Остатки»: остатки по всем товарам, модификациям и комплектам
+    """
+    return {
+        'stock_all': 'https://api.moysklad.ru/api/remap/1.2/report/stock/all',
+    }
+
+
+def get_rate_limits() -> dict[str, tuple[float, int]]:
+    """
+    Возвращает лимиты запросов к API: {url: (запросов в секунду, burst)}.
+    Лимиты считаются на один токен (кабинет), URL без пути — лимит на весь host.
+
+    WB (по документации seller API):
+    'card_list' - 100 запросов в минуту, burst 5
+    'report_detail' - 3 запроса в минуту, burst 3
+    'supplier_stocks' - 1 запрос в минуту
+    'promotion_count' - 5 запросов в секунду, burst 5
+    'advert_fullstats' - 3 запроса в минуту, burst 1
+
+    МойСклад: 45 запросов за 3 секунды на аккаунт, не больше 5 параллельных запросов
+
+    RATE_LIMIT_SCALE - множитель скорости всех лимитов (для офлайн-бенчмарка на кассете,
+    например 60 — минутные лимиты становятся секундными). По умолчанию 1.
+    """
+    wb = get_requests_url_wb()
+    oz = get_requests_url_oz()
+    ms = get_requests_url_moysklad()
+    scale = float(os.getenv('RATE_LIMIT_SCALE', 1))
+
+    limits = {
+        wb['card_list']: (100 / 60, 5),
+        wb['report_detail']: (3 / 60, 3),
+        wb['supplier_stocks']: (1 / 60, 1),
+        wb['promotion_count']: (5, 5),
+        wb['advert_fullstats']: (3 / 60, 1),
+        wb['tariffs_box']: (1, 1),
+        oz['product_info_attributes']: (2, 2),
+        oz['analytics_stocks']: (2, 2),
+        ms['stock_all']: (15, 5),
+    }
+
+    return {url: (rate * scale, burst) for url, (rate, burst) in limits.items()}
+
+
+def get_sheets_quota() -> dict[str, float]:
+    """
+    Квоты Google Sheets API на один service account: запросов в минуту.
+    'read' - чтение (GET), 'write' - запись (update / batch_update / clear и пр.)
+    По умолчанию Google даёт 60 чтений и 60 записей в минуту на пользователя.
+    'window' - окно квоты в секундах (меньше 60 - только для ускоренных офлайн-прогонов)
+    """
+    return {
+        'read': int(os.getenv('SHEETS_READ_PER_MINUTE', 60)),
+        'write': int(os.getenv('SHEETS_WRITE_PER_MINUTE', 60)),
+        'window': float(os.getenv('SHEETS_QUOTA_WINDOW', 60)),
+    }
+
+
+def get_postprocess_pool() -> dict[str, str | int]:
+    """
+    Где `main()` выполняет постобработку кабинетов, пока остальные кабинеты ещё скачиваются.
+    'executor' - 'process' (ProcessPoolExecutor, по умолчанию; на одноядерной машине — потоки),
+                 'thread' (ThreadPoolExecutor, pandas отпускает GIL только в части операций)
+                 или 'inline' (в event loop — для отладки)
+    'workers' - число воркеров (0 - по числу ядер)
+    """
+    return {
+        'executor': os.getenv('POSTPROCESS_EXECUTOR', 'process'),
+        'workers': int(os.getenv('POSTPROCESS_WORKERS', 0)),
+    }
+
+
+def get_tracing() -> dict[str, str | bool]:
+    """
+    Трассировка запусков (`scripts.utils.tracing`):
+    'enabled' - писать спаны этапов (TRACE=0 — выключить)
+    'file' - JSON-lines, куда дописываются спаны в конце процесса (пусто — только сводная таблица в лог)
+    """
+    return {
+        'enabled': os.getenv('TRACE', '1').strip() != '0',
+        'file': os.getenv('TRACE_FILE', 'traces/spans.jsonl').strip(),
+    }
+
+
 def sheets_names() -> dict[str, str]:
     """
      Возвращает словарь с названиями листов Google Sheets для входных и выходных данных
@@ -0,0 +1,142 @@
+from scripts.utils.setup_logger import make_logger
+from pandas.api.types import is_float_dtype, is_integer_dtype, is_object_dtype
+from typing import Optional
+import pandas as pd
+import numpy as np
+
+logger = make_logger(__name__, use_telegram=False)
+
+# колонка → тип:
+# 'category' — строковая колонка с большим числом повторов (бренд, склад, размер…);
+# 'int'      — int32, если значения помещаются, иначе int64;
+# 'float32'  — float32, если значения в нём представимы без потерь (габариты), целые — как 'int'.
+DTYPE_POLICY: dict[str, str] = {
+    'Артикул WB': 'int',
+    'ID KT': 'int',
+    'chrtID': 'int',
+    'quantity': 'int',
+    'inWayToClient': 'int',
+    'inWayFromClient': 'int',
+    'Итого остатки': 'int',
+    'Бренд': 'category',
+    'Категория': 'category',
+    'Кабинет': 'category',
+    'Размер': 'category',
+    'Наименование': 'category',
+    'warehouseName': 'category',
+    'category': 'category',
+    'subject': 'category',
+    'SCCode': 'category',
+    'Ширина': 'float32',
+    'Высота': 'float32',
+    'Длина': 'float32',
+}
+
+# category — только если уникальных значений не больше этой доли строк
+CATEGORY_MAX_SHARE = 0.5
+
+_INT32 = np.iinfo(np.int32)
+
+
+def frame_memory_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def _compact_int(col: pd.Series) -> Optional[pd.Series]:
+    if not is_integer_dtype(col.dtype) or col.dtype == np.int32 or col.empty:
+        return None
+
+    if _INT32.min <= col.min() and col.max() <= _INT32.max:
+        return col.astype(np.int32)
+
+    return None if col.dtype == np.int64 else col.astype(np.int64)
+
+
+def _compact_float32(col: pd.Series) -> Optional[pd.Series]:
+    if is_integer_dtype(col.dtype):
+        return _compact_int(col)
+
+    if not is_float_dtype(col.dtype) or col.dtype == np.float32:
+        return None
+
+    values = col.to_numpy()
+    narrow = values.astype(np.float32)
+
+    # только если float32 хранит те же числа — в таблицах ничего не меняется
+    if not np.array_equal(narrow.astype(values.dtype), values, equal_nan=True):
+        return None
+
+    return pd.Series(narrow, index=col.index, name=col.name)
+
+
+def _compact_category(col: pd.Series) -> Optional[pd.Series]:
+    if not is_object_dtype(col.dtype) or col.empty:
+        return None
+
+    # смешанные типы (строки + числа) не трогаем — у них нет общего порядка сортировки
+    if pd.api.types.infer_dtype(col, skipna=True) != 'string':
+        return None
+
+    if col.nunique() > CATEGORY_MAX_SHARE * len(col):
+        return None
+
+    return col.astype('category')
+
+
+_COMPACT = {
+    'int': _compact_int,
+    'float32': _compact_float32,
+    'category': _compact_category,
+}
+
+
+def compact_frame(df: pd.DataFrame, name: str = '', label: str = '',
+                  policy: Optional[dict[str, str]] = None) -> pd.DataFrame:
+    """
+    🗜 Приводит колонки DataFrame к компактным типам по `DTYPE_POLICY`.
+
+    Вызывается сразу после сборки таблицы (остатки, карточки), чтобы объединения и группировки
+    дальше по пайплайну шли по category / int32 / float32. Колонки, для которых тип не подходит
+    (пропуски в int, дробные значения вне float32, мало повторов), остаются как есть.
+    В лог пишется объём таблицы до и после — отчёт по памяти на кабинет.
+
+    ─────────────────────────────────────────────────────────────
+
+    🔧 Параметры:
+    -------------
+    df : pd.DataFrame
+        Таблица; исходный объект не меняется.
+    name, label : str
+        Кабинет и название таблицы для отчёта в логе.
+    policy : dict[str, str], optional
+        Своя политика вместо `DTYPE_POLICY`.
+
+    📤 Возвращает:
+    --------------
+    pd.DataFrame — таблица с компактными типами.
+    """
+
+    if df.empty:
+        return df
+
+    before = frame_memory_mb(df)
+    df = df.copy(deep=False)
+    changed = []
+
+    for col, kind in (policy or DTYPE_POLICY).items():
+        if col not in df.columns:
+            continue
+
+        compact = _COMPACT[kind](df[col])
+
+        if compact is not None:
+            df[col] = compact
+            changed.append(col)
+
+    after = frame_memory_mb(df)
+
+    logger.info(
+        f"🗜 {name} {label}: {before:.1f} → {after:.1f} МБ ({len(df)} строк, сжато колонок: {len(changed)})")
+    logger.debug(f"🗜 {name} {label}: {', '.join(changed)}")
+
+    return df
@@ -1,13 +1,23 @@
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.telegram_logger import send_tg_message
+from scripts.utils.sheets_scheduler import QuotaHTTPClient
+from typing import Optional, Union
+import threading
 import gspread
+import json
 import os
 
 
 logger = make_logger(__name__, use_telegram=False)
 
+SPREADSHEET_IDS_PATH = os.path.join('cache', 'sheets', 'spreadsheet_ids.json')
 
-def get_gspread_client():
+_client: Optional[gspread.Client] = None
+_session: Optional['SheetsSession'] = None
+_lock = threading.Lock()
+
+
+def _service_account() -> gspread.Client:
 
     env_path = os.environ.get("GSPREAD_JSON")
 
@@ -16,14 +26,177 @@ def get_gspread_client():
 
         if os.path.exists(clean_path):
             logger.info(f"✅ Используем JSON-файл: 'GSPREAD_JSON'")
-            return gspread.service_account(filename=clean_path)
+            return gspread.service_account(filename=clean_path, http_client=QuotaHTTPClient)
 
     default_path = 'key.json'
 
     if os.path.exists(default_path):
         logger.info(f"✅ Используем JSON-файл: 'key.json'")
-        return gspread.service_account(filename=default_path)
+        return gspread.service_account(filename=default_path, http_client=QuotaHTTPClient)
 
     send_tg_message(
         f"⚠️ Не найден service account JSON-файл\nУстановите переменную окружения GSPREAD_JSON или создайте key.json.")
     raise FileExistsError("Service account key not found")
+
+
+def get_gspread_client() -> gspread.Client:
+    """
+    Клиент gspread — авторизация service account один раз на процесс.
+    Запросы идут через `QuotaHTTPClient`: общая квота Sheets API и повторы на 429 / 5xx.
+    """
+
+    global _client
+
+    with _lock:
+        if _client is None:
+            _client = _service_account()
+
+    return _client
+
+
+def set_gspread_client(client: gspread.Client, ids_path: str = SPREADSHEET_IDS_PATH) -> None:
+    """
+    Подменяет клиент процесса (и сбрасывает общую `SheetsSession`) — для офлайн-прогонов
+    на фейковом API (`scripts.bench.fake_sheets`). `ids_path` — свой кеш id таблиц.
+    """
+
+    global _client, _session
+
+    with _lock:
+        _client = client
+        _session = SheetsSession(client, ids_path=ids_path)
+
+
+class SheetsSession:
+    """
+    📗 Общая на процесс сессия Google Sheets.
+
+    Запоминает на время запуска:
+    - клиент (`get_gspread_client()`);
+    - открытые таблицы по названию. Соответствие «название → id» хранится на диске
+      (`cache/sheets/spreadsheet_ids.json`), поэтому таблица открывается через `open_by_key`
+      без поиска по Drive; если id устарел — название ищется заново. В GitHub Actions
+      `cache/sheets` сохраняется между запусками (`actions/cache` в workflow);
+    - список листов каждой таблицы (`worksheets()`), из него же берётся `worksheet(name)`.
+
+    📌 Использование:
+    ----------------
+    gs = get_sheets_session()
+    spreadsheet = gs.open(tables_names()['wb_matrix_complete'])
+    worksheet = gs.worksheet(spreadsheet, sheets_names()['group_stocks_and_idkt'])
+
+    Методы потокобезопасны. После `add_worksheet` / `del_worksheet` вызовите `invalidate(spreadsheet)`.
+    """
+
+    def __init__(self, client: Optional[gspread.Client] = None,
+                 ids_path: str = SPREADSHEET_IDS_PATH) -> None:
+        self._client = client
+        self.ids_path = ids_path
+        self.ids: dict[str, str] = self._load_ids()
+        self.spreadsheets: dict[str, gspread.Spreadsheet] = {}
+        self.listings: dict[str, list[gspread.Worksheet]] = {}
+        self.lock = threading.Lock()
+        self.key_locks: dict[str, threading.Lock] = {}
+
+    @property
+    def client(self) -> gspread.Client:
+        if self._client is None:
+            self._client = get_gspread_client()
+        return self._client
+
+    def _load_ids(self) -> dict[str, str]:
+        try:
+            with open(self.ids_path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось прочитать {self.ids_path}: {e}")
+            return {}
+
+    def _save_ids(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.ids_path), exist_ok=True)
+
+            with open(self.ids_path, 'w', encoding='utf-8') as file:
+                json.dump(self.ids, file, ensure_ascii=False, indent=2)
+
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось сохранить {self.ids_path}: {e}")
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        # разные таблицы открываются параллельно, одна и та же — один раз
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    def open(self, title: str) -> gspread.Spreadsheet:
+        """Таблица по названию (как `client.open`, но один раз за запуск и без поиска по Drive)."""
+
+        with self._key_lock(f"open:{title}"):
+            spreadsheet = self.spreadsheets.get(title)
+            if spreadsheet is not None:
+                return spreadsheet
+
+            key = self.ids.get(title)
+            spreadsheet = None
+
+            if key:
+                try:
+                    spreadsheet = self.client.open_by_key(key)
+                except (gspread.SpreadsheetNotFound, gspread.exceptions.APIError) as e:
+                    logger.warning(
+                        f"⚠️ Таблица '{title}' не открылась по id {key}, ищу по названию: {e}")
+
+            if spreadsheet is None:
+                spreadsheet = self.client.open(title)
+                with self.lock:
+                    self.ids[title] = spreadsheet.id
+                    self._save_ids()
+
+            self.spreadsheets[title] = spreadsheet
+            return spreadsheet
+
+    def worksheets(self, spreadsheet: Union[str, gspread.Spreadsheet]) -> list[gspread.Worksheet]:
+        """Все листы таблицы (запрашиваются один раз)."""
+
+        if isinstance(spreadsheet, str):
+            spreadsheet = self.open(spreadsheet)
+
+        with self._key_lock(f"list:{spreadsheet.id}"):
+            listing = self.listings.get(spreadsheet.id)
+
+            if listing is None:
+                listing = spreadsheet.worksheets()
+                self.listings[spreadsheet.id] = listing
+
+            return listing
+
+    def worksheet(self, spreadsheet: Union[str, gspread.Spreadsheet], title: str) -> gspread.Worksheet:
+        """Лист по названию из запомненного списка листов (как `spreadsheet.worksheet`)."""
+
+        for worksheet in self.worksheets(spreadsheet):
+            if worksheet.title == title:
+                return worksheet
+
+        raise gspread.WorksheetNotFound(title)
+
+    def invalidate(self, spreadsheet: Union[str, gspread.Spreadsheet]) -> None:
+        """Сбрасывает запомненный список листов таблицы."""
+
+        if isinstance(spreadsheet, str):
+            spreadsheet = self.open(spreadsheet)
+
+        with self._key_lock(f"list:{spreadsheet.id}"):
+            self.listings.pop(spreadsheet.id, None)
+
+
+def get_sheets_session() -> SheetsSession:
+    """Общая на процесс `SheetsSession`."""
+
+    global _session
+
+    with _lock:
+        if _session is None:
+            _session = SheetsSession()
+
+    return _session
@@ -0,0 +1,356 @@
+from scripts.utils.config.factory import get_rate_limits
+from scripts.utils.rate_limiter import RateLimiter
+from scripts.utils.setup_logger import make_logger
+from scripts.utils.tracing import trace_session
+from multidict import CIMultiDict, CIMultiDictProxy
+from collections import defaultdict
+from typing import Any, Mapping, Optional
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+import aiohttp
+import asyncio
+import hashlib
+import gzip
+import json
+import os
+import re
+import time
+
+logger = make_logger(__name__, use_telegram=False)
+
+CASSETTE_DIR = 'cassettes'
+INTERACTIONS_FILE = 'interactions.jsonl.gz'
+CABINETS_FILE = 'cabinets.json'
+
+# заголовки, по которым различаются кабинеты (WB — Authorization, Ozon — Client-Id)
+IDENTITY_HEADERS = ('Authorization', 'Client-Id')
+# токен вида 'cassette:<alias>' — кабинет из кассеты, в реплее вместо настоящего токена
+ALIAS_PREFIX = 'cassette:'
+
+# даты в запросах (период отчёта, dateFrom, курсор карточек) маскируются — кассету,
+# записанную вчера, можно воспроизвести сегодня
+_DATE = re.compile(r'\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?Z?)?')
+
+
+def token_alias(token: str) -> str:
+    """Имя токена в кассете: сам токен не сохраняется, только его хеш."""
+
+    token = token.strip()
+    if token.startswith('Bearer '):
+        token = token[len('Bearer '):].strip()
+
+    if token.startswith(ALIAS_PREFIX):
+        return token[len(ALIAS_PREFIX):]
+
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:12]
+
+
+def request_key(method: str, url: str, headers: Optional[Mapping[str, str]] = None,
+                params: Optional[Mapping[str, Any]] = None, body: Any = None) -> str:
+    """Ключ запроса: метод, URL без query, параметры и JSON-тело (даты замаскированы), кабинет."""
+
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query.update({key: str(value) for key, value in (params or {}).items()})
+
+    identity = next((headers[name] for name in IDENTITY_HEADERS if headers and headers.get(name)), '')
+
+    key = json.dumps([
+        method.upper(),
+        urlunsplit((parts.scheme, parts.netloc, parts.path, '', '')),
+        query,
+        body,
+        token_alias(identity) if identity else '',
+    ], ensure_ascii=False, sort_keys=True, default=str)
+
+    return _DATE.sub('<date>', key)
+
+
+class CassetteResponse:
+    """Ответ из кассеты — то подмножество `aiohttp.ClientResponse`, которым пользуются пайплайны."""
+
+    def __init__(self, method: str, url: str, status: int, headers: Mapping[str, str], body: bytes) -> None:
+        self.method = method
+        self.url = url
+        self.status = status
+        self.reason = ''
+        self.headers = CIMultiDictProxy(CIMultiDict(headers))
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: Optional[str] = None) -> str:
+        return self._body.decode(encoding or 'utf-8', errors='replace')
+
+    async def json(self, *, content_type: Optional[str] = None, loads=json.loads) -> Any:
+        return loads(self._body.decode('utf-8')) if self._body else None
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(
+                request_info=None, history=(), status=self.status, message=self.reason or str(self.status))
+
+    def release(self) -> None:
+        pass
+
+    async def __aenter__(self) -> 'CassetteResponse':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+
+class _RequestContext:
+    def __init__(self, coro) -> None:
+        self._coro = coro
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self) -> CassetteResponse:
+        return await self._coro
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+
+class CassetteSession:
+    """
+    📼 Сессия «запись / воспроизведение» вместо `aiohttp.ClientSession` в `main()` / `main_run_ozon()`.
+
+    - `record` — запросы уходят в настоящий API через обычную сессию, ответы (статус, тело,
+      Content-Type, время ответа) пишутся в кассету. Ответы 429 не пишутся: это свойство
+      момента записи, в реплее лимиты моделируются отдельно. Токены в кассету не попадают —
+      кабинеты различаются по хешу токена (`cabinets.json`: кабинет → хеш).
+    - `replay` — ответы берутся из кассеты по ключу запроса (`request_key`). Одинаковые
+      запросы получают записанные ответы по очереди, последний повторяется. Задержка —
+      записанное время ответа × `latency_scale` или фиксированная `latency`. Лимиты API
+      моделируются token-bucket-ом на (endpoint, кабинет) по `get_rate_limits()`: сверх
+      лимита отдаётся 429 с `X-Ratelimit-Retry`, как у WB.
+
+    ─────────────────────────────────────────────────────────────
+
+    🔧 Параметры:
+    -------------
+    mode : str
+        'record' | 'replay'.
+    path : str
+        Каталог кассеты.
+    latency : float, optional
+        Фиксированная задержка ответа в реплее (сек). По умолчанию — записанная.
+    latency_scale : float
+        Множитель записанной задержки.
+    limits : dict[str, tuple[float, int]], optional
+        Лимиты модели API в реплее `{url: (запросов в секунду, burst)}`; `{}` — без лимитов.
+    session : aiohttp.ClientSession, optional
+        Сессия для записи (по умолчанию создаётся своя).
+    """
+
+    def __init__(self, mode: str, path: str = CASSETTE_DIR, latency: Optional[float] = None,
+                 latency_scale: float = 1.0, limits: Optional[dict[str, tuple[float, int]]] = None,
+                 session: Optional[aiohttp.ClientSession] = None) -> None:
+
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"HTTP_CASSETTE: неизвестный режим '{mode}' (record | replay)")
+
+        self.mode = mode
+        self.path = path
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.session = session
+        self.own_session = session is None
+
+        self.interactions: dict[str, list[dict]] = defaultdict(list)
+        self.positions: dict[str, int] = defaultdict(int)
+        self.cabinets: dict[str, dict[str, str]] = {}
+        self.stats = {'requests': 0, 'misses': 0, 'throttled': 0}
+
+        self.limits = RateLimiter(get_rate_limits() if limits is None else limits, default=(1e9, 1_000_000))
+
+        if mode == 'replay':
+            self._load()
+
+    # ───────────── кассета ─────────────
+
+    def _load(self) -> None:
+        path = os.path.join(self.path, INTERACTIONS_FILE)
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"📼 Кассета не найдена: {path}. Запишите её запуском пайплайна с HTTP_CASSETTE=record")
+
+        with gzip.open(path, 'rt', encoding='utf8') as file:
+            for line in file:
+                record = json.loads(line)
+                self.interactions[record['key']].append(record)
+
+        cabinets_path = os.path.join(self.path, CABINETS_FILE)
+        if os.path.exists(cabinets_path):
+            with open(cabinets_path, encoding='utf8') as file:
+                self.cabinets = json.load(file)
+
+        logger.info(
+            f"📼 Кассета {self.path}: {sum(map(len, self.interactions.values()))} ответов")
+
+    def _save(self) -> None:
+        """Дописывает запись в кассету: запросы этого запуска заменяют такие же из прошлых записей."""
+
+        recorded, cabinets = dict(self.interactions), self.cabinets
+
+        if os.path.exists(os.path.join(self.path, INTERACTIONS_FILE)):
+            self.interactions = defaultdict(list)
+            self._load()
+            self.interactions.update(recorded)
+
+            for kind, names in cabinets.items():
+                self.cabinets.setdefault(kind, {}).update(names)
+
+        os.makedirs(self.path, exist_ok=True)
+
+        with gzip.open(os.path.join(self.path, INTERACTIONS_FILE), 'wt', encoding='utf8') as file:
+            for records in self.interactions.values():
+                for record in records:
+                    file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        with open(os.path.join(self.path, CABINETS_FILE), 'w', encoding='utf8') as file:
+            json.dump(self.cabinets, file, ensure_ascii=False, indent=2)
+
+        logger.info(
+            f"📼 Кассета {self.path} записана: {sum(map(len, recorded.values()))} новых ответов, "
+            f"всего {sum(map(len, self.interactions.values()))}")
+
+    def register(self, kind: str, tokens: Mapping[str, str]) -> None:
+        """Запоминает кабинеты запуска (`kind` — 'wb' / 'oz' / …) как кабинет → хеш токена."""
+
+        self.cabinets.setdefault(kind, {}).update(
+            {name: token_alias(token) for name, token in tokens.items() if token})
+
+    def tokens(self, kind: str) -> dict[str, str]:
+        """Кабинеты кассеты для реплея: {кабинет: 'cassette:<хеш>'} — подставляются вместо токенов."""
+
+        return {name: ALIAS_PREFIX + alias for name, alias in self.cabinets.get(kind, {}).items()}
+
+    # ───────────── запросы ─────────────
+
+    async def _record(self, method: str, url: str, **kwargs) -> CassetteResponse:
+        begin = time.monotonic()
+
+        async with self.session.request(method, url, **kwargs) as response:
+            body = await response.read()
+            headers = {name: value for name, value in response.headers.items()
+                       if name.lower() == 'content-type' or name.lower().startswith('x-ratelimit')}
+            status = response.status
+
+        elapsed = time.monotonic() - begin
+
+        if status != 429:
+            key = request_key(method, url, kwargs.get('headers'), kwargs.get('params'), kwargs.get('json'))
+            self.interactions[key].append({
+                'key': key,
+                'status': status,
+                'headers': {name: value for name, value in headers.items() if name.lower() == 'content-type'},
+                'body': body.decode('utf-8', errors='replace'),
+                'elapsed': round(elapsed, 4),
+            })
+
+        return CassetteResponse(method, url, status, headers, body)
+
+    async def _replay(self, method: str, url: str, **kwargs) -> CassetteResponse:
+        headers = kwargs.get('headers') or {}
+        identity = next((headers[name] for name in IDENTITY_HEADERS if headers.get(name)), '')
+
+        key = request_key(method, url, headers, kwargs.get('params'), kwargs.get('json'))
+        records = self.interactions.get(key)
+
+        if not records:
+            self.stats['misses'] += 1
+            logger.warning(f"📼 Нет в кассете: {method} {urlsplit(url).path}")
+            return CassetteResponse(method, url, 404, {'Content-Type': 'application/json'},
+                                    b'{"error": "not recorded"}')
+
+        # модель лимитов API: нет свободного запроса — 429, как ответил бы WB
+        retry = self.limits.try_acquire(url, identity)
+
+        if retry:
+            self.stats['throttled'] += 1
+            return CassetteResponse(method, url, 429, {'X-Ratelimit-Retry': f'{retry:.3f}'}, b'')
+
+        position = self.positions[key]
+        record = records[min(position, len(records) - 1)]
+        self.positions[key] = position + 1
+
+        delay = self.latency if self.latency is not None else record.get('elapsed', 0) * self.latency_scale
+        if delay:
+            await asyncio.sleep(delay)
+
+        return CassetteResponse(method, url, record['status'], record['headers'], record['body'].encode('utf-8'))
+
+    def request(self, method: str, url: str, **kwargs) -> _RequestContext:
+        self.stats['requests'] += 1
+        handler = self._record if self.mode == 'record' else self._replay
+        return _RequestContext(handler(method, url, **kwargs))
+
+    def get(self, url: str, **kwargs) -> _RequestContext:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> _RequestContext:
+        return self.request('POST', url, **kwargs)
+
+    async def close(self) -> None:
+        if self.mode == 'record':
+            self._save()
+        else:
+            logger.info(f"📼 Реплей {self.path}: {self.stats}")
+
+        if self.own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> 'CassetteSession':
+        if self.mode == 'record' and self.session is None:
+            self.session = aiohttp.ClientSession()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+def cassette_settings() -> dict[str, Any]:
+    """
+    Настройки кассеты из окружения:
+    HTTP_CASSETTE - 'record' | 'replay' (пусто — обычная сессия)
+    HTTP_CASSETTE_DIR - каталог кассеты
+    HTTP_CASSETTE_LATENCY - фиксированная задержка ответа в реплее, сек (пусто — записанная)
+    HTTP_CASSETTE_LATENCY_SCALE - множитель записанной задержки
+    """
+    latency = os.getenv('HTTP_CASSETTE_LATENCY', '').strip()
+
+    return {
+        'mode': os.getenv('HTTP_CASSETTE', '').strip().lower(),
+        'path': os.getenv('HTTP_CASSETTE_DIR', CASSETTE_DIR),
+        'latency': float(latency) if latency else None,
+        'latency_scale': float(os.getenv('HTTP_CASSETTE_LATENCY_SCALE', 1)),
+    }
+
+
+def open_session(kind: str, tokens: Mapping[str, str], **kwargs):
+    """
+    🔌 Сессия для запуска пайплайна: `aiohttp.ClientSession`, а при `HTTP_CASSETTE=record|replay`
+    — `CassetteSession` (кабинеты запуска `tokens` регистрируются в кассете как `kind`).
+    `kwargs` — параметры обычной `aiohttp.ClientSession`. Запросы трассируются (`trace_session`).
+    """
+
+    settings = cassette_settings()
+    mode = settings.pop('mode')
+
+    if not mode:
+        return trace_session(aiohttp.ClientSession(**kwargs))
+
+    session = aiohttp.ClientSession(**kwargs) if mode == 'record' else None
+    cassette = CassetteSession(mode, session=session, **settings)
+    cassette.own_session = True
+
+    if mode == 'record':
+        cassette.register(kind, tokens)
+
+    return trace_session(cassette)
@@ -0,0 +1,90 @@
+from typing import Any, Iterable, Mapping, Optional
+import pandas as pd
+import numpy as np
+
+_EMPTY: dict = {}
+
+
+class JsonFlattener:
+    """
+    🗂 Разворачивает вложенный JSON (список одинаковых по структуре записей) по заранее
+    известной схеме «путь → колонка».
+
+    Схема один раз компилируется в дерево ключей: каждый промежуточный узел (например,
+    `statistics.selectedPeriod`) достаётся один раз на запись для всех его колонок, а колонки
+    заполняются целиком по всему списку записей — без рекурсии и промежуточных словарей на
+    каждом уровне. Колонки и их порядок задаются схемой, а не порядком ключей в ответе API;
+    отсутствующий путь (или `null` на промежуточном уровне) → пропуск.
+
+    ─────────────────────────────────────────────────────────────
+
+    🔧 Параметры:
+    -------------
+    schema : Mapping[str, str]
+        `{путь через точку: колонка}`, например `{'statistics.selectedPeriod.ordersCount': 'Количество заказов'}`.
+    dtypes : Mapping[str, str], optional
+        Типы колонок: `'float'` — float64 (пропуски → NaN), `'int'` — int64, если все значения
+        целые и без пропусков, иначе float64. Остальные колонки — как их выведет pandas.
+
+    📌 Использование:
+    ----------------
+    flattener = JsonFlattener({'nmID': 'Артикул WB', 'object.name': 'Название категории'})
+    df = flattener.frame(cards)
+    """
+
+    def __init__(self, schema: Mapping[str, str], dtypes: Optional[Mapping[str, str]] = None) -> None:
+        self.columns = list(schema.values())
+        self.dtypes = dict(dtypes or {})
+
+        # {путь родителя: [(ключ, колонка), ...]} в порядке от корня к листьям
+        self.leaves: dict[tuple[str, ...], list[tuple[str, str]]] = {}
+        self.nodes: list[tuple[str, ...]] = [()]
+
+        for path, column in schema.items():
+            *parent, key = path.split('.')
+
+            for depth in range(1, len(parent) + 1):
+                node = tuple(parent[:depth])
+                if node not in self.nodes:
+                    self.nodes.append(node)
+
+            self.leaves.setdefault(tuple(parent), []).append((key, column))
+
+    def columns_of(self, records: Iterable[Mapping[str, Any]]) -> dict[str, list]:
+        """Колонки списками: `{колонка: значения}` в порядке схемы."""
+
+        parents: dict[tuple[str, ...], list] = {
+            (): [record if isinstance(record, dict) else _EMPTY for record in records]}
+
+        for node in self.nodes[1:]:
+            parents[node] = [
+                value if isinstance(value := parent.get(node[-1]), dict) else _EMPTY
+                for parent in parents[node[:-1]]
+            ]
+
+        values: dict[str, list] = {}
+
+        for node, leaves in self.leaves.items():
+            level = parents[node]
+            for key, column in leaves:
+                values[column] = [parent.get(key) for parent in level]
+
+        return {column: values[column] for column in self.columns}
+
+    def frame(self, records: Iterable[Mapping[str, Any]]) -> pd.DataFrame:
+        data = {}
+
+        for column, values in self.columns_of(records).items():
+            dtype = self.dtypes.get(column)
+
+            if dtype in ('int', 'float'):
+                array = np.array(values, dtype=np.float64)
+
+                if dtype == 'int' and np.isfinite(array).all() and (array == np.trunc(array)).all():
+                    array = array.astype(np.int64)
+
+                data[column] = array
+            else:
+                data[column] = values
+
+        return pd.DataFrame(data, columns=self.columns)
@@ -0,0 +1,106 @@
+from scripts.utils.setup_logger import make_logger
+from typing import AsyncIterator, Awaitable, Callable, NamedTuple, Optional
+import asyncio
+import math
+
+logger = make_logger(__name__, use_telegram=False)
+
+
+class Page(NamedTuple):
+    items: list
+    has_next: Optional[bool] = None
+    total: Optional[int] = None
+
+
+async def iter_pages(fetch_page: Callable[[int], Awaitable[Optional[Page]]],
+                     page_size: int,
+                     first_page: int = 1,
+                     concurrency: int = 3) -> AsyncIterator[tuple[int, list]]:
+    """
+    📄 Конкурентный обход постраничного API.
+
+    Первая страница запрашивается отдельно: по ней движок узнаёт, есть ли продолжение и
+    (если API отдаёт `total`) сколько всего страниц. Остальные страницы запрашиваются
+    одновременно — не более `concurrency` в полёте, темп задаёт `RateLimiter` внутри `fetch_page`.
+    Если `total` неизвестен, страницы запрашиваются «окном» наперёд, пока не придёт неполная страница.
+
+    ─────────────────────────────────────────────────────────────
+
+    🔧 Параметры:
+    -------------
+    fetch_page : Callable[[int], Awaitable[Page | None]]
+        Запрос одной страницы. `None` — страницу получить не удалось: обход заканчивается на
+        предыдущей, уже полученные страницы за ней отбрасываются. Исключение пробрасывается наружу.
+    page_size : int
+        Размер полной страницы (по нему определяется последняя страница).
+    first_page : int
+        Номер первой страницы.
+    concurrency : int
+        Сколько страниц может быть в полёте одновременно.
+
+    📤 Отдаёт:
+    ----------
+    (номер страницы, items) — по порядку номеров, без пропусков: страница, пришедшая раньше
+    предыдущих, ждёт в буфере, пока не будут получены все страницы перед ней.
+    """
+
+    first = await fetch_page(first_page)
+
+    if first is None:
+        return
+
+    yield first_page, first.items
+
+    if first.has_next is False or len(first.items) < page_size:
+        return
+
+    last_page = math.inf
+    if first.total is not None:
+        last_page = first_page + max(math.ceil(first.total / page_size), 1) - 1
+
+    next_page = first_page + 1
+    expected = first_page + 1
+    in_flight: dict[asyncio.Task, int] = {}
+    ready: dict[int, Page] = {}
+
+    try:
+        while in_flight or next_page <= last_page:
+            # не уходим дальше окна от ещё не отданной страницы — буфер не растёт из-за одной медленной
+            while (next_page <= last_page and len(in_flight) < concurrency
+                   and next_page < expected + 2 * concurrency):
+                task = asyncio.ensure_future(fetch_page(next_page))
+                in_flight[task] = next_page
+                next_page += 1
+
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                page = in_flight.pop(task)
+                result = task.result()
+
+                if result is None:
+                    last_page = min(last_page, page - 1)
+                    continue
+
+                ready[page] = result
+
+                if result.has_next is False or len(result.items) < page_size:
+                    last_page = min(last_page, page)
+
+            # отдаём только непрерывный префикс: страница выходит, когда все предыдущие уже получены
+            while expected <= last_page and expected in ready:
+                yield expected, ready.pop(expected).items
+                expected += 1
+
+            # страницы за последней уже не нужны — освобождаем квоту
+            for task, page in list(in_flight.items()):
+                if page > last_page:
+                    task.cancel()
+                    in_flight.pop(task)
+
+            for page in [page for page in ready if page > last_page]:
+                ready.pop(page)
+
+    finally:
+        for task in in_flight:
+            task.cancel()
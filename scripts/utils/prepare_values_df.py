@@ -1,25 +1,89 @@
+from pandas.api.types import (is_bool_dtype, is_datetime64_any_dtype, is_extension_array_dtype,
+                              is_float_dtype, is_integer_dtype)
 import pandas as pd
 import numpy as np
 
 
-def prepare_values_for_sheets(df: pd.DataFrame):
-    values = []
-
-    for row in df.to_numpy():
-        new_row = []
-        for v in row:
-            if pd.isna(v):
-                new_row.append('')
-            elif isinstance(v, (int, float, np.integer, np.floating)):
-                # если float выглядит как целое → int
-                if isinstance(v, (float, np.floating)) and v.is_integer():
-                    new_row.append(int(v))
-                else:
-                    new_row.append(v)
-            elif isinstance(v, pd.Timestamp):
-                new_row.append(v.strftime("%Y-%m-%d"))
-            else:
-                new_row.append(str(v))
-
-        values.append(new_row)
+def prepare_values_for_sheets(df: pd.DataFrame) -> list[list]:
+    """
+    📋 Переводит DataFrame в список строк для записи в Google Sheets.
+
+    Каждая колонка конвертируется целиком, с учётом её dtype, в object-массив; строки
+    получаются одним `tolist()` собранной матрицы:
+    - пропуски (NaN / None / NaT) → `''`;
+    - float без дробной части → int;
+    - даты → строка `'%Y-%m-%d'`;
+    - числа и bool остаются числами, всё остальное → `str`.
+    """
+
+    if not df.shape[1]:
+        return [[] for _ in range(len(df))]
+
+    matrix = np.empty(df.shape, dtype=object)
+
+    for i in range(df.shape[1]):
+        matrix[:, i] = _column_values(df.iloc[:, i])
+
+    return matrix.tolist()
+
+
+def _column_values(col: pd.Series) -> np.ndarray:
+    dtype = col.dtype
+
+    if not is_extension_array_dtype(dtype) and (is_bool_dtype(dtype) or is_integer_dtype(dtype)):
+        return col.to_numpy(dtype=object)
+
+    if not is_extension_array_dtype(dtype) and is_float_dtype(dtype):
+        return _float_values(col.to_numpy())
+
+    if is_datetime64_any_dtype(dtype):
+        # дат в колонке обычно немного — форматируем только уникальные
+        codes, uniques = pd.factorize(col)
+        formatted = np.append(np.asarray(uniques.strftime('%Y-%m-%d'), dtype=object), '')
+        return formatted[codes]
+
+    values = col.to_numpy(dtype=object, copy=True)
+
+    if pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+        values[pd.isna(values)] = ''
+        return values
+
+    result = np.empty(len(values), dtype=object)
+    result[:] = [_cell_value(v) for v in values]
+    return result
+
+
+def _float_values(arr: np.ndarray) -> np.ndarray:
+    nan = np.isnan(arr)
+    integral = np.isfinite(arr) & (arr == np.trunc(arr))
+
+    values = arr.astype(object)
+
+    if integral.any():
+        whole = arr[integral]
+
+        if np.abs(whole).max() < 2 ** 63:
+            values[integral] = whole.astype(np.int64).astype(object)
+        else:
+            values[integral] = [int(v) for v in whole]
+
+    values[nan] = ''
     return values
+
+
+def _cell_value(v):
+    if pd.isna(v):
+        return ''
+
+    if isinstance(v, (bool, np.bool_)):
+        return v if isinstance(v, bool) else str(v)
+
+    if isinstance(v, (int, float, np.integer, np.floating)):
+        if isinstance(v, (float, np.floating)) and v.is_integer():
+            return int(v)
+        return v.item() if isinstance(v, np.generic) else v
+
+    if isinstance(v, pd.Timestamp):
+        return v.strftime('%Y-%m-%d')
+
+    return str(v)
@@ -0,0 +1,184 @@
+from scripts.utils.config.factory import get_rate_limits
+from scripts.utils.setup_logger import make_logger
+from scripts.utils.tracing import record_span
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+from typing import Mapping, Optional
+import asyncio
+import time
+
+logger = make_logger(__name__, use_telegram=False)
+
+
+@dataclass
+class TokenBucket:
+    rate: float
+    capacity: int
+    tokens: float
+    updated: float
+    blocked_until: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens +
+                          (now - self.updated) * self.rate)
+        self.updated = now
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name) if headers else None
+
+    if value is None:
+        return None
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    🚦 Общий token-bucket лимитер запросов к API маркетплейсов.
+
+    Корзина заводится на каждую пару (host + endpoint, API-токен), поэтому все кабинеты
+    используют один экземпляр лимитера, но расходуют каждый свою квоту — как и считает её WB/Ozon.
+
+    ─────────────────────────────────────────────────────────────
+
+    🔧 Параметры:
+    -------------
+    limits : dict[str, tuple[float, int]], optional
+        `{url: (запросов в секунду, burst)}`. URL без пути задаёт лимит на весь host.
+        По умолчанию берётся из `get_rate_limits()`.
+
+    default : tuple[float, int]
+        Лимит для endpoint-ов, которых нет в `limits`.
+
+    📌 Использование:
+    ----------------
+    - `await limiter.acquire(url, api)` — перед запросом (ждёт свободный токен);
+    - `limiter.update(url, api, response.status, response.headers)` — после ответа.
+
+    🧠 Лимитер подстраивается под заголовки ответа:
+    - `X-Ratelimit-Remaining` — сколько запросов осталось в текущем burst;
+    - `X-Ratelimit-Limit` — реальный размер burst;
+    - `X-Ratelimit-Retry` / `Retry-After` / `X-Ratelimit-Reset` — сколько секунд ждать.
+    """
+
+    def __init__(self, limits: Optional[dict[str, tuple[float, int]]] = None,
+                 default: tuple[float, int] = (1.0, 1)) -> None:
+
+        if limits is None:
+            limits = get_rate_limits()
+
+        self.default = default
+        self.limits = {self._endpoint(url): limit for url,
+                       limit in limits.items()}
+        self.buckets: dict[tuple[str, str, str], TokenBucket] = {}
+
+    @staticmethod
+    def _endpoint(url: str) -> tuple[str, str]:
+        parts = urlsplit(url)
+        return parts.netloc, parts.path.rstrip('/')
+
+    def _limit(self, host: str, path: str) -> tuple[float, int]:
+        return self.limits.get((host, path)) or self.limits.get((host, '')) or self.default
+
+    def _bucket(self, url: str, token: str) -> TokenBucket:
+        host, path = self._endpoint(url)
+        key = (host, path, token)
+
+        bucket = self.buckets.get(key)
+
+        if bucket is None:
+            rate, burst = self._limit(host, path)
+            bucket = TokenBucket(rate=rate, capacity=burst,
+                                 tokens=burst, updated=time.monotonic())
+            self.buckets[key] = bucket
+
+        return bucket
+
+    def burst(self, url: str, token: str) -> int:
+        """Текущий burst для (url, token) — столько запросов имеет смысл держать в полёте."""
+        return self._bucket(url, token).capacity
+
+    def try_acquire(self, url: str, token: str) -> float:
+        """Берёт токен без ожидания. Возвращает 0, если токен взят, иначе — сколько секунд ждать."""
+
+        bucket = self._bucket(url, token)
+        now = time.monotonic()
+        bucket.refill(now)
+
+        delay = max(bucket.blocked_until - now, 0.0)
+
+        if not delay and bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+
+        return delay or (1 - bucket.tokens) / bucket.rate
+
+    async def acquire(self, url: str, token: str) -> float:
+        """Ждёт свободный токен для (url, token). Возвращает время ожидания в секундах."""
+
+        bucket = self._bucket(url, token)
+        waited = 0.0
+
+        async with bucket.lock:
+            while True:
+                now = time.monotonic()
+                bucket.refill(now)
+
+                delay = max(bucket.blocked_until - now, 0.0)
+
+                if not delay and bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    break
+
+                if not delay:
+                    delay = (1 - bucket.tokens) / bucket.rate
+
+                waited += delay
+                await asyncio.sleep(delay)
+
+        if waited:
+            record_span('rate_limit', waited, endpoint=urlsplit(url).path)
+
+        if waited >= 1:
+            logger.debug(
+                f"⏳ Лимит {urlsplit(url).path}: ждали {waited:.1f} сек")
+
+        return waited
+
+    def update(self, url: str, token: str, status: int, headers: Mapping[str, str]) -> None:
+        """Учитывает статус и заголовки ответа в корзине (url, token)."""
+
+        bucket = self._bucket(url, token)
+        now = time.monotonic()
+        bucket.refill(now)
+
+        limit = _header_float(headers, 'X-Ratelimit-Limit')
+        if limit and int(limit) != bucket.capacity:
+            bucket.capacity = max(int(limit), 1)
+
+        remaining = _header_float(headers, 'X-Ratelimit-Remaining')
+        if remaining is not None:
+            bucket.tokens = min(bucket.tokens, remaining)
+
+        retry = _header_float(headers, 'X-Ratelimit-Retry')
+        if retry is None:
+            retry = _header_float(headers, 'Retry-After')
+
+        if retry is None and remaining == 0:
+            retry = _header_float(headers, 'X-Ratelimit-Reset')
+
+        if retry is None and status == 429:
+            retry = max(1 / bucket.rate, 1.0)
+
+        if retry:
+            bucket.tokens = 0
+            bucket.blocked_until = max(bucket.blocked_until, now + retry)
+
+            if status == 429:
+                logger.warning(
+                    f"🚦 429 от {urlsplit(url).netloc}{urlsplit(url).path}: пауза {retry:.1f} сек")
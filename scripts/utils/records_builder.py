@@ -0,0 +1,41 @@
+from typing import Any, Iterable, Mapping
+import pandas as pd
+
+
+class RecordsBuilder:
+    """
+    🧱 Колоночная сборка DataFrame из плоских записей API (список словарей).
+
+    Записи раскладываются по колонкам сразу при добавлении, поэтому между запросами не
+    копятся сырые словари. Колонки — в порядке первого появления ключа, отсутствующие
+    значения — пропуски; результат совпадает с `pd.DataFrame(records)`.
+    """
+
+    def __init__(self) -> None:
+        self.columns: dict[str, list] = {}
+        self.rows = 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def add(self, records: Iterable[Mapping[str, Any]]) -> None:
+        columns = self.columns
+
+        for record in records:
+            for key, value in record.items():
+                column = columns.get(key)
+
+                if column is None:
+                    column = columns[key] = [None] * self.rows
+
+                column.append(value)
+
+            self.rows += 1
+
+            # ключи, которых не было в этой записи
+            for column in columns.values():
+                if len(column) < self.rows:
+                    column.append(None)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns) if self.rows else pd.DataFrame()
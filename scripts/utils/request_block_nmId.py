@@ -1,4 +1,4 @@
-from scripts.utils.gspread_client import get_gspread_client
+from scripts.utils.gspread_client import get_sheets_session
 from scripts.utils.setup_logger import make_logger
 from scripts.utils.config.factory import sheets_names, tables_names
 from gspread.exceptions import WorksheetNotFound, APIError
@@ -10,7 +10,7 @@ logger = make_logger(__name__, use_telegram=False)
 
 def get_block_nmId() -> pd.DataFrame:
 
-    gs = get_gspread_client()
+    gs = get_sheets_session()
     sheet_name = sheets_names()['block_nmid']
     table_name = tables_names()['wb_matrix_complete']
     try:
@@ -20,7 +20,7 @@ def get_block_nmId() -> pd.DataFrame:
         spreadsheet = gs.open(table_name)
 
         logger.info(f"📑 Открываю лист: '{sheet_name}'...")
-        worksheet = spreadsheet.worksheet(sheet_name)
+        worksheet = gs.worksheet(spreadsheet, sheet_name)
 
     except (WorksheetNotFound, APIError, Exception) as e:
         msg = (f"❌ Ошибка при подключении к листу {sheet_name}:\n{e}")
@@ -0,0 +1,183 @@
+from scripts.utils.setup_logger import make_logger
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
+from datetime import datetime, timedelta
+from typing import Optional
+import gspread
+import hashlib
+import json
+import os
+
+logger = make_logger(__name__, use_telegram=False)
+
+SNAPSHOT_DIR = os.path.join('cache', 'sheets')
+
+# если изменённых блоков больше — дешевле перезаписать диапазон целиком
+MAX_DIFF_BLOCKS = 2000
+
+
+def _snapshot_path(worksheet: gspread.Worksheet, start_range: str) -> str:
+    key = f"{worksheet.spreadsheet.id}:{worksheet.id}:{start_range.upper()}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(os.getenv('SHEETS_SNAPSHOT_DIR', SNAPSHOT_DIR), f"{digest}.json")
+
+
+def _max_age() -> timedelta:
+    return timedelta(hours=float(os.getenv('SHEETS_SNAPSHOT_MAX_AGE_HOURS', 48)))
+
+
+def _load_snapshot(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, encoding='utf-8') as file:
+            snapshot = json.load(file)
+    except Exception as e:
+        logger.warning(f"⚠️ Не удалось прочитать снимок листа {path}: {e}")
+        return None
+
+    if datetime.now() - datetime.fromisoformat(snapshot['saved_at']) > _max_age():
+        return None
+
+    return snapshot
+
+
+def _save_snapshot(path: str, values: list[list], width: int) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({
+                'saved_at': datetime.now().isoformat(timespec='seconds'),
+                'width': width,
+                'values': values,
+            }, file, ensure_ascii=False)
+
+    except Exception as e:
+        logger.warning(f"⚠️ Не удалось сохранить снимок листа {path}: {e}")
+
+
+def _drop_snapshot(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _diff_blocks(old: list[list], new: list[list], width: int) -> list[tuple[int, int, int, list[list]]]:
+    """
+    Построчное сравнение: для каждой изменённой строки — отрезок от первой до последней
+    изменённой колонки; соседние строки с одинаковым отрезком сливаются в один блок.
+    Возвращает [(строка, первая колонка, последняя колонка, значения)] в 0-based координатах.
+    """
+
+    blocks: list[tuple[int, int, int, list[list]]] = []
+
+    for r in range(max(len(old), len(new))):
+        new_row = new[r] if r < len(new) else []
+        new_row = list(new_row) + [''] * (width - len(new_row))
+        old_row = old[r] if r < len(old) else []
+        old_row = list(old_row) + [''] * (width - len(old_row))
+
+        changed = [c for c in range(width) if old_row[c] != new_row[c]]
+        if not changed:
+            continue
+
+        first, last = changed[0], changed[-1]
+        cells = new_row[first:last + 1]
+
+        if blocks:
+            row, c0, c1, values = blocks[-1]
+            if row + len(values) == r and (c0, c1) == (first, last):
+                values.append(cells)
+                continue
+
+        blocks.append((r, first, last, [cells]))
+
+    return blocks
+
+
+def sync_values(worksheet: gspread.Worksheet,
+                values: list[list],
+                start_range: str = 'A1',
+                value_input_option: str = 'USER_ENTERED',
+                clear_columns: bool = False) -> int:
+    """
+    🔁 Записывает `values` в лист, отправляя только изменившиеся ячейки.
+
+    Последние отправленные значения хранятся снимком в `cache/sheets` (по таблице, листу и
+    `start_range`). Если снимок есть, новые значения сравниваются с ним по позиции и все
+    изменённые диапазоны уходят одним `batch_update`; лишние строки прошлой выгрузки очищаются.
+    Строки пишутся в порядке `values` — лист выглядит так же, как после полной перезаписи.
+    Без снимка (первый запуск, снимок старше `SHEETS_SNAPSHOT_MAX_AGE_HOURS`, по умолчанию
+    48 часов) — диапазон очищается и пишется целиком, как раньше: так подхватываются и ручные
+    правки листа. В GitHub Actions `cache/sheets` сохраняется между запусками (`actions/cache`).
+
+    ─────────────────────────────────────────────────────────────
+
+    🔧 Параметры:
+    -------------
+    worksheet : gspread.Worksheet
+        Лист для записи.
+    values : list[list]
+        Строки для записи (например, `prepare_values_for_sheets(df)`).
+    start_range : str
+        Левая верхняя ячейка диапазона.
+    clear_columns : bool
+        Что очищать при полной перезаписи: `False` — прямоугольник от `start_range` на
+        размер `values` (и прошлой выгрузки, если есть снимок), `True` — колонки целиком
+        до конца листа.
+
+    📤 Возвращает:
+    --------------
+    int — сколько ячеек отправлено.
+    """
+
+    path = _snapshot_path(worksheet, start_range)
+    snapshot = _load_snapshot(path)
+    start_row, start_col = a1_to_rowcol(start_range)
+
+    width = max((len(row) for row in values), default=0)
+
+    if snapshot is not None:
+        width = max(width, snapshot['width'])
+        blocks = _diff_blocks(snapshot['values'], values, width)
+
+        if len(blocks) <= MAX_DIFF_BLOCKS:
+            cells = sum(len(block) * len(block[0]) for *_, block in blocks)
+
+            if blocks:
+                # если batch_update упадёт — в листе неизвестно что, следующий запуск пишет целиком
+                _drop_snapshot(path)
+
+                worksheet.batch_update([
+                    {
+                        'range': f"{rowcol_to_a1(start_row + r, start_col + c0)}:"
+                                 f"{rowcol_to_a1(start_row + r + len(block) - 1, start_col + c1)}",
+                        'values': block,
+                    }
+                    for r, c0, c1, block in blocks
+                ], value_input_option=value_input_option)
+
+            logger.info(
+                f"🔁 {worksheet.title}: изменено {cells} ячеек в {len(blocks)} диапазонах")
+
+            _save_snapshot(path, values, width)
+            return cells
+
+    last_cell = rowcol_to_a1(
+        start_row + max(len(values), len(snapshot['values']) if snapshot else 0, 1) - 1,
+        start_col + max(width, 1) - 1)
+
+    clear_range = f"{start_range}:{last_cell.rstrip('0123456789') if clear_columns else last_cell}"
+
+    _drop_snapshot(path)
+    worksheet.batch_clear([clear_range])
+
+    if values:
+        worksheet.update(values=values, range_name=start_range,
+                         value_input_option=value_input_option)
+
+    logger.info(
+        f"🧼 {worksheet.title}: диапазон {clear_range} перезаписан целиком ({len(values)} строк)")
+
+    _save_snapshot(path, values, width)
+    return len(values) * width
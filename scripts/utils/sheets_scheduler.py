@@ -0,0 +1,227 @@
+from scripts.utils.config.factory import get_sheets_quota
+from scripts.utils.setup_logger import make_logger
+from scripts.utils.telegram_logger import send_tg_message
+from scripts.utils.tracing import record_span, trace_span
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from gspread.exceptions import APIError
+from gspread.http_client import HTTPClient
+from collections import deque
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
+from requests import Response
+import threading
+import random
+import re
+import time
+import os
+
+logger = make_logger(__name__, use_telegram=False)
+
+
+class MinuteQuota:
+    """
+    🚦 Потокобезопасная квота «не больше N запросов за 60 секунд» (скользящее окно).
+    """
+
+    def __init__(self, per_minute: int, window: float = 60.0) -> None:
+        self.per_minute = per_minute
+        self.window = window
+        self.sent: deque[float] = deque()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Ждёт свободное место в окне. Возвращает время ожидания в секундах."""
+
+        waited = 0.0
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+
+                while self.sent and now - self.sent[0] >= self.window:
+                    self.sent.popleft()
+
+                if len(self.sent) < self.per_minute:
+                    self.sent.append(now)
+                    return waited
+
+                delay = self.window - (now - self.sent[0])
+
+            waited += delay
+            time.sleep(delay)
+
+
+class SheetsQuota:
+    """Общие на процесс квоты Sheets API: чтение (GET) и запись (всё остальное)."""
+
+    def __init__(self, limits: Optional[dict[str, float]] = None) -> None:
+        limits = limits or get_sheets_quota()
+        window = limits.get('window', 60.0)
+        self.read = MinuteQuota(int(limits['read']), window)
+        self.write = MinuteQuota(int(limits['write']), window)
+
+    def acquire(self, method: str) -> float:
+        return (self.read if method.upper() == 'GET' else self.write).acquire()
+
+
+# id таблицы и диапазон в пути — в один endpoint для сводки трассировки
+_SHEETS_PATH = re.compile(r'(/spreadsheets|/files)/[^/:]+|(/values)/[^/:]+')
+
+
+def _sheets_endpoint(endpoint: str) -> str:
+    return _SHEETS_PATH.sub(lambda m: f"{m.group(1) or m.group(2)}/…", urlsplit(endpoint).path)
+
+
+# запросы `spreadsheets:batchUpdate`, повтор которых не меняет результат (перезапись свойств и ячеек);
+# addSheet, appendDimension, insertDimension, appendCells и т.п. при повторе выполнятся дважды
+_IDEMPOTENT_REQUESTS = frozenset({
+    'updateSpreadsheetProperties', 'updateSheetProperties', 'updateDimensionProperties',
+    'updateCells', 'repeatCell', 'updateBorders', 'setDataValidation', 'setBasicFilter',
+    'clearBasicFilter', 'autoResizeDimensions', 'mergeCells', 'unmergeCells',
+})
+
+
+def _idempotent(method: str, endpoint: str, body: Any) -> bool:
+    """Можно ли повторить запрос, если неизвестно, выполнился ли он (5xx, 408)."""
+
+    if method.upper() == 'GET':
+        return True
+
+    path = urlsplit(endpoint).path
+
+    if '/values' in path:
+        # update / batchUpdate / clear / batchClear перезаписывают заданный диапазон, append — дописывает
+        return not path.endswith(':append')
+
+    if path.endswith(':batchUpdate'):
+        requests = (body or {}).get('requests') or []
+        return all(set(request) <= _IDEMPOTENT_REQUESTS for request in requests)
+
+    return False
+
+
+def _should_retry(err: APIError, idempotent: bool) -> bool:
+    code = err.code
+
+    if code == 403:
+        # Drive отвечает 403 usageLimits при превышении квоты — запрос отклонён, не выполнен
+        errors = err.error.get('errors') or [{}]
+        return errors[0].get('domain') == 'usageLimits'
+
+    if code == 429:
+        return True
+
+    # 408 / 5xx: запрос мог выполниться — повторяем только то, что при повторе даст тот же результат
+    return idempotent and (code == 408 or code >= 500)
+
+
+class QuotaHTTPClient(HTTPClient):
+    """
+    🔁 HTTP-клиент gspread с общей квотой и повторами.
+
+    Перед каждым запросом ждёт место в квоте `SheetsQuota` (общей для всех потоков процесса),
+    на 429 / 403 usageLimits повторяет запрос с экспоненциальной паузой и jitter.
+    На 408 / 5xx запрос мог выполниться, поэтому повторяются только чтения и перезаписи диапазонов
+    (`_idempotent`); `values.append`, добавление листов и строк падают сразу — иначе повтор
+    допишет данные второй раз.
+    """
+
+    quota: Optional[SheetsQuota] = None
+    quota_lock = threading.Lock()
+
+    retries: int = 5
+    backoff: float = 2.0
+    max_backoff: float = 64.0
+
+    @classmethod
+    def shared_quota(cls) -> SheetsQuota:
+        with cls.quota_lock:
+            if cls.quota is None:
+                cls.quota = SheetsQuota()
+        return cls.quota
+
+    def request(self, method: str, endpoint: str, *args: Any, **kwargs: Any) -> Response:
+        quota = self.shared_quota()
+        idempotent = _idempotent(method, endpoint, kwargs.get('json'))
+
+        for attempt in range(self.retries):
+            waited = quota.acquire(method)
+
+            if waited:
+                record_span('sheets_quota', waited, method=method)
+
+            if waited >= 1:
+                logger.debug(f"⏳ Квота Sheets: ждали {waited:.1f} сек")
+
+            try:
+                with trace_span('sheets', method=method, endpoint=_sheets_endpoint(endpoint)) as span:
+                    response = super().request(method, endpoint, *args, **kwargs)
+                    span['bytes'] = len(response.content)
+
+                return response
+
+            except APIError as err:
+                if attempt == self.retries - 1 or not _should_retry(err, idempotent):
+                    if not idempotent and (err.code == 408 or err.code >= 500):
+                        logger.error(f"❌ Sheets API {err.code} ({method} {endpoint.split('?')[0][-60:]}): "
+                                     f"запрос мог выполниться, не повторяю")
+                    raise
+
+                delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+                delay = random.uniform(delay / 2, delay)
+
+                logger.warning(
+                    f"🔁 Sheets API {err.code} ({method} {endpoint.split('?')[0][-60:]}): повтор через {delay:.1f} сек")
+                time.sleep(delay)
+
+
+def _traced_upload(name: str, job: Callable[[], Any]) -> Any:
+    with trace_span('sheets_upload', job=name):
+        return job()
+
+
+def run_uploads(jobs: dict[str, Callable[[], Any]], max_workers: Optional[int] = None) -> dict[str, Any]:
+    """
+    📤 Параллельная выгрузка в разные Google Таблицы.
+
+    Каждая задача — все записи в одну таблицу (внутри задачи они идут по порядку), задачи
+    выполняются одновременно в пуле потоков. Темп запросов задаёт общая квота `QuotaHTTPClient`,
+    поэтому выгрузка занимает время самой медленной таблицы, а не сумму.
+
+    ─────────────────────────────────────────────────────────────
+
+    🔧 Параметры:
+    -------------
+    jobs : dict[str, Callable[[], Any]]
+        `{название (для логов): функция без аргументов}`.
+    max_workers : int, optional
+        Размер пула. По умолчанию `SHEETS_UPLOAD_WORKERS` или 4.
+
+    📤 Возвращает:
+    --------------
+    dict[str, Any] — результат каждой задачи; для упавших — исключение
+    (оно же логируется и отправляется в Telegram).
+    """
+
+    if not jobs:
+        return {}
+
+    max_workers = max_workers or int(os.getenv('SHEETS_UPLOAD_WORKERS', 4))
+    results: dict[str, Any] = {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs)),
+                            thread_name_prefix='sheets-upload') as pool:
+        futures = {pool.submit(_traced_upload, name, job): name for name, job in jobs.items()}
+
+        for future in as_completed(futures):
+            name = futures[future]
+
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                msg = f"❌ Ошибка выгрузки в '{name}': {e}"
+                logger.exception(msg)
+                send_tg_message(msg)
+                results[name] = e
+
+    return {name: results[name] for name in jobs}
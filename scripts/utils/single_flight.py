@@ -0,0 +1,42 @@
+from scripts.utils.setup_logger import make_logger
+from typing import Any, Awaitable, Callable, Hashable
+import asyncio
+
+logger = make_logger(__name__, use_telegram=False)
+
+
+class SingleFlight:
+    """
+    🛫 Один запрос на ключ в рамках запуска.
+
+    Первый вызов `do(key, ...)` запускает корутину, все остальные вызовы с тем же ключом —
+    одновременные и последующие — ждут ту же задачу и получают тот же результат.
+    Если задача упала, ошибку получат все, кто её ждал, а ключ освобождается: следующий вызов
+    запустит запрос заново.
+
+    📌 Использование:
+    ----------------
+    cards = SingleFlight()
+    IDKT, ID = await cards.do((name, api), lambda: get_cards(...))
+    """
+
+    def __init__(self) -> None:
+        self.tasks: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self.tasks.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda done: self._forget_failed(key, done))
+            self.tasks[key] = task
+        else:
+            logger.debug(f"🛬 {key[0] if isinstance(key, tuple) else key}: ждём уже запущенный запрос")
+
+        # shield — отмена одного ожидающего не должна отменять общий запрос
+        return await asyncio.shield(task)
+
+    def _forget_failed(self, key: Hashable, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is not None:
+            if self.tasks.get(key) is task:
+                del self.tasks[key]
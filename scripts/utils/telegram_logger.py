@@ -1,10 +1,161 @@
 from dotenv import load_dotenv
+from typing import Optional
+import threading
 import requests
 import logging
+import atexit
+import queue
+import time
 import os
 
 load_dotenv()
 
+TG_MESSAGE_LIMIT = 4096
+
+
+class TelegramNotifier:
+    """
+    📨 Фоновая отправка сообщений в Telegram.
+
+    `send()` только кладёт текст в ограниченную очередь и сразу возвращается — сеть
+    обслуживает отдельный поток, поэтому уведомления не блокируют event loop и сбор данных.
+
+    🧠 Поток-отправитель:
+    - собирает сообщения, пришедшие за `window` секунд, и склеивает их по чатам
+      в одно сообщение (до 4096 символов);
+    - шлёт в один чат не чаще раза в `chat_interval` секунд (лимит Telegram ~1 сообщение/сек на чат);
+    - на 429 ждёт `retry_after` из ответа и повторяет;
+    - если очередь переполнена, новые сообщения отбрасываются, а их число дописывается в следующую отправку.
+
+    `flush()` дожидается отправки всего, что уже в очереди; вызывается автоматически при выходе.
+    """
+
+    def __init__(self, window: float = 1.0, chat_interval: float = 1.0,
+                 maxsize: int = 1000, retries: int = 3) -> None:
+
+        self.window = window
+        self.chat_interval = chat_interval
+        self.retries = retries
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.last_sent: dict[tuple[str, str], float] = {}
+        self.http = requests.Session()
+
+        self.thread = threading.Thread(
+            target=self._run, name='telegram-notifier', daemon=True)
+        self.thread.start()
+
+    def send(self, token: str, chat_id: str, text: str) -> None:
+        try:
+            self.queue.put_nowait((token, chat_id, text[:TG_MESSAGE_LIMIT]))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Ждёт, пока отправится всё, что было в очереди на момент вызова."""
+
+        if not self.thread.is_alive():
+            return False
+
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.window
+
+            while not isinstance(batch[-1], threading.Event) and time.monotonic() < deadline:
+                try:
+                    batch.append(self.queue.get(
+                        timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+
+            events = [item for item in batch if isinstance(item, threading.Event)]
+            messages = [item for item in batch if not isinstance(item, threading.Event)]
+
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                if messages:
+                    token, chat_id, _ = messages[-1]
+                    messages.append(
+                        (token, chat_id, f"⚠️ Очередь уведомлений переполнена, пропущено: {dropped}"))
+
+            for (token, chat_id), text in self._coalesce(messages):
+                self._post(token, chat_id, text)
+
+            for event in events:
+                event.set()
+
+    @staticmethod
+    def _coalesce(messages: list[tuple[str, str, str]]) -> list[tuple[tuple[str, str], str]]:
+        chunks: list[tuple[tuple[str, str], str]] = []
+        current: dict[tuple[str, str], int] = {}
+
+        for token, chat_id, text in messages:
+            key = (token, chat_id)
+            index = current.get(key)
+
+            if index is not None and len(chunks[index][1]) + len(text) + 1 <= TG_MESSAGE_LIMIT:
+                chunks[index] = (key, f"{chunks[index][1]}\n{text}")
+            else:
+                current[key] = len(chunks)
+                chunks.append((key, text))
+
+        return chunks
+
+    def _post(self, token: str, chat_id: str, text: str) -> None:
+        key = (token, chat_id)
+
+        for _ in range(self.retries):
+            pause = self.last_sent.get(key, 0) + self.chat_interval - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+
+            try:
+                response = self.http.post(
+                    f"https://api.telegram.org/bot{token}/sendMessage",
+                    data={"chat_id": chat_id, "text": text},
+                    timeout=30
+                )
+                self.last_sent[key] = time.monotonic()
+
+                if response.status_code != 429:
+                    return
+
+                retry_after = response.json().get('parameters', {}).get('retry_after', 1)
+                time.sleep(retry_after)
+
+            except Exception as e:
+                print(f"❌ Ошибка при отправке сообщения в Telegram: {e}")
+                return
+
+
+_notifier: Optional[TelegramNotifier] = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier() -> TelegramNotifier:
+    """Общий на процесс `TelegramNotifier` (создаётся при первой отправке)."""
+
+    global _notifier
+
+    with _notifier_lock:
+        if _notifier is None:
+            _notifier = TelegramNotifier()
+            atexit.register(_notifier.flush)
+
+    return _notifier
+
+
+def flush_tg_messages(timeout: float = 30.0) -> None:
+    """Дожидается отправки накопленных уведомлений (если они были)."""
+
+    if _notifier is not None:
+        _notifier.flush(timeout)
+
 
 class TelegramHandler(logging.Handler):
 
@@ -14,13 +165,8 @@ class TelegramHandler(logging.Handler):
         self.chat_id = chat_id or os.getenv('MY_TG_CHAT_ID')
 
     def emit(self, record):
-        log_entry = self.format(record)
-
         try:
-            requests.post(
-                f"https://api.telegram.org/bot{self.token}/sendMessage",
-                data={"chat_id": self.chat_id, "text": log_entry[:4096]}
-            )
+            get_notifier().send(self.token, self.chat_id, self.format(record))
         except Exception as e:
             print(f"❌ Ошибка отправки лога в Telegram: {e}")
 
@@ -33,10 +179,7 @@ def send_tg_message(text: str):
         return
 
     try:
-        requests.post(
-            f"https://api.telegram.org/bot{token}/sendMessage",
-            data={"chat_id": chat_id, "text": text[:4096]}
-        )
+        get_notifier().send(token, chat_id, text)
 
     except Exception as e:
         print(f"❌ Ошибка при отправке сообщения в Telegram: {e}")
@@ -50,6 +193,9 @@ def send_photo_to_telegram(image_path: str, caption: str = ""):
     bot_token = os.getenv("TG_TOKEN")
     chat_id = os.getenv("MY_TG_CHAT_ID")
 
+    # фото должно прийти после уже поставленных в очередь сообщений
+    flush_tg_messages()
+
     if not bot_token or not chat_id:
         raise ValueError(
             "TG_BOT_TOKEN или TG_CHAT_ID не заданы в переменных окружения.")
@@ -0,0 +1,268 @@
+from scripts.utils.config.factory import get_tracing
+from scripts.utils.setup_logger import make_logger
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Iterator, Optional
+from urllib.parse import urlsplit
+import multiprocessing
+import threading
+import atexit
+import json
+import time
+import os
+
+logger = make_logger(__name__, use_telegram=False)
+
+# кабинет текущей задачи asyncio — HTTP-спаны и ожидания лимитов получают его без аргументов
+_cabinet: ContextVar[Optional[str]] = ContextVar('trace_cabinet', default=None)
+
+
+class Tracer:
+    """
+    ⏱ Спаны запуска: сколько длился каждый этап каждого кабинета.
+
+    Спан — словарь `{run, stage, cabinet, start, duration, ...}`: `start` — секунды от начала
+    запуска, остальные поля — атрибуты этапа (`endpoint`, `status`, `bytes`, `job`, ...).
+    Этапы пишут `main()` / `main_run_ozon()` (`fetch`, `cards`, `postprocess`), сессия
+    `open_session` (`http` — запрос до конца тела, `json` — разбор ответа), `RateLimiter`
+    (`rate_limit` — ожидание квоты API) и `QuotaHTTPClient` (`sheets`, `sheets_quota`).
+
+    В конце процесса спаны дописываются в JSON-lines `get_tracing()['file']`, а сводная таблица
+    по этапам и кабинетам — в лог (и в `GITHUB_STEP_SUMMARY` в GitHub Actions).
+    Спаны пишутся из event loop и из потоков выгрузки одновременно — список под lock.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.run = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+        self.origin = time.perf_counter()
+        self.spans: list[dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    def record(self, stage: str, duration: float, start: Optional[float] = None,
+               cabinet: Optional[str] = None, **attrs: Any) -> dict[str, Any]:
+        """Готовый спан: `duration` секунд, закончился сейчас (или начался в `start` по perf_counter)."""
+
+        now = time.perf_counter()
+        span = {
+            'run': self.run,
+            'stage': stage,
+            'cabinet': cabinet or _cabinet.get(),
+            'start': round((now - duration if start is None else start) - self.origin, 4),
+            'duration': round(duration, 4),
+            **attrs,
+        }
+
+        if self.enabled:
+            with self.lock:
+                self.spans.append(span)
+
+        return span
+
+    @contextmanager
+    def span(self, stage: str, cabinet: Optional[str] = None, **attrs: Any) -> Iterator[dict[str, Any]]:
+        """Спан на время блока; в него можно дописать атрибуты. Ошибка блока — в поле `error`."""
+
+        begin = time.perf_counter()
+        span = self.record(stage, 0.0, start=begin, cabinet=cabinet, **attrs)
+
+        try:
+            yield span
+        except BaseException as e:
+            span['error'] = type(e).__name__
+            raise
+        finally:
+            span['duration'] = round(time.perf_counter() - begin, 4)
+
+    def export(self, path: str) -> None:
+        """Дописывает спаны запуска в JSON-lines `path`."""
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with self.lock, open(path, 'a', encoding='utf-8') as file:
+            for span in self.spans:
+                file.write(json.dumps(span, ensure_ascii=False, default=str) + '\n')
+
+    def summary(self) -> list[str]:
+        """Строки сводной таблицы: по этапам (и endpoint-ам HTTP), затем по кабинетам."""
+
+        with self.lock:
+            spans = list(self.spans)
+
+        wall = max((span['start'] + span['duration'] for span in spans), default=0.0)
+
+        def stage_key(span: dict[str, Any]) -> str:
+            endpoint = span.get('endpoint')
+            return f"{span['stage']} {endpoint}" if endpoint else span['stage']
+
+        def table(title: str, key) -> list[str]:
+            groups = defaultdict(list)
+            for span in spans:
+                groups[key(span)].append(span)
+
+            rows = [f"{title:<52}{'спанов':>8}{'сумма, с':>11}{'средн, с':>10}{'макс, с':>10}{'МБ':>9}"]
+            for name, group in sorted(groups.items(), key=lambda item: -sum(s['duration'] for s in item[1])):
+                durations = [span['duration'] for span in group]
+                mb = sum(span.get('bytes', 0) for span in group) / 2**20
+                rows.append(f"{name[:51]:<52}{len(group):>8}{sum(durations):>11.2f}"
+                            f"{sum(durations) / len(group):>10.3f}{max(durations):>10.2f}{mb:>9.2f}")
+            return rows
+
+        return [
+            f"⏱ Запуск {self.run}: {wall:.1f} с, {len(spans)} спанов "
+            f"(спаны параллельных кабинетов и запросов пересекаются — сумма больше времени запуска)",
+            *table('этап', stage_key),
+            '',
+            *table('кабинет / этап', lambda span: f"{span['cabinet'] or '—'} / {span['stage']}"),
+        ]
+
+    def finish(self) -> None:
+        """Экспорт спанов и сводная таблица — один раз, в конце процесса."""
+
+        if not self.enabled or not self.spans:
+            return
+
+        config = get_tracing()
+
+        try:
+            if config['file']:
+                self.export(config['file'])
+
+            rows = self.summary()
+            logger.info('\n'.join(rows))
+
+            step_summary = os.getenv('GITHUB_STEP_SUMMARY')
+            if step_summary:
+                with open(step_summary, 'a', encoding='utf-8') as file:
+                    file.write('```\n' + '\n'.join(rows) + '\n```\n')
+
+        except Exception as e:
+            logger.error(f"❌ Не удалось сохранить трассировку: {e}")
+
+        self.spans = []
+
+
+TRACER = Tracer(enabled=get_tracing()['enabled'])
+
+# воркеры пула постобработки спанов не пишут — их этапы меряет родительский процесс
+if multiprocessing.parent_process() is None:
+    atexit.register(TRACER.finish)
+
+
+@contextmanager
+def trace_cabinet(name: str) -> Iterator[None]:
+    """Спаны внутри блока (в т.ч. HTTP и лимиты) относятся к кабинету `name`."""
+
+    token = _cabinet.set(name)
+    try:
+        yield
+    finally:
+        _cabinet.reset(token)
+
+
+def trace_span(stage: str, cabinet: Optional[str] = None, **attrs: Any):
+    return TRACER.span(stage, cabinet=cabinet, **attrs)
+
+
+def record_span(stage: str, duration: float, **attrs: Any) -> dict[str, Any]:
+    return TRACER.record(stage, duration, **attrs)
+
+
+class TracedResponse:
+    """Ответ `TracedSession`: тело дописывает время и байты в HTTP-спан, `json()` — спан разбора."""
+
+    def __init__(self, response: Any, span: dict[str, Any]) -> None:
+        self._response = response
+        self._span = span
+        self._read = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._response, name)
+
+    async def read(self) -> bytes:
+        if self._read:
+            return await self._response.read()
+
+        begin = time.perf_counter()
+        body = await self._response.read()
+
+        self._read = True
+        self._span['duration'] = round(self._span['duration'] + time.perf_counter() - begin, 4)
+        self._span['bytes'] = len(body or b'')
+
+        return body
+
+    async def text(self, *args: Any, **kwargs: Any) -> str:
+        await self.read()
+        return await self._response.text(*args, **kwargs)
+
+    async def json(self, *args: Any, **kwargs: Any) -> Any:
+        await self.read()
+
+        begin = time.perf_counter()
+        data = await self._response.json(*args, **kwargs)
+        TRACER.record('json', time.perf_counter() - begin, endpoint=self._span['endpoint'],
+                      bytes=self._span['bytes'])
+
+        return data
+
+
+class _TracedRequest:
+    def __init__(self, context: Any, method: str, url: str) -> None:
+        self._context = context
+        self._method = method
+        self._url = url
+
+    def __await__(self):
+        return self.__aenter__().__await__()
+
+    async def __aenter__(self) -> TracedResponse:
+        begin = time.perf_counter()
+        response = await self._context.__aenter__()
+
+        span = TRACER.record('http', time.perf_counter() - begin, start=begin, method=self._method,
+                             endpoint=urlsplit(self._url).path, status=response.status, bytes=0)
+
+        return TracedResponse(response, span)
+
+    async def __aexit__(self, *exc) -> None:
+        await self._context.__aexit__(*exc)
+
+
+class TracedSession:
+    """
+    🔍 Обёртка над `aiohttp.ClientSession` / `CassetteSession` из `open_session`: каждый запрос —
+    HTTP-спан (время до заголовков + чтение тела, байты, статус, endpoint), `json()` — спан `json`.
+    Остальное (close, контекстный менеджер) — как у исходной сессии.
+    """
+
+    def __init__(self, session: Any) -> None:
+        self._session = session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> _TracedRequest:
+        return _TracedRequest(self._session.request(method, url, **kwargs), method, str(url))
+
+    def get(self, url: str, **kwargs: Any) -> _TracedRequest:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> _TracedRequest:
+        return self.request('POST', url, **kwargs)
+
+    async def __aenter__(self) -> 'TracedSession':
+        await self._session.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._session.__aexit__(*exc)
+
+
+def trace_session(session: Any) -> Any:
+    """`session` в `TracedSession`, если трассировка включена."""
+
+    return TracedSession(session) if TRACER.enabled else session